@@ -0,0 +1,20 @@
+import argparse
+import json
+from src.models.archive import ARCHIVE_AFTER_MONTHS, ArchiveSearch, TenantArchiver
+
+if __name__ == '__main__':
+    # The scheduler runs the archival nightly; run by hand to change the cut-off or search the archive
+    parser = argparse.ArgumentParser(description="Move long-gone, settled tenants and their payments to the archive")
+    parser.add_argument("--months", type=int, default=ARCHIVE_AFTER_MONTHS,
+                        help="archive tenants checked out more than this many months ago")
+    parser.add_argument("--chunk-size", type=int, default=500, help="tenants moved per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="count the tenants that would be archived")
+    parser.add_argument("--search", help="search the archive by name, email or phone instead")
+    args = parser.parse_args()
+
+    if args.search:
+        for tenant in ArchiveSearch().search(args.search):
+            print(f"{tenant.tenant_id}\t{tenant.first_name} {tenant.last_name}\t{tenant.email or ''}\t"
+                  f"{tenant.check_in_date} to {tenant.check_out_date}\tpaid {tenant.total_paid}")
+    else:
+        print(json.dumps(TenantArchiver(args.months, args.chunk_size).run(args.dry_run), indent=2))
@@ -0,0 +1,22 @@
+import argparse
+from datetime import date
+from src.models.checkout import CheckoutError, check_out_tenants
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check many tenants out together, e.g. at the end of a semester")
+    parser.add_argument("tenant_ids", nargs="*", type=int, help="tenant ids to check out")
+    parser.add_argument("--from-file", help="file with one tenant id per line")
+    parser.add_argument("--date", type=date.fromisoformat, help="check-out date (YYYY-MM-DD); default today")
+    args = parser.parse_args()
+
+    tenant_ids = list(args.tenant_ids)
+    if args.from_file:
+        with open(args.from_file) as f:
+            tenant_ids += [int(line) for line in f if line.strip()]
+    if not tenant_ids:
+        parser.error("give tenant ids or --from-file")
+    try:
+        for tenant in check_out_tenants(tenant_ids, args.date):
+            print(f"Tenant {tenant.tenant_id}: left room {tenant.room_id or '-'} with balance {tenant.final_balance}")
+    except CheckoutError as e:
+        raise SystemExit(f"Nothing was checked out: {e}")
@@ -0,0 +1,106 @@
+"""Room availability search latency.
+
+Creates throwaway rooms with a random capacity and price, gives each room
+past, current and future stays, then times random searches through
+AvailabilitySearch. Needs the MySQL database used by the app. Prints JSON.
+
+    python -m benchmarks.availability_benchmark --rooms 500 --searches 200
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from src.models.availability import AvailabilitySearch
+from src.models.database import Database
+
+def create_rooms(db, count, stays_per_room, rng):
+    """Create tagged rooms and stays spread over a year either side of today; returns the tag"""
+    # room_number is VARCHAR(10): "A" + 4-character tag + 5-digit index
+    tag = uuid.uuid4().hex[:4]
+    db.execute_many(
+        "INSERT INTO rooms (room_number, capacity, price, status) VALUES (%s, %s, %s, 'Available')",
+        [
+            (f"A{tag}{i:05d}", rng.randint(1, 6), Decimal(rng.randrange(2000, 12000, 250)))
+            for i in range(count)
+        ]
+    )
+    room_ids = [row[0] for row in db.fetch_all(
+        "SELECT room_id FROM rooms WHERE room_number LIKE %s", (f"A{tag}%",)
+    )]
+    today = date.today()
+    stays = []
+    for room_id in room_ids:
+        for i in range(stays_per_room):
+            check_in = today + timedelta(days=rng.randint(-365, 365))
+            # Some stays are open-ended
+            check_out = check_in + timedelta(days=rng.randint(30, 240)) if rng.random() < 0.8 else None
+            stays.append(("Bench", f"{tag}-{room_id}-{i}", room_id, check_in, check_out))
+    db.execute_many(
+        """
+        INSERT INTO tenants (first_name, last_name, room_id, check_in_date, check_out_date)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        stays
+    )
+    return tag
+
+def remove_rooms(db, tag):
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM tenants WHERE first_name = 'Bench' AND last_name LIKE %s", (f"{tag}-%",))
+        cursor.execute("DELETE FROM rooms WHERE room_number LIKE %s", (f"A{tag}%",))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--stays", type=int, default=4, help="stays per room")
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the generated rooms and tenants")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    db = Database()
+    search = AvailabilitySearch()
+    tag = create_rooms(db, args.rooms, args.stays, rng)
+
+    try:
+        today = date.today()
+        latencies = []
+        matches = 0
+        for _ in range(args.searches):
+            start = today + timedelta(days=rng.randint(0, 90))
+            end = start + timedelta(days=rng.randint(30, 180)) if rng.random() < 0.7 else None
+            low = rng.randrange(0, 6000, 500)
+            started = time.perf_counter()
+            found = search.search(
+                beds=rng.randint(1, 3),
+                min_price=low,
+                max_price=low + rng.randrange(1000, 6000, 500),
+                start=start,
+                end=end
+            )
+            latencies.append(time.perf_counter() - started)
+            matches += len(found)
+        latencies.sort()
+
+        report = {
+            "rooms": args.rooms,
+            "stays": args.rooms * args.stays,
+            "searches": args.searches,
+            "avg_matches": matches / args.searches if args.searches else None,
+            "latency_p50_ms": latencies[len(latencies) // 2] * 1000,
+            "latency_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            "latency_max_ms": latencies[-1] * 1000,
+        }
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        if not args.keep:
+            remove_rooms(db, tag)
+
+if __name__ == "__main__":
+    sys.exit(main())
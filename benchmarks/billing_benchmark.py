@@ -0,0 +1,86 @@
+"""Batch rent calculation benchmark.
+
+Generates a synthetic tenant population, checks that the vectorized engine
+agrees exactly with the scalar one, and times both. Prints JSON.
+
+    python -m benchmarks.billing_benchmark --tenants 100000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
+from src.utils import billing
+from src.utils.money import sum_cents
+
+def make_tenants(count, as_of, seed=0):
+    rng = random.Random(seed)
+    check_ins, check_outs, prices = [], [], []
+    for _ in range(count):
+        check_in = as_of - timedelta(days=rng.randint(0, 5 * 365))
+        check_out = None
+        if rng.random() < 0.3:
+            check_out = check_in + timedelta(days=rng.randint(1, 3 * 365))
+        check_ins.append(None if rng.random() < 0.01 else check_in)
+        check_outs.append(check_out)
+        prices.append(rng.randint(1500, 12000) * 100 + rng.choice((0, 50, 99)))
+    return check_ins, check_outs, prices
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of the batch engine")
+    args = parser.parse_args(argv)
+
+    as_of = date(2025, 1, 31)
+    check_ins, check_outs, prices = make_tenants(args.tenants, as_of)
+
+    start = time.perf_counter()
+    scalar = [billing.rent_cents(ci, co, p, as_of) for ci, co, p in zip(check_ins, check_outs, prices)]
+    scalar_time = time.perf_counter() - start
+
+    batch_times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        batch = billing.batch_rent_cents(check_ins, check_outs, prices, as_of)
+        batch_times.append(time.perf_counter() - start)
+
+    # Core computation alone, with dates already in array form
+    check_in_array = billing.to_datetime64(check_ins)
+    check_out_array = billing.to_datetime64(check_outs)
+    price_array = np.asarray(prices, dtype=np.int64)
+    core_times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        billing.batch_rent_cents(check_in_array, check_out_array, price_array, as_of)
+        core_times.append(time.perf_counter() - start)
+
+    mismatches = sum(1 for a, b in zip(scalar, batch.tolist()) if a != b)
+
+    # Totals: exact int64 centavos versus the float pesos the views used to add up
+    start = time.perf_counter()
+    exact_total = sum_cents(batch)
+    sum_time = time.perf_counter() - start
+    float_total = 0.0
+    for cents in batch.tolist():
+        float_total += cents / 100
+    report = {
+        "tenants": args.tenants,
+        "as_of": as_of.isoformat(),
+        "scalar_s": scalar_time,
+        "batch_best_s": min(batch_times),
+        "batch_mean_s": sum(batch_times) / len(batch_times),
+        "batch_core_best_s": min(core_times),
+        "speedup": scalar_time / min(batch_times) if min(batch_times) else None,
+        "total_rent": str(exact_total),
+        "sum_s": sum_time,
+        "float_drift_pesos": float_total - float(exact_total.to_decimal()),
+        "mismatches": mismatches,
+    }
+    print(json.dumps(report, indent=2))
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
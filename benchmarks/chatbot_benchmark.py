@@ -0,0 +1,125 @@
+"""Chatbot latency and throughput benchmark.
+
+Drives ChatbotEngine with a fixed prompt corpus under 1, 4 and 16 concurrent
+simulated sessions and prints the results as JSON.
+
+    python -m benchmarks.chatbot_benchmark --output chatbot_bench.json
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.views.chatbot.chatbot_engine import ChatbotEngine
+
+PROMPTS = [
+    "Hello!",
+    "Are there any rooms available?",
+    "How much is the monthly rent?",
+    "What payment methods do you accept?",
+    "Can I pay through GCash?",
+    "When is the rent due?",
+    "The faucet in my room is leaking.",
+    "Is there a curfew?",
+    "Can I extend my stay for another month?",
+    "Thank you for your help.",
+]
+
+CONCURRENCY_LEVELS = (1, 4, 16)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def run_prompt(engine, prompt):
+    start = time.perf_counter()
+    first_token_at = None
+    chunks = []
+    for chunk in engine.stream_bot_response(prompt):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        chunks.append(chunk)
+    end = time.perf_counter()
+    return {
+        "latency": end - start,
+        "ttft": (first_token_at or end) - start,
+        "tokens": engine.count_tokens("".join(chunks)),
+    }
+
+def run_session(engine, prompts):
+    return [run_prompt(engine, prompt) for prompt in prompts]
+
+def run_level(engine, sessions, prompts):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(run_session, engine, prompts) for _ in range(sessions)]
+        results = [result for future in futures for result in future.result()]
+    wall_time = time.perf_counter() - start
+
+    latencies = [r["latency"] for r in results]
+    ttfts = [r["ttft"] for r in results]
+    total_tokens = sum(r["tokens"] for r in results)
+    return {
+        "sessions": sessions,
+        "requests": len(results),
+        "wall_time_s": wall_time,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "ttft_p50_s": percentile(ttfts, 50),
+        "ttft_p95_s": percentile(ttfts, 95),
+        "tokens": total_tokens,
+        "tokens_per_s": total_tokens / wall_time if wall_time else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(CONCURRENCY_LEVELS),
+                        help="concurrency levels to run")
+    parser.add_argument("--rounds", type=int, default=1,
+                        help="times each session replays the prompt corpus")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    engine = ChatbotEngine()
+    engine.load()
+    if not engine.is_loaded:
+        print("Model failed to load; aborting benchmark", file=sys.stderr)
+        return 1
+
+    prompts = PROMPTS * args.rounds
+    # Warm up once so the first level doesn't pay one-off initialisation costs
+    run_prompt(engine, PROMPTS[0])
+
+    report = {
+        "model": engine.model_name,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "prompts": len(prompts),
+        "cold_load_s": engine.load_time,
+        "levels": [run_level(engine, sessions, prompts) for sessions in args.sessions],
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
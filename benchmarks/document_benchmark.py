@@ -0,0 +1,103 @@
+"""Month-end PDF statement benchmark.
+
+Renders synthetic statements (and receipts) for many tenants through the
+same batched process-pool path the document queue uses and reports pages
+per second. Needs no database; output goes to a temporary directory unless
+--output is given. Prints JSON.
+
+    python -m benchmarks.document_benchmark --tenants 500 --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from src.utils.money import Money
+from src.utils.pdf_documents import render_in_pool, warm_templates
+
+def make_statements(directory, tenants, entries, rng):
+    """Lazily yield (path, statement) pairs like DocumentQueue._statements"""
+    start = date(2025, 1, 1)
+    for tenant_id in range(1, tenants + 1):
+        rent = Money(rng.choice((3500, 4000, 5000)) * 100)
+        opening = Money(rng.randint(0, 3) * int(rent))
+        rows = [(start, "Rent for 2025-01", False, rent)]
+        for _ in range(rng.randint(1, entries)):
+            rows.append((start + timedelta(days=rng.randint(1, 30)), "GCash payment", True, Money(rng.randint(500, 5000) * 100)))
+        closing = opening + rent - sum(row[3] for row in rows[1:])
+        yield os.path.join(directory, f"statement_{tenant_id}.pdf"), {
+            "tenant": f"Tenant {tenant_id}",
+            "room": str(100 + tenant_id // 4),
+            "period": "2025-01",
+            "opening": opening,
+            "entries": rows,
+            "closing": closing,
+        }
+
+def make_receipts(directory, count, rng):
+    for n in range(1, count + 1):
+        yield os.path.join(directory, f"OR-{n:08d}.pdf"), {
+            "number": f"OR-{n:08d}",
+            "date": date(2025, 1, 15),
+            "tenant": f"Tenant {n}",
+            "room": "101",
+            "method": "Cash",
+            "description": "Rent",
+            "amount": Money(rng.randint(1000, 6000) * 100),
+            "balance": Money(0),
+        }
+
+def run(executor, kind, documents, batch_size, workers):
+    start = time.perf_counter()
+    count, pages = render_in_pool(executor, kind, documents, batch_size, max_in_flight=workers * 2)
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": count,
+        "pages": pages,
+        "elapsed_s": elapsed,
+        "pages_per_s": pages / elapsed if elapsed else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=8, help="max payments per statement")
+    parser.add_argument("--receipts", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--output", help="keep the PDFs in this directory")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    directory = args.output or tempfile.mkdtemp(prefix="bhms_documents_")
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=warm_templates) as executor:
+            statements = run(
+                executor, "statement",
+                make_statements(os.path.join(directory, "statements"), args.tenants, args.entries, rng),
+                args.batch_size, args.workers
+            )
+            receipts = run(
+                executor, "receipt",
+                make_receipts(os.path.join(directory, "receipts"), args.receipts, rng),
+                args.batch_size, args.workers
+            )
+        report = {
+            "workers": args.workers,
+            "batch_size": args.batch_size,
+            "statements": statements,
+            "receipts": receipts,
+        }
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        if not args.output:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Streaming export benchmark.
+
+Feeds a synthetic payments history through the CSV and XLSX writers in the
+same batches the export queue reads from the database, and reports rows per
+second and file size. With --trace-memory it also reports peak traced
+memory, which should stay flat as --rows grows (tracing slows the run
+several times over). Needs no database. Prints JSON.
+
+    python -m benchmarks.export_benchmark --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.utils.exporters import FORMATS, open_writer
+
+# Same shape as the payments export in src/models/exports.py
+COLUMNS = ["Transaction ID", "Posted At", "Tenant ID", "First Name", "Last Name", "Room", "Type",
+           "Amount", "Method", "Description", "Reverses Transaction"]
+
+def payment_batches(rows, batch_size, seed=0):
+    """Yield batches shaped like the payments export query"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    methods = ("Cash", "GCash", "Bank Transfer")
+    batch = []
+    for transaction_id in range(1, rows + 1):
+        tenant_id = rng.randint(1, 5000)
+        is_payment = rng.random() < 0.5
+        batch.append((
+            transaction_id, start + timedelta(minutes=transaction_id), tenant_id,
+            f"First{tenant_id}", f"Last{tenant_id}", str(100 + tenant_id % 400),
+            "Payment" if is_payment else "Charge",
+            Decimal(rng.randint(50000, 1200000)) / 100,
+            rng.choice(methods) if is_payment else None,
+            "Payment" if is_payment else "Rent", None,
+        ))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run(path, rows, batch_size, trace_memory=False):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open_writer(path, COLUMNS) as writer:
+        for batch in payment_batches(rows, batch_size):
+            writer.write_rows(batch)
+    elapsed = time.perf_counter() - start
+    result = {
+        "rows": writer.rows,
+        "elapsed_s": elapsed,
+        "rows_per_s": writer.rows / elapsed if elapsed else None,
+        "file_mb": os.path.getsize(path) / 2**20,
+    }
+    if trace_memory:
+        result["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--format", choices=FORMATS, action="append", help="default: all formats")
+    parser.add_argument("--trace-memory", action="store_true", help="report peak traced memory")
+    parser.add_argument("--output", help="keep the files in this directory")
+    args = parser.parse_args(argv)
+
+    directory = args.output or tempfile.mkdtemp(prefix="bhms_exports_")
+    try:
+        report = {"rows": args.rows, "batch_size": args.batch_size}
+        for extension in args.format or FORMATS:
+            path = os.path.join(directory, f"payments.{extension}")
+            report[extension] = run(path, args.rows, args.batch_size, args.trace_memory)
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        if not args.output:
+            shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
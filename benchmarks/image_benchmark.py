@@ -0,0 +1,78 @@
+"""Profile image pipeline benchmark.
+
+Generates synthetic phone-sized photos, runs them through the pipeline and
+compares what the tenants table has to load per row: the full original
+versus the stored thumbnail. Also times re-uploading the same photos, which
+the content hash turns into a lookup. Needs no database. Prints JSON.
+
+    python -m benchmarks.image_benchmark --photos 20
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from src.utils.images import process_profile_image, thumbnail_for
+
+def make_photos(directory, count, width, height, seed=0):
+    """Write JPEGs with smooth gradients plus noise, which compress like real photos"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    paths = []
+    for n in range(count):
+        base = np.stack([(x * (n + 1)) % 256, (y * 3) % 256, ((x + y) // 4) % 256], axis=-1)
+        noise = rng.integers(0, 24, size=(height, width, 3))
+        path = os.path.join(directory, f"photo_{n}.jpg")
+        Image.fromarray((base + noise).clip(0, 255).astype("uint8")).save(path, quality=92)
+        paths.append(path)
+    return paths
+
+def decode_all(paths):
+    start = time.perf_counter()
+    for path in paths:
+        with Image.open(path) as image:
+            image.load()
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="bhms_images_")
+    try:
+        originals = make_photos(directory, args.photos, args.width, args.height)
+        store = os.path.join(directory, "store")
+
+        start = time.perf_counter()
+        stored = [process_profile_image(path, store) for path in originals]
+        processing = time.perf_counter() - start
+
+        start = time.perf_counter()
+        again = [process_profile_image(path, store) for path in originals]
+        reupload = time.perf_counter() - start
+
+        thumbnails = [thumbnail_for(path) for path in stored]
+        report = {
+            "photos": args.photos,
+            "processing_ms_per_photo": processing * 1000 / args.photos,
+            "reupload_ms_per_photo": reupload * 1000 / args.photos,
+            "deduplicated": again == stored,
+            "original_kb_avg": sum(map(os.path.getsize, originals)) / 1024 / args.photos,
+            "thumbnail_kb_avg": sum(map(os.path.getsize, thumbnails)) / 1024 / args.photos,
+            "table_decode_originals_s": decode_all(originals),
+            "table_decode_thumbnails_s": decode_all(thumbnails),
+        }
+        print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Payment posting stress test under contention.
+
+Many threads post payments to the same few tenants at once through
+PaymentService, the path every payments screen uses. Afterwards every
+tenant's materialized balance must equal both the amounts the threads
+posted and the sum of its ledger entries; tests/test_payment_contention.py
+asserts that. It creates and deletes rows, so it only runs against a
+scratch schema named by BOARDING_HOUSE_DB. Prints JSON.
+
+    BOARDING_HOUSE_DB=boarding_house_test python -m benchmarks.payment_contention_benchmark --threads 16
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from src.models.database import DATABASE_NAME, Database
+from src.models.ledger import PaymentLedger
+from src.models.occupancy import occupy
+from src.models.payment_service import get_payment_service
+from src.utils.money import Money, ZERO
+
+# The schema the app runs on; never written to by this script
+PRODUCTION_DATABASE = "boarding_house"
+
+class UnsafeDatabaseError(RuntimeError):
+    """Raised when the stress test would run against the app's own schema"""
+
+def require_scratch_database():
+    if DATABASE_NAME == PRODUCTION_DATABASE:
+        raise UnsafeDatabaseError(
+            "Set BOARDING_HOUSE_DB to a scratch schema; this test creates and deletes rows"
+        )
+
+def create_tenants(db, count):
+    """Create a throwaway room and tenants to post against"""
+    tag = uuid.uuid4().hex[:6]
+
+    def work(cursor):
+        cursor.execute(
+            "INSERT INTO rooms (room_number, capacity, price, status) VALUES (%s, %s, %s, 'Available')",
+            (f"B{tag}", count, Decimal("1000.00"))
+        )
+        room_id = cursor.lastrowid
+        tenant_ids = []
+        for i in range(count):
+            cursor.execute(
+                "INSERT INTO tenants (first_name, last_name, room_id) VALUES (%s, %s, %s)",
+                ("Bench", f"{tag}-{i}", room_id)
+            )
+            tenant_ids.append(cursor.lastrowid)
+            occupy(cursor, room_id, tenant_id=cursor.lastrowid)
+        return room_id, tenant_ids
+
+    return db.run_in_transaction(work)
+
+# Every table the generated tenants and room can leave rows in, children first
+CLEANUP_STATEMENTS = (
+    "DELETE FROM arrears_aging WHERE tenant_id IN ({ids})",
+    "DELETE FROM balances WHERE tenant_id IN ({ids})",
+    "DELETE FROM tenant_checkouts WHERE tenant_id IN ({ids})",
+    "DELETE FROM payment_transactions WHERE tenant_id IN ({ids}) AND reverses_transaction_id IS NOT NULL",
+    "DELETE FROM payment_transactions WHERE tenant_id IN ({ids})",
+    "DELETE FROM tenants WHERE tenant_id IN ({ids})",
+)
+
+def remove_tenants(db, room_id, tenant_ids):
+    ids = ", ".join(["%s"] * len(tenant_ids))
+    with db.transaction() as cursor:
+        for statement in CLEANUP_STATEMENTS:
+            cursor.execute(statement.format(ids=ids), tenant_ids)
+        cursor.execute("DELETE FROM room_occupancy_events WHERE room_id = %s", (room_id,))
+        cursor.execute("DELETE FROM room_occupancy_daily WHERE room_id = %s", (room_id,))
+        cursor.execute("DELETE FROM rooms WHERE room_id = %s", (room_id,))
+
+def run_contention(threads=16, postings=200, tenants=2, keep=False):
+    """Post concurrently and return a report; `report["mismatches"]` lists tenants whose totals disagree"""
+    require_scratch_database()
+    db = Database()
+    ledger = PaymentLedger()
+    service = get_payment_service()
+    room_id, tenant_ids = create_tenants(db, tenants)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        posted = defaultdict(lambda: ZERO)
+        latencies = []
+        for _ in range(postings):
+            tenant_id = rng.choice(tenant_ids)
+            amount = Money(rng.randint(1, 500_00))
+            start = time.perf_counter()
+            service.post_payment(tenant_id, amount, "Cash", "contention benchmark")
+            latencies.append(time.perf_counter() - start)
+            posted[tenant_id] += amount
+        return posted, latencies
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(worker, range(threads)))
+        elapsed = time.perf_counter() - start
+
+        expected = defaultdict(lambda: ZERO)
+        latencies = []
+        for posted, thread_latencies in results:
+            for tenant_id, amount in posted.items():
+                expected[tenant_id] += amount
+            latencies.extend(thread_latencies)
+        latencies.sort()
+
+        mismatches = []
+        for tenant_id in tenant_ids:
+            total_paid = ledger.get_balance(tenant_id)[1]
+            ledger_sum = Money.of(db.fetch_one(
+                "SELECT COALESCE(SUM(amount), 0) FROM payment_transactions WHERE tenant_id = %s",
+                (tenant_id,)
+            )[0])
+            if not (total_paid == ledger_sum == expected[tenant_id]):
+                mismatches.append({
+                    "tenant_id": tenant_id,
+                    "expected": str(expected[tenant_id]),
+                    "balance_total_paid": str(total_paid),
+                    "ledger_sum": str(ledger_sum),
+                })
+
+        total_postings = threads * postings
+        return {
+            "threads": threads,
+            "tenants": tenants,
+            "postings": total_postings,
+            "elapsed_s": elapsed,
+            "postings_per_s": total_postings / elapsed if elapsed else None,
+            "latency_p50_s": latencies[len(latencies) // 2],
+            "latency_p95_s": latencies[int(len(latencies) * 0.95) - 1],
+            "totals_exact": not mismatches,
+            "mismatches": mismatches,
+        }
+    finally:
+        if not keep:
+            remove_tenants(db, room_id, tenant_ids)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--postings", type=int, default=200, help="postings per thread")
+    parser.add_argument("--tenants", type=int, default=2, help="fewer tenants means more contention")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tenants and ledger rows")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_contention(args.threads, args.postings, args.tenants, args.keep)
+    except UnsafeDatabaseError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(json.dumps(report, indent=2))
+    return 1 if report["mismatches"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
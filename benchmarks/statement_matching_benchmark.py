@@ -0,0 +1,92 @@
+"""Statement parsing and matching benchmark.
+
+Generates a synthetic tenant list and a CSV statement where each line's
+true tenant is known, then times streaming and matching the file and checks
+that no line is matched to the wrong tenant. Needs no database. Prints JSON.
+
+    python -m benchmarks.statement_matching_benchmark --lines 50000 --tenants 2000
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from src.utils.statement_matching import StatementMatcher, read_statement, tenant_code
+
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Grace", "Paolo", "Liza", "Carlo", "Joy"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Aquino"]
+
+def make_tenants(count, rng):
+    tenants = []
+    for tenant_id in range(1, count + 1):
+        check_in = date(2024, 1, 1) + timedelta(days=rng.randint(0, 300))
+        price = Decimal(rng.choice((3500, 4000, 4500, 5000, 6000)))
+        tenants.append((
+            tenant_id, rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{tenant_id % 97}",
+            f"{tenant_id // 4 + 100}", check_in, None, price, price * rng.randint(0, 3)
+        ))
+    return tenants
+
+def make_statement(tenants, lines, rng):
+    """Return CSV text plus the true tenant of each line (None for noise)"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["Date", "Reference No.", "Name", "Amount"])
+    truth = []
+    for n in range(lines):
+        tenant = rng.choice(tenants)
+        tenant_id, first, last, room, check_in = tenant[:5]
+        day = (check_in + timedelta(days=rng.randint(0, 60))).strftime("%m/%d/%Y")
+        kind = rng.random()
+        if kind < 0.4:
+            row = [day, f"GC{n:08d} {tenant_code(tenant_id)}", f"{first} {last}", f"{tenant[6]:,.2f}"]
+        elif kind < 0.7:
+            row = [day, f"GC{n:08d}", f"{last}, {first}", f"{tenant[6]:.2f}"]
+        elif kind < 0.9:
+            row = [day, f"GC{n:08d} RM {room}", "", f"{tenant[6]:.2f}"]
+        else:
+            row, tenant_id = [day, f"GC{n:08d}", "Unknown Sender", f"{rng.randint(100, 9000)}.00"], None
+        writer.writerow(row)
+        truth.append(tenant_id)
+    return out.getvalue(), truth
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--tenants", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    tenants = make_tenants(args.tenants, rng)
+    text, truth = make_statement(tenants, args.lines, rng)
+
+    start = time.perf_counter()
+    matcher = StatementMatcher(tenants)
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [matcher.match(line) for line in read_statement(io.StringIO(text, newline=""), "GCash")]
+    match_time = time.perf_counter() - start
+
+    matched = sum(1 for r in results if r.tenant_id is not None)
+    wrong = sum(1 for r, expected in zip(results, truth) if r.tenant_id is not None and r.tenant_id != expected)
+    report = {
+        "lines": len(results),
+        "tenants": args.tenants,
+        "index_s": index_time,
+        "parse_and_match_s": match_time,
+        "lines_per_s": len(results) / match_time if match_time else None,
+        "matched": matched,
+        "queued_for_review": len(results) - matched,
+        "wrong_matches": wrong,
+    }
+    print(json.dumps(report, indent=2))
+    return 1 if wrong else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
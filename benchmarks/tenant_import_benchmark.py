@@ -0,0 +1,86 @@
+"""Tenant CSV import throughput.
+
+Writes a CSV of generated tenants spread over throwaway rooms, with a
+share of bad rows, and imports it through TenantImporter. Needs the MySQL
+database used by the app. Prints JSON.
+
+    python -m benchmarks.tenant_import_benchmark --rows 10000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from src.models.database import Database
+from src.models.tenant_import import TenantImporter
+
+def create_rooms(db, tag, count, capacity):
+    # room_number is VARCHAR(10): "T" + 4-character tag + 5-digit index
+    db.execute_many(
+        "INSERT INTO rooms (room_number, capacity, price, status) VALUES (%s, %s, %s, 'Available')",
+        [(f"T{tag}{i:05d}", capacity, Decimal("3000.00")) for i in range(count)]
+    )
+    return [f"T{tag}{i:05d}" for i in range(count)]
+
+def write_csv(path, tag, rows, room_numbers, bad_share, rng):
+    today = date.today()
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["First Name", "Last Name", "Email", "Phone", "Room", "Check-in", "Check-out"])
+        for i in range(rows):
+            check_in = today - timedelta(days=rng.randint(0, 700))
+            row = [
+                "Bench", f"{tag}-{i}", f"bench{i}@{tag}.example.com", f"0917{rng.randint(0, 9999999):07d}",
+                room_numbers[i % len(room_numbers)], check_in.isoformat(),
+                (check_in + timedelta(days=rng.randint(30, 365))).isoformat() if rng.random() < 0.3 else ""
+            ]
+            if rng.random() < bad_share:
+                # One kind of mistake per bad row
+                field = rng.choice([2, 4, 5])
+                row[field] = {2: "not-an-email", 4: "NOROOM", 5: "31/31/2024"}[field]
+            writer.writerow(row)
+
+def remove_rows(db, tag):
+    with db.transaction() as cursor:
+        cursor.execute("DELETE FROM tenants WHERE first_name = 'Bench' AND last_name LIKE %s", (f"{tag}-%",))
+        cursor.execute("""
+            DELETE e FROM room_occupancy_events e
+            JOIN rooms r ON r.room_id = e.room_id
+            WHERE r.room_number LIKE %s
+        """, (f"T{tag}%",))
+        cursor.execute("DELETE FROM rooms WHERE room_number LIKE %s", (f"T{tag}%",))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--capacity", type=int, default=4, help="places per generated room")
+    parser.add_argument("--bad-share", type=float, default=0.02, help="fraction of rows with a mistake")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the generated rooms and tenants")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    db = Database()
+    tag = uuid.uuid4().hex[:4]
+    room_numbers = create_rooms(db, tag, -(-args.rows // args.capacity), args.capacity)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tenants.csv")
+        write_csv(path, tag, args.rows, room_numbers, args.bad_share, rng)
+        try:
+            report = TenantImporter(args.chunk_size).run(path, skip_invalid=True)
+            report["error_report"] = os.path.basename(report["error_report"]) if report["error_report"] else None
+            print(json.dumps(report, indent=2))
+            return 0
+        finally:
+            if not args.keep:
+                remove_rows(db, tag)
+
+if __name__ == "__main__":
+    sys.exit(main())
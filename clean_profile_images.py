@@ -0,0 +1,14 @@
+import argparse
+from src.models.image_gc import GRACE_HOURS, ImageCollector
+
+if __name__ == '__main__':
+    # Also runs nightly from the scheduler in quarantine mode
+    parser = argparse.ArgumentParser(description="Remove tenant profile images that no tenant references")
+    parser.add_argument("--grace-hours", type=float, default=GRACE_HOURS,
+                        help="leave files modified more recently than this alone")
+    parser.add_argument("--delete", action="store_true", help="delete orphans instead of quarantining them")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    args = parser.parse_args()
+    report = ImageCollector(grace_hours=args.grace_hours).run(quarantine=not args.delete, dry_run=args.dry_run)
+    for key, value in report.items():
+        print(f"{key}: {value}")
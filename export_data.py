@@ -0,0 +1,14 @@
+import argparse
+from src.models.exports import EXPORTS, ExportJob, ExportQueue
+
+def export_data(name, path):
+    job = ExportQueue().run(ExportJob(name, path))
+    if job.status == "Failed":
+        raise SystemExit(f"Export failed: {job.error}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream a table to a CSV or Excel file")
+    parser.add_argument("export", choices=sorted(EXPORTS))
+    parser.add_argument("path", help="output file; .csv or .xlsx")
+    args = parser.parse_args()
+    export_data(args.export, args.path)
@@ -0,0 +1,34 @@
+import argparse
+import json
+from src.models.statement_import import StatementImporter
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import a GCash or bank CSV statement as tenant payments")
+    parser.add_argument("path", nargs="?", help="CSV statement file")
+    parser.add_argument("--method", default="GCash", choices=["GCash", "Bank Transfer", "Maya"])
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per bulk insert")
+    review = parser.add_mutually_exclusive_group()
+    review.add_argument("--list-reviews", action="store_true", help="list lines waiting for review")
+    review.add_argument("--resolve", nargs=2, type=int, metavar=("REVIEW_ID", "TENANT_ID"),
+                        help="post a queued line to a tenant")
+    review.add_argument("--dismiss", type=int, metavar="REVIEW_ID", help="dismiss a queued line")
+    args = parser.parse_args()
+
+    importer = StatementImporter(args.chunk_size)
+    if args.list_reviews:
+        for review_id, txn_date, reference, payer_name, amount, method, reason, candidates in importer.pending_reviews():
+            print(f"{review_id}\t{txn_date}\t{reference}\t{payer_name}\t{amount}\t{method}\t{reason}"
+                  + (f"\tcandidates: {candidates}" if candidates else ""))
+    elif args.resolve:
+        review_id, tenant_id = args.resolve
+        posting = importer.resolve_review(review_id, tenant_id)
+        print(f"Review {review_id} posted to tenant {tenant_id} as transaction {posting.transaction_id}")
+    elif args.dismiss:
+        if importer.dismiss_review(args.dismiss):
+            print(f"Review {args.dismiss} dismissed")
+        else:
+            print(f"Review {args.dismiss} is not pending")
+    elif args.path:
+        print(json.dumps(importer.run(args.path, args.method), indent=2))
+    else:
+        parser.error("a statement file or a review option is required")
@@ -0,0 +1,14 @@
+import argparse
+import json
+from src.models.tenant_import import TenantImporter
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import tenants from a CSV file")
+    parser.add_argument("path", help="CSV with first name, last name and optional email, phone, room, check-in and check-out columns")
+    parser.add_argument("--errors", help="where to write the per-row error report (default <file>_errors.csv)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per validation chunk and bulk insert")
+    parser.add_argument("--skip-invalid", action="store_true", help="import the valid rows even if some are rejected")
+    parser.add_argument("--dry-run", action="store_true", help="validate and write the error report only")
+    args = parser.parse_args()
+    report = TenantImporter(args.chunk_size).run(args.path, args.errors, args.skip_invalid, args.dry_run)
+    print(json.dumps(report, indent=2))
@@ -2,11 +2,12 @@ import flet as ft
 from flet_core import *
 from flet_core.icons import *
 from src.models.database import Database
+from src.models.scheduler import get_scheduler
 from src.views.rooms.rooms_view import RoomsView
 from src.views.tenants.tenants_view import TenantsView
 from src.views.payments.payments_view import PaymentsView
 from src.views.settings.settings_view import SettingsView
-from src.views.chatbot.chatbot_view import get_chatbot_view
+from src.views.chatbot.chatbot_view import flush_chat_store, get_chatbot_view
 from src.auth import LoginPage, SignupPage
 
 def main(page: ft.Page):
@@ -18,6 +19,9 @@ def main(page: ft.Page):
     db.create_tables()
     print("Tables created successfully")
     
+    # Start recurring jobs (billing, late fees, reminders, aging rebuild)
+    get_scheduler().start()
+    
     # Page setup
     page.title = "Boarding House Management System"
     page.theme_mode = ft.ThemeMode.DARK
@@ -123,6 +127,8 @@ def main(page: ft.Page):
     
     def route_change(e):
         print(f"Route changed to: {e.route}")
+        # Leaving the chatbot tears its view down; save what it still buffers
+        flush_chat_store(page)
         page.views.clear()
         
         if e.route == "/login":
@@ -243,6 +249,27 @@ def main(page: ft.Page):
                     [main_layout]
                 )
             )
+        elif "/rooms/availability" in e.route:
+            page.views.append(
+                ft.View(
+                    "/rooms",
+                    [main_layout]
+                )
+            )
+        elif "/rooms/bulk" in e.route:
+            page.views.append(
+                ft.View(
+                    "/rooms",
+                    [main_layout]
+                )
+            )
+        elif "/rooms/analytics" in e.route:
+            page.views.append(
+                ft.View(
+                    "/rooms",
+                    [main_layout]
+                )
+            )
         elif "/tenants/add" in e.route:
             page.views.append(
                 ft.View(
@@ -294,6 +321,9 @@ def main(page: ft.Page):
     page.on_route_change = route_change
     page.on_view_pop = view_pop
     
+    # Persist any buffered chat messages when the session ends
+    page.on_disconnect = lambda e: flush_chat_store(page)
+    
     # Start with login page
     page.go("/login")
     
@@ -0,0 +1,12 @@
+import argparse
+import time
+from src.models.profile_images import migrate_profile_images
+
+if __name__ == '__main__':
+    # One-off; the originals are left for clean_profile_images.py to remove
+    parser = argparse.ArgumentParser(description="Convert stored tenant photos into thumbnail and detail images")
+    parser.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    converted, failed = migrate_profile_images(args.workers)
+    print(f"Converted {converted} images ({failed} failed) in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,26 @@
+import argparse
+import json
+from src.models.room_provisioning import RoomProvisioner
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create many rooms at once from a pattern or a CSV file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pattern", help="room numbers, e.g. 2[01-40] or [1-3][01-20]")
+    source.add_argument("--csv", help="CSV with room number, capacity, price and optional status columns")
+    parser.add_argument("--capacity", type=int, help="capacity of every room in --pattern")
+    parser.add_argument("--price", help="monthly price of every room in --pattern")
+    parser.add_argument("--status", default="Available", choices=["Available", "Maintenance"])
+    parser.add_argument("--skip-invalid", action="store_true", help="create the valid rooms even if some are rejected")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args()
+
+    provisioner = RoomProvisioner()
+    if args.pattern:
+        if args.capacity is None or args.price is None:
+            parser.error("--pattern needs --capacity and --price")
+        report = provisioner.from_pattern(
+            args.pattern, args.capacity, args.price, args.status, args.skip_invalid, args.dry_run
+        )
+    else:
+        report = provisioner.from_csv(args.csv, args.skip_invalid, args.dry_run)
+    print(json.dumps(report, indent=2, default=str))
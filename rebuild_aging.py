@@ -0,0 +1,19 @@
+import argparse
+import time
+from datetime import date
+from src.models.aging import AgingReport
+
+def rebuild_aging(as_of=None):
+    start = time.perf_counter()
+    tenants = AgingReport().rebuild(as_of)
+    print(f"Rebuilt arrears aging for {tenants} tenants in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    # Meant to be scheduled nightly (cron or Task Scheduler); also moves balances into older buckets
+    parser = argparse.ArgumentParser(description="Recompute the arrears aging summary from the ledger")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="age balances as of this date (YYYY-MM-DD)")
+    parser.add_argument("--export", help="also write the report to this CSV file")
+    args = parser.parse_args()
+    rebuild_aging(args.as_of)
+    if args.export:
+        print(f"Exported {AgingReport().export_csv(args.export)} tenants to {args.export}")
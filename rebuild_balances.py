@@ -0,0 +1,24 @@
+import argparse
+import time
+from src.models.ledger import PaymentLedger
+
+def rebuild_balances(migrate_legacy=False):
+    ledger = PaymentLedger()
+
+    if migrate_legacy:
+        migrated = ledger.migrate_legacy_payments()
+        print(f"Migrated {migrated} legacy payment rows into the ledger")
+
+    start = time.perf_counter()
+    tenants = ledger.rebuild_balances()
+    print(f"Rebuilt balances for {tenants} tenants in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Re-derive tenant balances from the payment ledger")
+    parser.add_argument(
+        "--migrate-legacy",
+        action="store_true",
+        help="first copy amounts from the old payments table for tenants with no ledger entries"
+    )
+    args = parser.parse_args()
+    rebuild_balances(args.migrate_legacy)
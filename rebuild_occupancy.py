@@ -0,0 +1,8 @@
+import time
+from src.models.occupancy import rebuild_occupancy
+
+if __name__ == '__main__':
+    # Repairs the counters after tenants were changed outside the app
+    start = time.perf_counter()
+    rooms = rebuild_occupancy()
+    print(f"Recounted occupancy ({rooms} rooms corrected) in {time.perf_counter() - start:.2f}s")
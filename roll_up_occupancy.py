@@ -0,0 +1,11 @@
+import argparse
+from datetime import date
+from src.models.occupancy_history import OccupancyRollup
+
+if __name__ == '__main__':
+    # The scheduler runs this nightly; run by hand to catch up after downtime.
+    # The first run backfills past days with each room's current capacity and status.
+    parser = argparse.ArgumentParser(description="Roll room occupancy events up into the daily history")
+    parser.add_argument("--through", type=date.fromisoformat, help="last day to roll up (YYYY-MM-DD); default yesterday")
+    args = parser.parse_args()
+    OccupancyRollup().run(args.through)
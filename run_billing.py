@@ -0,0 +1,25 @@
+import argparse
+import json
+from src.models.billing_run import BillingRun, current_period, parse_period
+
+def periods_between(first, last):
+    start, _ = parse_period(first)
+    end, _ = parse_period(last)
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def run_billing(first_period, last_period=None, batch_size=500):
+    reports = []
+    for period in periods_between(first_period, last_period or first_period):
+        reports.append(BillingRun(period, batch_size=batch_size).run())
+    return reports
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate rent invoices for one or more billing periods")
+    parser.add_argument("period", nargs="?", default=current_period(), help="billing period as YYYY-MM")
+    parser.add_argument("--through", help="also bill every period up to this one (YYYY-MM), e.g. to backfill")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run_billing(args.period, args.through, args.batch_size), indent=2))
@@ -0,0 +1,24 @@
+import argparse
+import json
+from src.models.scheduler import Scheduler
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run scheduled jobs (rent accrual, late fees, reminders, aging) without the UI")
+    parser.add_argument("--once", action="store_true", help="run whatever is due now and exit")
+    parser.add_argument("--run-now", metavar="JOB", help="make a job due immediately")
+    parser.add_argument("--status", action="store_true", help="print per-job metrics and exit")
+    parser.add_argument("--poll-interval", type=int, default=30)
+    args = parser.parse_args()
+
+    scheduler = Scheduler(poll_interval=args.poll_interval)
+    scheduler.register()
+    if args.run_now:
+        scheduler.run_now(args.run_now)
+    if args.status:
+        columns = ["name", "runs", "failures", "misfires", "last_status", "last_run_at", "last_ms",
+                   "avg_ms", "max_ms", "next_run_at", "locked_by"]
+        print(json.dumps([dict(zip(columns, row)) for row in scheduler.metrics()], indent=2, default=str))
+    elif args.once:
+        print(f"Ran: {', '.join(scheduler.run_pending()) or 'nothing due'}")
+    else:
+        scheduler.run_forever()
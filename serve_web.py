@@ -0,0 +1,22 @@
+"""Serve the app to browsers.
+
+    uvicorn serve_web:app --host 0.0.0.0 --port 8550
+
+Needs Flet's web extras (FastAPI and uvicorn). Assets are served from
+src/assets. Tenant avatars are stored under content-hash names, so they
+are sent with a year-long immutable Cache-Control and repeat visits load
+them from the browser cache without any request at all.
+"""
+import os
+import flet.fastapi as flet_fastapi
+from main import main
+from src.utils.images import ASSETS_DIR, cache_control
+
+app = flet_fastapi.app(main, assets_dir=os.path.abspath(ASSETS_DIR))
+
+@app.middleware("http")
+async def cache_images(request, call_next):
+    response = await call_next(request)
+    if request.url.path.startswith("/images/") and response.status_code in (200, 304):
+        response.headers["Cache-Control"] = cache_control(request.url.path)
+    return response
@@ -0,0 +1,164 @@
+import csv
+from datetime import date
+from src.models.database import Database
+from src.utils.money import Money
+
+# (label, column, lowest age in days, highest age in days)
+BUCKETS = (
+    ("0-30 days", "days_0_30", 0, 30),
+    ("31-60 days", "days_31_60", 31, 60),
+    ("61-90 days", "days_61_90", 61, 90),
+    ("90+ days", "days_over_90", 91, None),
+)
+
+def _bucket_sum(low, high):
+    condition = f"age_days >= {low}" + (f" AND age_days <= {high}" if high is not None else "")
+    return f"SUM(CASE WHEN {condition} THEN unpaid ELSE 0 END)"
+
+# Payments settle the oldest charges first, so a tenant's outstanding balance
+# is made up of their newest charges: walk charges newest to oldest and take
+# from each until the balance is used up. Reversed charges are ignored.
+# Rent is aged from its invoice's due date, not the day it was posted, so a
+# late or backfilled billing run doesn't make old arrears look new; rent
+# charges are matched to invoices by billing_run.rent_description
+# ("Rent for YYYY-MM"). Other charges are aged from the day they were posted.
+# One row per charge with its unpaid part; `{where}` filters the ledger (pt).
+OUTSTANDING_CHARGES_QUERY = """
+    SELECT c.tenant_id, c.invoice_id, c.charged_on,
+           GREATEST(0, LEAST(c.amount, b.balance - (c.running_total - c.amount))) AS unpaid
+    FROM (
+        SELECT pt.tenant_id, pt.amount, i.invoice_id, COALESCE(i.due_date, DATE(pt.posted_at)) AS charged_on,
+               SUM(pt.amount) OVER (
+                   PARTITION BY pt.tenant_id
+                   ORDER BY COALESCE(i.due_date, DATE(pt.posted_at)) DESC, pt.transaction_id DESC
+               ) AS running_total
+        FROM payment_transactions pt
+        LEFT JOIN payment_transactions r ON r.reverses_transaction_id = pt.transaction_id
+        LEFT JOIN invoices i
+               ON i.tenant_id = pt.tenant_id
+              AND pt.entry_type = 'Charge'
+              AND pt.description LIKE 'Rent for %%'
+              AND i.period = SUBSTRING(pt.description, 10)
+        WHERE pt.entry_type IN ('Charge', 'Adjustment')
+          AND pt.amount > 0
+          AND pt.reverses_transaction_id IS NULL
+          AND r.transaction_id IS NULL
+          AND {where}
+    ) c
+    JOIN balances b ON b.tenant_id = c.tenant_id
+    WHERE b.balance > 0
+"""
+
+REFRESH_AGING_QUERY = """
+    INSERT INTO arrears_aging (
+        tenant_id, {columns}, total_due, oldest_charge_date, as_of
+    )
+    SELECT tenant_id, {sums}, SUM(unpaid), MIN(CASE WHEN unpaid > 0 THEN charged_on END), %s
+    FROM (
+        SELECT tenant_id, charged_on, DATEDIFF(%s, charged_on) AS age_days, unpaid
+        FROM ({outstanding}) outstanding
+    ) aged
+    GROUP BY tenant_id
+""".format(
+    columns=", ".join(column for _, column, _, _ in BUCKETS),
+    sums=", ".join(_bucket_sum(low, high) for _, _, low, high in BUCKETS),
+    outstanding=OUTSTANDING_CHARGES_QUERY,
+)
+
+class AgingReport:
+    """Arrears aging backed by the arrears_aging summary table.
+
+    Ledger writes refresh the rows of the tenants they touch in the same
+    transaction; `rebuild` recomputes every row and is meant to run nightly,
+    which also moves balances into older buckets as days pass. Reading the
+    report is a plain scan of one row per tenant in arrears.
+    """
+
+    # Tenant ids per refresh statement, to keep IN lists bounded
+    CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self.db = Database()
+
+    def refresh(self, cursor, tenant_ids, as_of=None):
+        """Recompute aging rows for the given tenants inside the caller's transaction"""
+        as_of = as_of or date.today()
+        tenant_ids = sorted(set(tenant_ids))
+        for start in range(0, len(tenant_ids), self.CHUNK_SIZE):
+            chunk = tenant_ids[start:start + self.CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM arrears_aging WHERE tenant_id IN ({placeholders})", chunk)
+            cursor.execute(
+                REFRESH_AGING_QUERY.format(where=f"pt.tenant_id IN ({placeholders})"),
+                (as_of, as_of, *chunk)
+            )
+
+    def refresh_range(self, cursor, first_tenant_id, last_tenant_id, as_of=None):
+        """Recompute aging rows for tenant_id in (first_tenant_id, last_tenant_id]"""
+        as_of = as_of or date.today()
+        cursor.execute(
+            "DELETE FROM arrears_aging WHERE tenant_id > %s AND tenant_id <= %s",
+            (first_tenant_id, last_tenant_id)
+        )
+        cursor.execute(
+            REFRESH_AGING_QUERY.format(where="pt.tenant_id > %s AND pt.tenant_id <= %s"),
+            (as_of, as_of, first_tenant_id, last_tenant_id)
+        )
+
+    def rebuild(self, as_of=None):
+        """Recompute the whole table; returns the number of tenants in arrears"""
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM arrears_aging")
+            cursor.execute(
+                REFRESH_AGING_QUERY.format(where="1 = 1"),
+                (as_of or date.today(), as_of or date.today())
+            )
+            return cursor.rowcount
+
+    def is_stale(self, as_of=None):
+        """True if some rows were last computed before `as_of` (default today)"""
+        return self.db.fetch_one(
+            "SELECT 1 FROM arrears_aging WHERE as_of < %s LIMIT 1",
+            (as_of or date.today(),)
+        ) is not None
+
+    def fetch_rows(self):
+        """Return one row per tenant in arrears, largest overdue amounts first.
+
+        Bucket amounts and the total due are Money.
+        """
+        rows = self.db.fetch_all(f"""
+            SELECT a.tenant_id, t.first_name, t.last_name, r.room_number,
+                   {", ".join("a." + column for _, column, _, _ in BUCKETS)},
+                   a.total_due, a.oldest_charge_date, a.as_of
+            FROM arrears_aging a
+            JOIN tenants t ON t.tenant_id = a.tenant_id
+            LEFT JOIN rooms r ON r.room_id = t.room_id
+            WHERE a.total_due > 0
+            ORDER BY a.days_over_90 DESC, a.days_61_90 DESC, a.days_31_60 DESC, a.total_due DESC
+        """)
+        return [row[:4] + tuple(Money.of(amount) for amount in row[4:9]) + row[9:] for row in rows]
+
+    def totals(self):
+        """Return the per-bucket totals followed by the overall total due"""
+        row = self.db.fetch_one(f"""
+            SELECT {", ".join(f"COALESCE(SUM({column}), 0)" for _, column, _, _ in BUCKETS)},
+                   COALESCE(SUM(total_due), 0)
+            FROM arrears_aging
+        """)
+        return tuple(Money.of(amount) for amount in row) if row else (Money(0),) * (len(BUCKETS) + 1)
+
+    def export_csv(self, path):
+        """Write the report to a CSV file; returns the number of tenants written"""
+        rows = self.fetch_rows()
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ["Tenant ID", "First Name", "Last Name", "Room"]
+                + [label for label, _, _, _ in BUCKETS]
+                + ["Total Due", "Oldest Unpaid Charge", "As Of"]
+            )
+            writer.writerows(
+                row[:4] + tuple(f"{amount:.2f}" for amount in row[4:9]) + row[9:] for row in rows
+            )
+        return len(rows)
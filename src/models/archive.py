@@ -0,0 +1,199 @@
+import time
+from collections import namedtuple
+from src.models.database import Database
+from src.models.occupancy import release_tenant
+from src.models.payment_service import get_payment_service
+from src.utils.money import Money
+
+# Tenants are archived once they have been gone this long with nothing owed
+ARCHIVE_AFTER_MONTHS = 12
+
+ARCHIVE_CANDIDATES_QUERY = """
+    SELECT t.tenant_id
+    FROM tenants t
+    LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+    WHERE t.tenant_id > %s
+      AND t.check_out_date < CURDATE() - INTERVAL %s MONTH
+      AND COALESCE(b.balance, 0) = 0
+    ORDER BY t.tenant_id
+    LIMIT %s
+"""
+
+# Copied into the archive first; {ids} is the batch's placeholders
+ARCHIVE_COPIES = (
+    """
+    INSERT INTO tenants_archive (
+        tenant_id, first_name, last_name, email, phone, room_id, check_in_date, check_out_date,
+        profile_image, monthly_rate, total_amount, balance, total_charged, total_paid
+    )
+    SELECT t.tenant_id, t.first_name, t.last_name, t.email, t.phone, t.room_id, t.check_in_date,
+           t.check_out_date, t.profile_image, t.monthly_rate, t.total_amount, t.balance,
+           COALESCE(b.total_charged, 0), COALESCE(b.total_paid, 0)
+    FROM tenants t
+    LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+    WHERE t.tenant_id IN ({ids})
+    """,
+    """
+    INSERT INTO payments_archive (
+        payment_id, tenant_id, amount_rent, amount_paid, balance, payment_date, payment_method, status, description
+    )
+    SELECT payment_id, tenant_id, amount_rent, amount_paid, balance, payment_date, payment_method, status, description
+    FROM payments WHERE tenant_id IN ({ids})
+    """,
+    """
+    INSERT INTO payment_transactions_archive (
+        transaction_id, tenant_id, entry_type, amount, payment_method, description,
+        reverses_transaction_id, idempotency_key, posted_at
+    )
+    SELECT transaction_id, tenant_id, entry_type, amount, payment_method, description,
+           reverses_transaction_id, idempotency_key, posted_at
+    FROM payment_transactions WHERE tenant_id IN ({ids})
+    """,
+    """
+    INSERT INTO invoices_archive (invoice_id, tenant_id, period, amount, due_date, run_id, created_at)
+    SELECT invoice_id, tenant_id, period, amount, due_date, run_id, created_at
+    FROM invoices WHERE tenant_id IN ({ids})
+    """,
+)
+
+# Children before parents
+ARCHIVE_DELETES = (
+    # Reviews keep their transaction_id, which now points into the archive
+    "UPDATE statement_review_queue SET tenant_id = NULL WHERE tenant_id IN ({ids})",
+    "DELETE FROM payment_reminders WHERE tenant_id IN ({ids})",
+    "DELETE FROM arrears_aging WHERE tenant_id IN ({ids})",
+    "DELETE FROM balances WHERE tenant_id IN ({ids})",
+    "DELETE FROM invoices WHERE tenant_id IN ({ids})",
+    # A reversal references the entry it reverses, so reversals go first
+    "DELETE FROM payment_transactions WHERE tenant_id IN ({ids}) AND reverses_transaction_id IS NOT NULL",
+    "DELETE FROM payment_transactions WHERE tenant_id IN ({ids})",
+    "DELETE FROM payments WHERE tenant_id IN ({ids})",
+    "DELETE FROM tenants WHERE tenant_id IN ({ids})",
+)
+
+ArchivedTenant = namedtuple("ArchivedTenant", [
+    "tenant_id", "first_name", "last_name", "email", "phone", "check_in_date", "check_out_date",
+    "total_charged", "total_paid", "archived_at"
+])
+
+class TenantArchiver:
+    """Moves long-gone, settled tenants and their payment records to the archive tables.
+
+    Tenants are moved in chunks of `chunk_size`, one transaction per chunk,
+    so a large first run never holds locks for long and can be stopped and
+    restarted at any point. Occupancy history and check-out records stay
+    where they are.
+    """
+
+    def __init__(self, months=ARCHIVE_AFTER_MONTHS, chunk_size=500):
+        self.db = Database()
+        self.months = months
+        self.chunk_size = chunk_size
+
+    def candidates(self, after_tenant_id=0, limit=None):
+        return [row[0] for row in self.db.fetch_all(
+            ARCHIVE_CANDIDATES_QUERY, (after_tenant_id, self.months, limit or self.chunk_size)
+        )]
+
+    def _archive_chunk(self, tenant_ids):
+        ids = ", ".join(["%s"] * len(tenant_ids))
+
+        def work(cursor):
+            # Re-check under lock: a payment may have landed since the chunk was picked
+            cursor.execute(f"""
+                SELECT t.tenant_id, t.room_id
+                FROM tenants t
+                LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+                WHERE t.tenant_id IN ({ids})
+                  AND t.check_out_date < CURDATE() - INTERVAL %s MONTH
+                  AND COALESCE(b.balance, 0) = 0
+                ORDER BY t.tenant_id
+                FOR UPDATE
+            """, (*tenant_ids, self.months))
+            rows = cursor.fetchall()
+            if not rows:
+                return 0
+            archived = [row[0] for row in rows]
+            placeholders = ", ".join(["%s"] * len(archived))
+            for statement in ARCHIVE_COPIES:
+                cursor.execute(statement.format(ids=placeholders), archived)
+            # Tenants checked out before batch check-out existed may still hold
+            # a place; the archive copy keeps their room
+            for tenant_id, room_id in sorted(rows, key=lambda row: (row[1] or 0, row[0])):
+                if room_id:
+                    release_tenant(cursor, tenant_id)
+            for statement in ARCHIVE_DELETES:
+                cursor.execute(statement.format(ids=placeholders), archived)
+            return len(archived)
+
+        return self.db.run_in_transaction(work)
+
+    def run(self, dry_run=False):
+        """Archive every eligible tenant; returns a report"""
+        start = time.perf_counter()
+        archived = 0
+        chunks = 0
+        last_tenant_id = 0
+        while True:
+            tenant_ids = self.candidates(last_tenant_id)
+            if not tenant_ids:
+                break
+            last_tenant_id = tenant_ids[-1]
+            chunks += 1
+            archived += len(tenant_ids) if dry_run else self._archive_chunk(tenant_ids)
+
+        if archived and not dry_run:
+            get_payment_service().invalidate()
+        elapsed = time.perf_counter() - start
+        report = {
+            "months": self.months,
+            "archived": archived,
+            "chunks": chunks,
+            "dry_run": dry_run,
+            "elapsed_s": elapsed,
+        }
+        print(f"Archived {archived} tenants checked out over {self.months} months ago "
+              f"in {chunks} chunks ({elapsed:.2f}s)" + (" [dry run]" if dry_run else ""))
+        return report
+
+class ArchiveSearch:
+    """Lookups in the archive tables.
+
+    This is the slow path: name and email are matched with LIKE over the
+    whole archive, which is fine for the occasional lookup of a past tenant
+    but is kept off every screen that lists current tenants.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def search(self, term, limit=50):
+        """Archived tenants whose name, email or phone contains `term`, most recently archived first"""
+        pattern = f"%{(term or '').strip()}%"
+        rows = self.db.fetch_all("""
+            SELECT tenant_id, first_name, last_name, email, phone, check_in_date, check_out_date,
+                   total_charged, total_paid, archived_at
+            FROM tenants_archive
+            WHERE CONCAT_WS(' ', first_name, last_name) LIKE %s
+               OR CONCAT_WS(' ', last_name, first_name) LIKE %s
+               OR email LIKE %s
+               OR phone LIKE %s
+            ORDER BY archived_at DESC, tenant_id DESC
+            LIMIT %s
+        """, (pattern, pattern, pattern, pattern, limit))
+        return [
+            ArchivedTenant(*row[:7], Money.of(row[7]), Money.of(row[8]), row[9])
+            for row in rows
+        ]
+
+    def history(self, tenant_id):
+        """An archived tenant's ledger entries, oldest first"""
+        return self.db.fetch_all("""
+            SELECT transaction_id, posted_at, entry_type, amount, payment_method, description
+            FROM payment_transactions_archive
+            WHERE tenant_id = %s
+            ORDER BY transaction_id
+        """, (tenant_id,))
+
+def archive_tenants():
+    return TenantArchiver().run()["archived"]
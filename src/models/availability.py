@@ -0,0 +1,78 @@
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import groupby
+from src.models.database import Database
+from src.utils.money import Money
+from src.utils.room_specs import MAX_PRICE
+
+RoomMatch = namedtuple("RoomMatch", ["room_id", "room_number", "capacity", "price", "free_places", "peak_occupancy"])
+
+# Candidate rooms come from a range scan of idx_rooms_search
+# (status, capacity, price); their stays from idx_tenants_stay
+# (room_id, check_in_date, check_out_date), which answers "stays in this
+# room that start before the window ends" as one index range per room. A
+# tenant occupies the room through the check-out date and a missing
+# check-out means the stay is open-ended.
+AVAILABILITY_QUERY = """
+    SELECT r.room_id, r.room_number, r.capacity, r.price, t.tenant_id, t.check_in_date, t.check_out_date
+    FROM rooms r
+    LEFT JOIN tenants t
+           ON t.room_id = r.room_id
+          AND (t.check_in_date IS NULL OR t.check_in_date < %s)
+          AND (t.check_out_date IS NULL OR t.check_out_date >= %s)
+    WHERE r.status IN ('Available', 'Occupied')
+      AND r.capacity >= %s
+      AND r.price BETWEEN %s AND %s
+    ORDER BY r.room_id
+"""
+
+# Window end used for open-ended searches ("free from next month")
+FOREVER = date(9999, 12, 31)
+
+def peak_occupancy(stays, start, end):
+    """Most tenants in the room on any one day of [start, end), by a sweep over stay boundaries"""
+    events = []
+    for check_in, check_out in stays:
+        events.append((max(check_in or start, start), 1))
+        if check_out is not None and check_out + timedelta(days=1) < end:
+            events.append((check_out + timedelta(days=1), -1))
+    # At the same date departures are applied before arrivals
+    events.sort(key=lambda event: (event[0], event[1]))
+    peak = current = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+class AvailabilitySearch:
+    """Finds rooms with enough free places over a date window.
+
+    Maintenance rooms are never offered; Occupied rooms are, since they may
+    free up before the window starts. Matches are ranked by fit: fewest
+    spare places left after the booking, then price.
+    """
+
+    def __init__(self):
+        self.db = Database()
+
+    def search(self, beds=1, min_price=None, max_price=None, start=None, end=None, limit=20):
+        """Rooms with at least `beds` free places on every day from `start` (default today)
+        up to but excluding `end` (default open-ended); returns ranked RoomMatch rows"""
+        start = start or date.today()
+        end = end or FOREVER
+        if end <= start:
+            raise ValueError("The end date must be after the start date")
+        low = Money.of(min_price if min_price is not None else 0).to_decimal()
+        high = Money.of(max_price).to_decimal() if max_price is not None else MAX_PRICE
+
+        rows = self.db.fetch_all(AVAILABILITY_QUERY, (end, start, beds, low, high))
+        matches = []
+        for (room_id, room_number, capacity, price), room_rows in groupby(rows, key=lambda row: row[:4]):
+            stays = [(row[5], row[6]) for row in room_rows if row[4] is not None]
+            peak = peak_occupancy(stays, start, end)
+            free = capacity - peak
+            if free >= beds:
+                matches.append(RoomMatch(room_id, room_number, capacity, Money.of(price), free, peak))
+
+        matches.sort(key=lambda match: (match.free_places - beds, match.price, match.room_number))
+        return matches[:limit]
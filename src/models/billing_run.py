@@ -0,0 +1,169 @@
+import time
+from datetime import date, timedelta
+from src.models.aging import AgingReport
+from src.models.database import Database
+from src.models.ledger import PaymentLedger
+from src.models.payment_service import get_payment_service
+from src.utils.billing import period_rent_cents
+from src.utils.money import from_cents, to_cents
+
+def parse_period(period):
+    """Return the first and last day of a 'YYYY-MM' billing period"""
+    year, month = (int(part) for part in period.split("-"))
+    start = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return start, next_month - timedelta(days=1)
+
+def current_period(today=None):
+    return (today or date.today()).strftime("%Y-%m")
+
+def rent_description(period):
+    return f"Rent for {period}"
+
+class BillingRun:
+    """Generates one rent invoice per active tenant for a billing period.
+
+    Invoice amounts come from the shared rent engine (src/utils/billing.py):
+    months are counted from the check-in day of month, so a tenant is
+    invoiced for a period only if a new month of their stay starts by its
+    last day and before check-out.
+
+    Tenants are processed in ascending tenant_id batches. Each batch inserts
+    its invoices, posts the matching ledger charges, updates balances and
+    advances the run checkpoint in a single transaction, so a crashed run
+    resumes from the last committed batch. Invoices are unique per tenant
+    and period, so re-running a period never bills a tenant twice.
+    """
+
+    def __init__(self, period=None, batch_size=500, due_day=5):
+        self.db = Database()
+        self.ledger = PaymentLedger()
+        self.aging = AgingReport()
+        self.period = period or current_period()
+        self.period_start, self.period_end = parse_period(self.period)
+        self.batch_size = batch_size
+        self.due_date = self.period_start + timedelta(days=due_day - 1)
+
+    def _start(self):
+        """Create or resume the run for this period; returns (run_id, status, last_tenant_id)"""
+        self.db.execute(
+            "INSERT IGNORE INTO billing_runs (period) VALUES (%s)",
+            (self.period,)
+        )
+        return self.db.fetch_one(
+            "SELECT run_id, status, last_tenant_id FROM billing_runs WHERE period = %s",
+            (self.period,)
+        )
+
+    def _next_batch_end(self, after_tenant_id):
+        row = self.db.fetch_one("""
+            SELECT MAX(tenant_id) FROM (
+                SELECT tenant_id FROM tenants
+                WHERE tenant_id > %s
+                ORDER BY tenant_id
+                LIMIT %s
+            ) AS batch
+        """, (after_tenant_id, self.batch_size))
+        return row[0] if row else None
+
+    def _bill_batch(self, run_id, first_tenant_id, last_tenant_id):
+        """Invoice, charge and checkpoint one tenant_id range; returns invoices created"""
+        description = rent_description(self.period)
+        with self.db.transaction() as cursor:
+            # Check-out clears room_id, so a tenant who has left since the period
+            # is billed at the room their last check-out recorded
+            cursor.execute("""
+                SELECT t.tenant_id, t.check_in_date, t.check_out_date, r.price
+                FROM tenants t
+                JOIN rooms r ON r.room_id = COALESCE(t.room_id, (
+                    SELECT c.room_id FROM tenant_checkouts c
+                    WHERE c.tenant_id = t.tenant_id
+                    ORDER BY c.checkout_id DESC
+                    LIMIT 1
+                ))
+                LEFT JOIN invoices i ON i.tenant_id = t.tenant_id AND i.period = %s
+                WHERE t.tenant_id > %s AND t.tenant_id <= %s
+                  AND t.check_in_date <= %s
+                  AND (t.check_out_date IS NULL OR t.check_out_date >= %s)
+                  AND i.invoice_id IS NULL
+            """, (self.period, first_tenant_id, last_tenant_id, self.period_end, self.period_start))
+            tenants = cursor.fetchall()
+            amounts = period_rent_cents(
+                [row[1] for row in tenants], [row[2] for row in tenants],
+                [to_cents(row[3]) for row in tenants], self.period_start, self.period_end
+            )
+            invoices = [
+                (tenant_id, self.period, from_cents(int(cents)), self.due_date, run_id)
+                for (tenant_id, *_), cents in zip(tenants, amounts.tolist())
+                if cents > 0
+            ]
+            if invoices:
+                cursor.executemany("""
+                    INSERT INTO invoices (tenant_id, period, amount, due_date, run_id)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, invoices)
+            created = len(invoices)
+
+            if created:
+                cursor.execute("""
+                    INSERT INTO payment_transactions (tenant_id, entry_type, amount, description)
+                    SELECT tenant_id, 'Charge', amount, %s
+                    FROM invoices
+                    WHERE run_id = %s AND tenant_id > %s AND tenant_id <= %s
+                """, (description, run_id, first_tenant_id, last_tenant_id))
+                first_transaction_id = cursor.lastrowid
+                self.ledger.apply_to_balances(
+                    cursor,
+                    """pt.transaction_id >= %s AND pt.tenant_id > %s AND pt.tenant_id <= %s
+                       AND pt.entry_type = 'Charge' AND pt.description = %s""",
+                    (first_transaction_id, first_tenant_id, last_tenant_id, description)
+                )
+                self.aging.refresh_range(cursor, first_tenant_id, last_tenant_id)
+
+            cursor.execute("""
+                UPDATE billing_runs
+                SET last_tenant_id = %s, invoices_created = invoices_created + %s
+                WHERE run_id = %s
+            """, (last_tenant_id, created, run_id))
+        return created
+
+    def run(self):
+        """Bill every active tenant for the period and return a throughput report.
+
+        Re-running a completed period only bills tenants added since.
+        """
+        start = time.perf_counter()
+        run_id, status, last_tenant_id = self._start()
+        created = 0
+        batches = 0
+
+        if last_tenant_id and status != "Completed":
+            print(f"Resuming billing run for {self.period} after tenant {last_tenant_id}")
+        while True:
+            batch_end = self._next_batch_end(last_tenant_id)
+            if batch_end is None:
+                break
+            created += self._bill_batch(run_id, last_tenant_id, batch_end)
+            last_tenant_id = batch_end
+            batches += 1
+
+        self.db.update("""
+            UPDATE billing_runs
+            SET status = 'Completed', completed_at = CURRENT_TIMESTAMP
+            WHERE run_id = %s
+        """, (run_id,))
+        if created:
+            get_payment_service().invalidate()
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "period": self.period,
+            "run_id": run_id,
+            "invoices_created": created,
+            "batches": batches,
+            "elapsed_s": elapsed,
+            "invoices_per_s": created / elapsed if elapsed else 0,
+        }
+        print(f"Billing run {self.period}: {created} invoices in {elapsed:.2f}s "
+              f"({report['invoices_per_s']:.0f}/s)")
+        return report
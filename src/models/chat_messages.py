@@ -0,0 +1,76 @@
+import threading
+import uuid
+from src.models.database import Database
+
+class ChatMessageStore:
+    """Persists a chat transcript to the chat_messages table using batched inserts.
+
+    Messages are numbered with a per-session sequence so the view can page
+    through older or newer parts of the transcript without holding it all.
+    """
+
+    def __init__(self, username=None, batch_size=10):
+        self.db = Database()
+        self.username = username
+        self.batch_size = batch_size
+        self.session_id = uuid.uuid4().hex
+        self.last_seq = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, message, is_user):
+        """Queue a message for persistence and return its sequence number"""
+        with self._lock:
+            self.last_seq += 1
+            seq = self.last_seq
+            self._pending.append((self.session_id, seq, self.username, is_user, message))
+            should_flush = len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+        return seq
+
+    def flush(self):
+        """Write all queued messages in one batched insert"""
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+        if not pending:
+            return
+        try:
+            self.db.execute_many("""
+                INSERT INTO chat_messages (session_id, seq, username, is_user, message)
+                VALUES (%s, %s, %s, %s, %s)
+            """, pending)
+        except Exception as e:
+            print(f"Error saving chat messages: {e}")
+            # Put the batch back so it is retried on the next flush
+            with self._lock:
+                self._pending = pending + self._pending
+
+    def fetch_before(self, seq, limit):
+        """Return up to `limit` messages older than `seq`, oldest first"""
+        self.flush()
+        rows = self.db.fetch_all("""
+            SELECT seq, is_user, message
+            FROM chat_messages
+            WHERE session_id = %s AND seq < %s
+            ORDER BY seq DESC
+            LIMIT %s
+        """, (self.session_id, seq, limit))
+        return list(reversed(rows or []))
+
+    def fetch_after(self, seq, limit):
+        """Return up to `limit` messages newer than `seq`, oldest first"""
+        self.flush()
+        rows = self.db.fetch_all("""
+            SELECT seq, is_user, message
+            FROM chat_messages
+            WHERE session_id = %s AND seq > %s
+            ORDER BY seq
+            LIMIT %s
+        """, (self.session_id, seq, limit))
+        return list(rows or [])
+
+    def fetch_latest(self, limit):
+        """Return the most recent `limit` messages, oldest first"""
+        return self.fetch_before(self.last_seq + 1, limit)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from datetime import date
+from src.models.aging import AgingReport
+from src.models.database import Database
+from src.models.occupancy import vacate
+from src.models.payment_service import get_payment_service
+from src.utils.money import Money
+
+CheckedOut = namedtuple("CheckedOut", ["tenant_id", "room_id", "check_out_date", "final_balance"])
+
+class CheckoutError(Exception):
+    """Raised when a batch can't be checked out; nothing in it is changed"""
+
+def check_out_tenants(tenant_ids, check_out_date=None):
+    """Check a set of tenants out together in one transaction; returns a CheckedOut per tenant.
+
+    Every tenant gets the check-out date and gives up their place. Their
+    balance is frozen into a tenant_checkouts row (billing charges whole
+    months in advance, so nothing is prorated) and their aging row is
+    recomputed. An occupancy event is recorded per tenant.
+    """
+    check_out_date = check_out_date or date.today()
+    if check_out_date > date.today():
+        raise CheckoutError("The check-out date can't be in the future")
+    tenant_ids = sorted({int(tenant_id) for tenant_id in tenant_ids})
+    if not tenant_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(tenant_ids))
+
+    def work(cursor):
+        cursor.execute(f"""
+            SELECT t.tenant_id, t.room_id, t.check_in_date, t.check_out_date, COALESCE(b.balance, 0)
+            FROM tenants t
+            LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+            WHERE t.tenant_id IN ({placeholders})
+            ORDER BY t.tenant_id
+            FOR UPDATE
+        """, tenant_ids)
+        rows = cursor.fetchall()
+        missing = set(tenant_ids) - {row[0] for row in rows}
+        if missing:
+            raise CheckoutError(f"No tenant with id {', '.join(map(str, sorted(missing)))}")
+        early = [row[0] for row in rows if row[2] and row[2] > check_out_date]
+        if early:
+            raise CheckoutError(f"Tenant {', '.join(map(str, early))} checked in after {check_out_date}")
+        # Left already: out of their room with a check-out date that has passed
+        gone = [row[0] for row in rows if row[1] is None and row[3] and row[3] <= date.today()]
+        if gone:
+            raise CheckoutError(f"Tenant {', '.join(map(str, gone))} has already checked out")
+
+        cursor.execute(f"""
+            UPDATE tenants
+            SET check_out_date = %s, room_id = NULL
+            WHERE tenant_id IN ({placeholders})
+        """, (check_out_date, *tenant_ids))
+
+        # Rooms are locked in id order, like assign_room, so a batch can't
+        # deadlock with a move
+        checked_out = [
+            CheckedOut(tenant_id, room_id, check_out_date, Money.of(balance))
+            for tenant_id, room_id, _, _, balance in rows
+        ]
+        for tenant in sorted(checked_out, key=lambda tenant: (tenant.room_id or 0, tenant.tenant_id)):
+            if tenant.room_id:
+                vacate(cursor, tenant.room_id, tenant_id=tenant.tenant_id)
+
+        cursor.executemany("""
+            INSERT INTO tenant_checkouts (tenant_id, room_id, check_out_date, final_balance)
+            VALUES (%s, %s, %s, %s)
+        """, [
+            (tenant.tenant_id, tenant.room_id, tenant.check_out_date, tenant.final_balance.to_decimal())
+            for tenant in checked_out
+        ])
+        AgingReport().refresh(cursor, tenant_ids)
+        return checked_out
+
+    checked_out = Database().run_in_transaction(work)
+    # Checked-out tenants drop off the payments screen unless they still owe
+    get_payment_service().invalidate()
+    print(f"Checked out {len(checked_out)} tenants on {check_out_date}")
+    return checked_out
@@ -1,8 +1,20 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from mysql.connector.errors import PoolError
+import os
+import random
 import threading
+import time
+from contextlib import contextmanager
 from decimal import Decimal
 
+# Schema to connect to; stress tests point this at a scratch schema
+DATABASE_NAME = os.environ.get("BOARDING_HOUSE_DB", "boarding_house")
+# Seconds to wait for a free pooled connection before giving up
+POOL_WAIT_TIMEOUT = 10
+# Errors after which MySQL has rolled back the transaction and it is safe to retry
+RETRYABLE_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
 class Database:
     _instance = None
     _pool = None
@@ -22,7 +34,7 @@ class Database:
                     host="localhost",
                     user="root",
                     password="H4ckm3!_",
-                    database="boarding_house"
+                    database=DATABASE_NAME
                 )
                 print("Database connection established successfully")
             except Error as e:
@@ -30,7 +42,15 @@ class Database:
                 raise
     
     def get_connection(self):
-        return self._pool.get_connection()
+        """Get a pooled connection, waiting for one to be returned if all are in use"""
+        deadline = time.monotonic() + POOL_WAIT_TIMEOUT
+        while True:
+            try:
+                return self._pool.get_connection()
+            except PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.005)
     
     def execute(self, query, params=None):
         """Execute a query that doesn't return results"""
@@ -52,6 +72,60 @@ class Database:
             if conn:
                 conn.close()
     
+    def execute_many(self, query, params_seq):
+        """Execute a query once per parameter set in a single round trip and commit"""
+        conn = None
+        cursor = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(query, params_seq)
+            conn.commit()
+            return cursor.rowcount
+        except Error as e:
+            if conn:
+                conn.rollback()
+            print(f"Error executing batch: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor whose statements are committed together or rolled back on error"""
+        conn = None
+        cursor = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            print(f"Error in transaction: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+    
+    def run_in_transaction(self, work, retries=3):
+        """Call work(cursor) inside a transaction, retrying it after a deadlock or lock timeout"""
+        for attempt in range(retries + 1):
+            try:
+                with self.transaction() as cursor:
+                    return work(cursor)
+            except Error as e:
+                if e.errno not in RETRYABLE_ERRORS or attempt == retries:
+                    raise
+                # Back off with jitter so contending writers don't collide again
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+    
     def create_tables(self):
         """Create all necessary tables if they don't exist"""
         try:
@@ -70,6 +144,7 @@ class Database:
                     monthly_rate DECIMAL(10,2) DEFAULT 0.00,
                     total_amount DECIMAL(10,2) DEFAULT 0.00,
                     balance DECIMAL(10,2) DEFAULT 0.00,
+                    INDEX idx_tenants_stay (room_id, check_in_date, check_out_date),
                     FOREIGN KEY (room_id) REFERENCES rooms(room_id)
                 )
             """)
@@ -81,10 +156,54 @@ class Database:
                     room_number VARCHAR(10) NOT NULL UNIQUE,
                     capacity INT NOT NULL,
                     price DECIMAL(10,2) NOT NULL,
-                    status ENUM('Available', 'Occupied', 'Maintenance') DEFAULT 'Available'
+                    status ENUM('Available', 'Occupied', 'Maintenance') DEFAULT 'Available',
+                    occupancy INT NOT NULL DEFAULT 0,
+                    INDEX idx_rooms_search (status, capacity, price)
                 )
             """)
             
+            # Create room occupancy history (one row per change of a room's occupancy)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS room_occupancy_events (
+                    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    room_id INT NOT NULL,
+                    tenant_id INT,
+                    event_type ENUM('Check-in', 'Check-out', 'Correction') NOT NULL,
+                    places INT NOT NULL,
+                    occupancy_after INT NOT NULL,
+                    event_date DATE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_occupancy_events_date (event_date, room_id),
+                    INDEX idx_occupancy_events_tenant (tenant_id, event_id)
+                )
+            """)
+            
+            # Create daily occupancy rollup (one row per room and day, built from the events)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS room_occupancy_daily (
+                    day DATE NOT NULL,
+                    room_id INT NOT NULL,
+                    capacity INT NOT NULL,
+                    occupancy INT NOT NULL,
+                    revenue DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    PRIMARY KEY (day, room_id),
+                    INDEX idx_occupancy_daily_room (room_id, day)
+                )
+            """)
+            
+            # Add the occupancy counter to rooms tables created before it existed; it
+            # goes last so positional reads of the existing columns keep working
+            if self.ensure_column("rooms", "occupancy", "INT NOT NULL DEFAULT 0"):
+                from src.models.occupancy import rebuild_occupancy
+                print(f"Counted room occupancy ({rebuild_occupancy()} rooms updated)")
+            
+            # Add the availability search indexes to tables created before them
+            self.ensure_index("rooms", "idx_rooms_search", "(status, capacity, price)")
+            self.ensure_index("tenants", "idx_tenants_stay", "(room_id, check_in_date, check_out_date)")
+            
+            # Occupancy history attributes revenue through each tenant's events
+            self.ensure_index("room_occupancy_events", "idx_occupancy_events_tenant", "(tenant_id, event_id)")
+            
             # Create payments table
             self.execute("""
                 CREATE TABLE IF NOT EXISTS payments (
@@ -101,6 +220,189 @@ class Database:
                 )
             """)
             
+            # Create append-only payment ledger
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS payment_transactions (
+                    transaction_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    entry_type ENUM('Charge', 'Payment', 'Adjustment') NOT NULL,
+                    amount DECIMAL(12,2) NOT NULL,
+                    payment_method VARCHAR(32),
+                    description TEXT,
+                    reverses_transaction_id BIGINT,
+                    idempotency_key VARCHAR(64),
+                    posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_transactions_tenant (tenant_id, transaction_id),
+                    UNIQUE KEY uq_transactions_reverses (reverses_transaction_id),
+                    UNIQUE KEY uq_transactions_idempotency (idempotency_key),
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id),
+                    FOREIGN KEY (reverses_transaction_id) REFERENCES payment_transactions(transaction_id)
+                )
+            """)
+            
+            # Create per-tenant balances maintained alongside the ledger
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS balances (
+                    tenant_id INT PRIMARY KEY,
+                    total_charged DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    total_paid DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    balance DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    last_transaction_id BIGINT,
+                    version INT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id)
+                )
+            """)
+            
+            # Create check-out records (one per tenant check-out, with the balance left at check-out)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS tenant_checkouts (
+                    checkout_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    room_id INT,
+                    check_out_date DATE NOT NULL,
+                    final_balance DECIMAL(12,2) NOT NULL,
+                    checked_out_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_checkouts_tenant (tenant_id)
+                )
+            """)
+            
+            # Create billing runs table (one row per billing period)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS billing_runs (
+                    run_id INT AUTO_INCREMENT PRIMARY KEY,
+                    period CHAR(7) NOT NULL UNIQUE,
+                    status ENUM('Running', 'Completed') DEFAULT 'Running',
+                    last_tenant_id INT NOT NULL DEFAULT 0,
+                    invoices_created INT NOT NULL DEFAULT 0,
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TIMESTAMP NULL
+                )
+            """)
+            
+            # Create invoices table
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS invoices (
+                    invoice_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    period CHAR(7) NOT NULL,
+                    amount DECIMAL(12,2) NOT NULL,
+                    due_date DATE NOT NULL,
+                    run_id INT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE KEY uq_invoice_tenant_period (tenant_id, period),
+                    INDEX idx_invoices_run (run_id, tenant_id),
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id),
+                    FOREIGN KEY (run_id) REFERENCES billing_runs(run_id)
+                )
+            """)
+            
+            # Create arrears aging summary (one row per tenant with an outstanding balance)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS arrears_aging (
+                    tenant_id INT PRIMARY KEY,
+                    days_0_30 DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    days_31_60 DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    days_61_90 DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    days_over_90 DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    total_due DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    oldest_charge_date DATE,
+                    as_of DATE NOT NULL,
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id)
+                )
+            """)
+
+            # Create statement imports table (one row per imported bank/GCash file)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS statement_imports (
+                    import_id INT AUTO_INCREMENT PRIMARY KEY,
+                    file_name VARCHAR(255) NOT NULL,
+                    payment_method VARCHAR(32) NOT NULL,
+                    lines_read INT NOT NULL DEFAULT 0,
+                    posted INT NOT NULL DEFAULT 0,
+                    duplicates INT NOT NULL DEFAULT 0,
+                    queued INT NOT NULL DEFAULT 0,
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    completed_at TIMESTAMP NULL
+                )
+            """)
+
+            # Create review queue for statement lines that could not be matched to a tenant
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS statement_review_queue (
+                    review_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    import_id INT NOT NULL,
+                    line_number INT NOT NULL,
+                    line_key VARCHAR(64) NOT NULL,
+                    txn_date DATE,
+                    reference VARCHAR(255),
+                    payer_name VARCHAR(100),
+                    amount DECIMAL(12,2) NOT NULL,
+                    payment_method VARCHAR(32) NOT NULL,
+                    reason VARCHAR(100),
+                    candidates VARCHAR(255),
+                    status ENUM('Pending', 'Posted', 'Dismissed') DEFAULT 'Pending',
+                    tenant_id INT,
+                    transaction_id BIGINT,
+                    UNIQUE KEY uq_review_line (line_key),
+                    INDEX idx_review_status (status, review_id),
+                    FOREIGN KEY (import_id) REFERENCES statement_imports(import_id),
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id)
+                )
+            """)
+
+            # Create payment reminders raised by the scheduler (one per invoice and stage)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS payment_reminders (
+                    reminder_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    invoice_id BIGINT NOT NULL,
+                    stage ENUM('Due Soon', 'Overdue') NOT NULL,
+                    status ENUM('Pending', 'Sent', 'Dismissed') DEFAULT 'Pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE KEY uq_reminder_invoice_stage (invoice_id, stage),
+                    INDEX idx_reminders_status (status, reminder_id),
+                    FOREIGN KEY (tenant_id) REFERENCES tenants(tenant_id),
+                    FOREIGN KEY (invoice_id) REFERENCES invoices(invoice_id)
+                )
+            """)
+
+            # Create scheduler state (one row per recurring job)
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    name VARCHAR(64) PRIMARY KEY,
+                    next_run_at DATETIME NOT NULL,
+                    last_run_at DATETIME,
+                    last_status ENUM('Succeeded', 'Failed'),
+                    last_result VARCHAR(255),
+                    last_duration_ms INT,
+                    total_duration_ms BIGINT NOT NULL DEFAULT 0,
+                    max_duration_ms INT NOT NULL DEFAULT 0,
+                    run_count INT NOT NULL DEFAULT 0,
+                    failure_count INT NOT NULL DEFAULT 0,
+                    misfire_count INT NOT NULL DEFAULT 0,
+                    locked_by VARCHAR(128),
+                    locked_until DATETIME
+                )
+            """)
+
+            # Create scheduler run history
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_job_runs (
+                    run_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    name VARCHAR(64) NOT NULL,
+                    runner VARCHAR(128) NOT NULL,
+                    scheduled_at DATETIME NOT NULL,
+                    started_at DATETIME NOT NULL,
+                    duration_ms INT NOT NULL,
+                    status ENUM('Succeeded', 'Failed') NOT NULL,
+                    misfired BOOLEAN NOT NULL DEFAULT FALSE,
+                    result VARCHAR(255),
+                    error TEXT,
+                    INDEX idx_job_runs_name (name, started_at)
+                )
+            """)
+
             # Create maintenance table
             self.execute("""
                 CREATE TABLE IF NOT EXISTS maintenance (
@@ -115,11 +417,115 @@ class Database:
                 )
             """)
             
+            # Create chat messages table
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS chat_messages (
+                    message_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    session_id CHAR(32) NOT NULL,
+                    seq INT NOT NULL,
+                    username VARCHAR(50),
+                    is_user BOOLEAN NOT NULL,
+                    message TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE KEY uq_chat_session_seq (session_id, seq)
+                )
+            """)
+            
+            # Create archive of tenants who left long ago with a settled balance. Archive
+            # tables have no foreign keys or unique emails; rows only arrive from the
+            # archival job, together with the tenant's payments, ledger and invoices.
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS tenants_archive (
+                    tenant_id INT PRIMARY KEY,
+                    first_name VARCHAR(50) NOT NULL,
+                    last_name VARCHAR(50) NOT NULL,
+                    email VARCHAR(100),
+                    phone VARCHAR(20),
+                    room_id INT,
+                    check_in_date DATE,
+                    check_out_date DATE,
+                    profile_image VARCHAR(255),
+                    monthly_rate DECIMAL(10,2) DEFAULT 0.00,
+                    total_amount DECIMAL(10,2) DEFAULT 0.00,
+                    balance DECIMAL(10,2) DEFAULT 0.00,
+                    total_charged DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    total_paid DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_tenants_archive_name (last_name, first_name),
+                    INDEX idx_tenants_archive_email (email)
+                )
+            """)
+            
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS payments_archive (
+                    payment_id INT PRIMARY KEY,
+                    tenant_id INT,
+                    amount_rent DECIMAL(10,2) NOT NULL,
+                    amount_paid DECIMAL(10,2) DEFAULT 0.00,
+                    balance DECIMAL(10,2) NOT NULL,
+                    payment_date DATE,
+                    payment_method VARCHAR(32),
+                    status VARCHAR(32),
+                    description TEXT,
+                    INDEX idx_payments_archive_tenant (tenant_id)
+                )
+            """)
+            
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS payment_transactions_archive (
+                    transaction_id BIGINT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    entry_type ENUM('Charge', 'Payment', 'Adjustment') NOT NULL,
+                    amount DECIMAL(12,2) NOT NULL,
+                    payment_method VARCHAR(32),
+                    description TEXT,
+                    reverses_transaction_id BIGINT,
+                    idempotency_key VARCHAR(64),
+                    posted_at TIMESTAMP NULL,
+                    INDEX idx_transactions_archive_tenant (tenant_id, transaction_id)
+                )
+            """)
+            
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS invoices_archive (
+                    invoice_id BIGINT PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    period CHAR(7) NOT NULL,
+                    amount DECIMAL(12,2) NOT NULL,
+                    due_date DATE NOT NULL,
+                    run_id INT,
+                    created_at TIMESTAMP NULL,
+                    INDEX idx_invoices_archive_tenant (tenant_id, period)
+                )
+            """)
+            
             print("All tables created successfully")
         except Exception as e:
             print(f"Error creating tables: {e}")
             raise
     
+    def ensure_column(self, table, column, definition):
+        """Add a column to an existing table unless it is already there; returns True if added"""
+        exists = self.fetch_one("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (table, column))[0]
+        if exists:
+            return False
+        self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+    
+    def ensure_index(self, table, name, columns):
+        """Create an index on an existing table unless one with that name exists; returns True if created"""
+        exists = self.fetch_one("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))[0]
+        if exists:
+            return False
+        self.execute(f"CREATE INDEX {name} ON {table} {columns}")
+        return True
+    
     def execute_query(self, query, params=None):
         """Execute a query and return all results"""
         conn = None
@@ -159,7 +565,41 @@ class Database:
     def fetch_all(self, query, params=None):
         """Execute a query and return all results"""
         return self.execute_query(query, params)
-    
+
+    def stream(self, query, params=None, batch_size=1000):
+        """Yield the results of a query in batches of rows.
+
+        Rows are read from an unbuffered cursor as they are consumed, so a
+        result of any size is never held in memory at once. The connection
+        stays checked out until the generator is exhausted or closed.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        except Error as e:
+            print(f"Error streaming query: {e}")
+            raise
+        finally:
+            try:
+                # A reader that stopped early leaves rows on the wire; drain them
+                # so the connection goes back to the pool usable
+                if conn and conn.unread_result:
+                    conn.consume_results()
+            except Error as e:
+                print(f"Error draining streamed query: {e}")
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
     def insert(self, query, params=None):
         """Execute an insert query and return the last insert ID"""
         conn = None
@@ -0,0 +1,220 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.models.billing_run import parse_period
+from src.models.database import Database
+from src.utils.money import Money
+from src.utils.pdf_documents import render_in_pool, warm_templates
+
+OUTPUT_DIR = "documents"
+
+def receipt_number(transaction_id):
+    return f"OR-{transaction_id:08d}"
+
+class DocumentJob:
+    """Progress of one queued receipt or statement run"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind, label, on_progress=None):
+        self.job_id = next(self._ids)
+        self.kind = kind
+        self.label = label
+        self.status = "Queued"
+        self.total = 0
+        self.done = 0
+        self.pages = 0
+        self.elapsed = 0.0
+        self.error = None
+        self.output = None
+        self.on_progress = on_progress
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def pages_per_s(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def notify(self):
+        if self.on_progress:
+            try:
+                self.on_progress(self)
+            except Exception as e:
+                print(f"Error reporting document progress: {e}")
+
+class DocumentQueue:
+    """Renders receipts and statements in a process pool, off the UI thread.
+
+    Jobs run one after another on a dispatcher thread. Document data is read
+    from the database here and streamed to the pool in batches, and each PDF
+    is written straight to disk by the worker that rendered it.
+    """
+
+    def __init__(self, workers=None, batch_size=20, output_dir=OUTPUT_DIR):
+        self.db = Database()
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.output_dir = output_dir
+        self._jobs = queue.Queue()
+        self._pool = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._dispatcher is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_templates)
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+
+    def submit(self, job, documents):
+        """Queue `documents`, a callable returning (count, output path, iterable of (path, data))"""
+        self._start()
+        self._jobs.put((job, documents))
+        job.notify()
+        return job
+
+    def submit_receipt(self, transaction_id, on_progress=None):
+        job = DocumentJob("receipt", receipt_number(transaction_id), on_progress)
+        return self.submit(job, lambda: self._receipts([transaction_id]))
+
+    def submit_statements(self, period, on_progress=None):
+        job = DocumentJob("statement", f"Statements for {period}", on_progress)
+        return self.submit(job, lambda: self._statements(period))
+
+    def _dispatch(self):
+        while True:
+            job, documents = self._jobs.get()
+            start = time.perf_counter()
+            job.status = "Running"
+            try:
+                job.total, job.output, items = documents()
+                job.notify()
+
+                def on_batch(count, pages):
+                    job.done += count
+                    job.pages += pages
+                    job.elapsed = time.perf_counter() - start
+                    job.notify()
+
+                render_in_pool(
+                    self._pool, job.kind, items, self.batch_size,
+                    max_in_flight=self.workers * 2, on_batch=on_batch
+                )
+                job.status = "Completed"
+                print(f"{job.label}: {job.done} documents, {job.pages} pages in {job.elapsed:.2f}s "
+                      f"({job.pages_per_s:.1f} pages/s)")
+            except Exception as e:
+                job.status = "Failed"
+                job.error = str(e)
+                print(f"Error generating {job.label}: {e}")
+            job.elapsed = time.perf_counter() - start
+            job.notify()
+
+    def _receipts(self, transaction_ids):
+        """Return (count, output path, documents) for payment receipts"""
+        placeholders = ", ".join(["%s"] * len(transaction_ids))
+        rows = self.db.fetch_all(f"""
+            SELECT pt.transaction_id, pt.posted_at, t.first_name, t.last_name, r.room_number,
+                   pt.payment_method, pt.description, pt.amount, COALESCE(b.balance, 0)
+            FROM payment_transactions pt
+            JOIN tenants t ON t.tenant_id = pt.tenant_id
+            LEFT JOIN rooms r ON r.room_id = t.room_id
+            LEFT JOIN balances b ON b.tenant_id = pt.tenant_id
+            WHERE pt.transaction_id IN ({placeholders}) AND pt.entry_type = 'Payment'
+        """, transaction_ids)
+        directory = os.path.join(self.output_dir, "receipts")
+        documents = [
+            (os.path.join(directory, f"{receipt_number(row[0])}.pdf"), {
+                "number": receipt_number(row[0]),
+                "date": row[1].date() if row[1] else "",
+                "tenant": f"{row[2]} {row[3]}",
+                "room": row[4],
+                "method": row[5],
+                "description": row[6],
+                "amount": Money.of(row[7]),
+                "balance": Money.of(row[8]),
+            })
+            for row in rows
+        ]
+        output = documents[0][0] if len(documents) == 1 else directory
+        return len(documents), output, documents
+
+    def _statements(self, period):
+        """Return (count, output directory, lazily built documents) for every active tenant.
+
+        Only the per-tenant summary rows are loaded up front; ledger entries
+        stream in as the pool asks for documents.
+        """
+        start, end = parse_period(period)
+        tenants = self.db.fetch_all("""
+            SELECT t.tenant_id, t.first_name, t.last_name, r.room_number,
+                   COALESCE(SUM(CASE WHEN pt.entry_type = 'Payment' THEN -pt.amount ELSE pt.amount END), 0)
+            FROM tenants t
+            LEFT JOIN rooms r ON r.room_id = t.room_id
+            LEFT JOIN payment_transactions pt
+                   ON pt.tenant_id = t.tenant_id AND pt.posted_at < %s
+            WHERE t.check_in_date <= %s
+              AND (t.check_out_date IS NULL OR t.check_out_date >= %s)
+            GROUP BY t.tenant_id, t.first_name, t.last_name, r.room_number
+            ORDER BY t.tenant_id
+        """, (start, end, start))
+        directory = os.path.join(self.output_dir, "statements", period)
+
+        def documents():
+            # The period's entries are streamed rather than loaded, and since both
+            # result sets are ordered by tenant_id they are merged in one pass, so
+            # only the current tenant's entries are held at a time
+            batches = self.db.stream("""
+                SELECT tenant_id, DATE(posted_at), description, entry_type = 'Payment', amount
+                FROM payment_transactions
+                WHERE posted_at >= %s AND posted_at < %s + INTERVAL 1 DAY
+                ORDER BY tenant_id, transaction_id
+            """, (start, end))
+            try:
+                entries = itertools.chain.from_iterable(batches)
+                entry = next(entries, None)
+                for tenant_id, first, last, room, opening in tenants:
+                    while entry is not None and entry[0] < tenant_id:
+                        entry = next(entries, None)
+                    tenant_entries = []
+                    closing = Money.of(opening)
+                    while entry is not None and entry[0] == tenant_id:
+                        _, posted_on, description, is_payment, amount = entry
+                        amount = Money.of(amount)
+                        tenant_entries.append((posted_on, description, bool(is_payment), amount))
+                        closing = closing - amount if is_payment else closing + amount
+                        entry = next(entries, None)
+                    yield os.path.join(directory, f"statement_{tenant_id}.pdf"), {
+                        "tenant": f"{first} {last}",
+                        "room": room,
+                        "period": period,
+                        "opening": Money.of(opening),
+                        "entries": tenant_entries,
+                        "closing": closing,
+                    }
+            finally:
+                # Hands the streaming connection back even if rendering stops early
+                batches.close()
+
+        return len(tenants), directory, documents()
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+def get_document_queue():
+    """Return the queue shared by all screens"""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = DocumentQueue()
+        return _shared_queue
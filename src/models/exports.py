@@ -0,0 +1,168 @@
+import itertools
+import queue
+import threading
+import time
+from collections import namedtuple
+from src.models.database import Database
+from src.utils.exporters import export_format, open_writer
+
+# Rows fetched from the server per round trip
+EXPORT_BATCH_SIZE = 2000
+# Minimum seconds between progress callbacks, so a large export doesn't flood the UI
+PROGRESS_INTERVAL = 0.25
+
+# Every query drives from one table in primary-key order, with only
+# LEFT JOINs after it, so the server can stream rows without sorting or
+# materializing the result first.
+Export = namedtuple("Export", ["title", "columns", "query", "count_query"])
+
+EXPORTS = {
+    "payments": Export(
+        "Payments",
+        ["Transaction ID", "Posted At", "Tenant ID", "First Name", "Last Name", "Room", "Type",
+         "Amount", "Method", "Description", "Reverses Transaction"],
+        """
+            SELECT pt.transaction_id, pt.posted_at, pt.tenant_id, t.first_name, t.last_name,
+                   r.room_number, pt.entry_type, pt.amount, pt.payment_method, pt.description,
+                   pt.reverses_transaction_id
+            FROM payment_transactions pt
+            LEFT JOIN tenants t ON t.tenant_id = pt.tenant_id
+            LEFT JOIN rooms r ON r.room_id = t.room_id
+            ORDER BY pt.transaction_id
+        """,
+        "SELECT COUNT(*) FROM payment_transactions",
+    ),
+    "tenants": Export(
+        "Tenants",
+        ["Tenant ID", "First Name", "Last Name", "Email", "Phone", "Room", "Check-in", "Check-out",
+         "Status", "Total Charged", "Total Paid", "Balance"],
+        """
+            SELECT t.tenant_id, t.first_name, t.last_name, t.email, t.phone, r.room_number,
+                   t.check_in_date, t.check_out_date,
+                   CASE WHEN t.check_out_date IS NULL OR t.check_out_date >= CURDATE()
+                        THEN 'Active' ELSE 'Checked Out' END,
+                   COALESCE(b.total_charged, 0), COALESCE(b.total_paid, 0), COALESCE(b.balance, 0)
+            FROM tenants t
+            LEFT JOIN rooms r ON r.room_id = t.room_id
+            LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+            ORDER BY t.tenant_id
+        """,
+        "SELECT COUNT(*) FROM tenants",
+    ),
+    "rooms": Export(
+        "Rooms",
+        ["Room ID", "Room Number", "Capacity", "Price", "Status", "Occupancy"],
+        """
+            SELECT r.room_id, r.room_number, r.capacity, r.price, r.status, r.occupancy
+            FROM rooms r
+            ORDER BY r.room_id
+        """,
+        "SELECT COUNT(*) FROM rooms",
+    ),
+}
+
+class ExportJob:
+    """Progress of one queued export"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, path, on_progress=None):
+        self.job_id = next(self._ids)
+        self.name = name
+        self.path = path
+        self.label = f"{EXPORTS[name].title} export"
+        self.status = "Queued"
+        self.total = 0
+        self.done = 0
+        self.elapsed = 0.0
+        self.error = None
+        self.on_progress = on_progress
+        self._last_notified = 0.0
+
+    @property
+    def progress(self):
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def rows_per_s(self):
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    def notify(self, throttle=False):
+        now = time.monotonic()
+        if throttle and now - self._last_notified < PROGRESS_INTERVAL:
+            return
+        self._last_notified = now
+        if self.on_progress:
+            try:
+                self.on_progress(self)
+            except Exception as e:
+                print(f"Error reporting export progress: {e}")
+
+class ExportQueue:
+    """Writes CSV/XLSX exports on a background thread, one at a time.
+
+    Rows are streamed from the database straight into the file writer in
+    batches, so memory stays flat however large the table is.
+    """
+
+    def __init__(self, batch_size=EXPORT_BATCH_SIZE):
+        self.db = Database()
+        self.batch_size = batch_size
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, name, path, on_progress=None):
+        """Queue an export of one of EXPORTS to `path`; the format follows the extension"""
+        if name not in EXPORTS:
+            raise ValueError(f"Unknown export '{name}'")
+        export_format(path)
+        job = ExportJob(name, path, on_progress)
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_jobs, daemon=True)
+                self._worker.start()
+        self._jobs.put(job)
+        job.notify()
+        return job
+
+    def _run_jobs(self):
+        while True:
+            self.run(self._jobs.get())
+
+    def run(self, job):
+        """Write one export on the calling thread; returns the job"""
+        export = EXPORTS[job.name]
+        start = time.perf_counter()
+        job.status = "Running"
+        try:
+            job.total = self.db.fetch_one(export.count_query)[0]
+            job.notify()
+            with open_writer(job.path, export.columns) as writer:
+                for rows in self.db.stream(export.query, batch_size=self.batch_size):
+                    writer.write_rows(rows)
+                    job.done += len(rows)
+                    job.elapsed = time.perf_counter() - start
+                    job.notify(throttle=True)
+            job.status = "Completed"
+            job.elapsed = time.perf_counter() - start
+            print(f"{job.label}: {job.done} rows to {job.path} in {job.elapsed:.2f}s "
+                  f"({job.rows_per_s:.0f} rows/s)")
+        except Exception as e:
+            job.status = "Failed"
+            job.error = str(e)
+            print(f"Error writing {job.label}: {e}")
+        job.elapsed = time.perf_counter() - start
+        job.notify()
+        return job
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+def get_export_queue():
+    """Return the export queue shared by all screens"""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = ExportQueue()
+        return _shared_queue
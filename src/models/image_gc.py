@@ -0,0 +1,131 @@
+import os
+import shutil
+import time
+from datetime import datetime
+from src.models.database import Database
+from src.utils.images import IMAGE_DIR, stored_files
+
+QUARANTINE_DIR = "src/assets/images/quarantine"
+# Files younger than this are left alone: a photo picked in an add/edit form
+# is on disk before the tenant row that references it is saved
+GRACE_HOURS = 24
+# Quarantined files are deleted for good after this many days
+QUARANTINE_DAYS = 30
+
+def referenced_images(db=None):
+    """Absolute paths of every image file a tenant, current or archived, points at, streamed from the database"""
+    db = db or Database()
+    referenced = set()
+    for rows in db.stream("""
+        SELECT profile_image FROM tenants WHERE profile_image IS NOT NULL
+        UNION
+        SELECT profile_image FROM tenants_archive WHERE profile_image IS NOT NULL
+    """):
+        for (path,) in rows:
+            referenced.update(os.path.abspath(file_path) for file_path in stored_files(path))
+    return referenced
+
+def _walk(directory):
+    """Yield DirEntry objects for every file below `directory`"""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except FileNotFoundError:
+        return
+
+def _remove_empty_dirs(directory, cutoff):
+    """Remove empty subfolders last changed before `cutoff`, deepest first"""
+    for root, _, _ in sorted(os.walk(directory), key=lambda walk: len(walk[0]), reverse=True):
+        if root != directory and not os.listdir(root) and os.stat(root).st_mtime < cutoff:
+            os.rmdir(root)
+
+class ImageCollector:
+    """Finds and disposes of profile images no tenant references.
+
+    Referenced paths are read first, then the image directory is walked with
+    os.scandir, so a file saved after the snapshot is always within the
+    grace period and is never touched. Orphans are moved to a dated
+    quarantine folder by default, and quarantine folders are purged once
+    they are older than `quarantine_days`.
+    """
+
+    def __init__(self, image_dir=IMAGE_DIR, quarantine_dir=QUARANTINE_DIR,
+                 grace_hours=GRACE_HOURS, quarantine_days=QUARANTINE_DAYS):
+        self.image_dir = image_dir
+        self.quarantine_dir = quarantine_dir
+        self.grace_hours = grace_hours
+        self.quarantine_days = quarantine_days
+
+    def run(self, quarantine=True, dry_run=False):
+        """Collect orphaned images; returns a report of files and bytes affected"""
+        start = time.perf_counter()
+        report = {
+            "scanned": 0, "referenced": 0, "too_recent": 0,
+            "orphaned": 0, "orphaned_bytes": 0,
+            "quarantined": 0, "deleted": 0, "purged": 0, "bytes_reclaimed": 0,
+        }
+        referenced = referenced_images()
+        cutoff = time.time() - self.grace_hours * 3600
+        batch = os.path.join(self.quarantine_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+        for entry in _walk(self.image_dir):
+            report["scanned"] += 1
+            if os.path.abspath(entry.path) in referenced:
+                report["referenced"] += 1
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime >= cutoff:
+                report["too_recent"] += 1
+                continue
+            report["orphaned"] += 1
+            report["orphaned_bytes"] += stat.st_size
+            if dry_run:
+                continue
+            try:
+                if quarantine:
+                    target = os.path.join(batch, os.path.relpath(entry.path, self.image_dir))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.move(entry.path, target)
+                    report["quarantined"] += 1
+                else:
+                    os.remove(entry.path)
+                    report["deleted"] += 1
+                    report["bytes_reclaimed"] += stat.st_size
+            except OSError as e:
+                print(f"Error removing orphaned image {entry.path}: {e}")
+
+        if not dry_run:
+            _remove_empty_dirs(self.image_dir, cutoff)
+            purged, purged_bytes = self.purge_quarantine()
+            report["purged"] = purged
+            report["bytes_reclaimed"] += purged_bytes
+        report["elapsed_s"] = round(time.perf_counter() - start, 3)
+        print(f"Image cleanup: {report['orphaned']} orphaned of {report['scanned']} files "
+              f"({report['orphaned_bytes']} bytes), {report['bytes_reclaimed']} bytes reclaimed")
+        return report
+
+    def purge_quarantine(self):
+        """Delete quarantine folders older than quarantine_days; returns (files, bytes)"""
+        cutoff = time.time() - self.quarantine_days * 86400
+        files = size = 0
+        try:
+            batches = [entry for entry in os.scandir(self.quarantine_dir) if entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
+            return 0, 0
+        for batch in batches:
+            if batch.stat().st_mtime >= cutoff:
+                continue
+            for entry in _walk(batch.path):
+                files += 1
+                size += entry.stat(follow_symlinks=False).st_size
+            shutil.rmtree(batch.path, ignore_errors=True)
+        return files, size
+
+def collect_orphaned_images():
+    """Scheduled job: quarantine orphaned images and purge old quarantine"""
+    report = ImageCollector().run()
+    return f"{report['quarantined']} quarantined, {report['bytes_reclaimed']} bytes reclaimed"
@@ -0,0 +1,250 @@
+from collections import namedtuple
+from mysql.connector import IntegrityError, errorcode
+from src.models.aging import AgingReport
+from src.models.database import Database
+from src.utils.money import Money, ZERO
+
+CHARGE = "Charge"
+PAYMENT = "Payment"
+ADJUSTMENT = "Adjustment"
+
+UPSERT_BALANCE_QUERY = """
+    INSERT INTO balances (tenant_id, total_charged, total_paid, balance, last_transaction_id)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_charged = total_charged + VALUES(total_charged),
+        total_paid = total_paid + VALUES(total_paid),
+        balance = balance + VALUES(balance),
+        last_transaction_id = GREATEST(COALESCE(last_transaction_id, 0), VALUES(last_transaction_id)),
+        version = version + 1
+"""
+
+APPLY_BALANCES_QUERY = """
+    INSERT INTO balances (tenant_id, total_charged, total_paid, balance, last_transaction_id)
+    SELECT
+        pt.tenant_id,
+        SUM(CASE WHEN pt.entry_type = 'Payment' THEN 0 ELSE pt.amount END),
+        SUM(CASE WHEN pt.entry_type = 'Payment' THEN pt.amount ELSE 0 END),
+        SUM(CASE WHEN pt.entry_type = 'Payment' THEN -pt.amount ELSE pt.amount END),
+        MAX(pt.transaction_id)
+    FROM payment_transactions pt
+    WHERE {where}
+    GROUP BY pt.tenant_id
+    ON DUPLICATE KEY UPDATE
+        total_charged = total_charged + VALUES(total_charged),
+        total_paid = total_paid + VALUES(total_paid),
+        balance = balance + VALUES(balance),
+        last_transaction_id = GREATEST(COALESCE(last_transaction_id, 0), VALUES(last_transaction_id)),
+        version = version + 1
+"""
+
+def balance_deltas(entry_type, amount):
+    """Return the (charged, paid, balance) change in Money caused by a ledger entry"""
+    if entry_type == PAYMENT:
+        return ZERO, amount, -amount
+    return amount, ZERO, amount
+
+# Result of a posting; `duplicate` is set when an idempotency key matched an earlier entry
+Posting = namedtuple("Posting", ["transaction_id", "duplicate"])
+
+class StaleBalanceError(Exception):
+    """Raised when a balance changed after the caller read it"""
+
+class PaymentLedger:
+    """Append-only ledger of charges and payments with materialized per-tenant balances.
+
+    Every posting inserts a row into payment_transactions and updates the
+    tenant's row in balances within the same transaction, so balance reads
+    are a primary-key lookup regardless of how much history exists.
+    Corrections are made by posting reversals, never by editing rows.
+
+    Balances are only ever changed by atomic increments, so concurrent
+    postings to the same tenant cannot overwrite each other. Each change
+    bumps balances.version for callers that need compare-and-swap semantics.
+    """
+
+    def __init__(self):
+        self.db = Database()
+        self.aging = AgingReport()
+
+    def post(self, tenant_id, entry_type, amount, payment_method=None, description=None,
+             reverses_transaction_id=None, cursor=None, expected_version=None, idempotency_key=None):
+        """Append an entry and update the tenant's balance; returns a Posting.
+
+        Pass `cursor` to post as part of a larger transaction. If
+        `expected_version` is given the posting only succeeds when the balance
+        is still at that version, otherwise StaleBalanceError is raised.
+
+        An `idempotency_key` makes repeated submissions safe: if an entry with
+        the same key already exists nothing is posted and the original entry
+        is returned with `duplicate` set. The unique index enforces this, so
+        the normal case costs no extra query.
+        """
+        if cursor is None:
+            return self.db.run_in_transaction(lambda cursor: self.post(
+                tenant_id, entry_type, amount, payment_method, description,
+                reverses_transaction_id, cursor, expected_version, idempotency_key
+            ))
+
+        amount = Money.of(amount)
+        try:
+            cursor.execute("""
+                INSERT INTO payment_transactions (
+                    tenant_id, entry_type, amount, payment_method, description,
+                    reverses_transaction_id, idempotency_key
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (tenant_id, entry_type, amount.to_decimal(), payment_method, description,
+                  reverses_transaction_id, idempotency_key))
+        except IntegrityError as e:
+            original = self._find_by_key(cursor, idempotency_key) if e.errno == errorcode.ER_DUP_ENTRY else None
+            if original is None:
+                raise
+            return Posting(original, True)
+        transaction_id = cursor.lastrowid
+
+        # Checked after the insert so duplicates resolve before a version conflict;
+        # a failed check rolls the insert back with the rest of the transaction
+        if expected_version is not None:
+            cursor.execute(
+                "SELECT version FROM balances WHERE tenant_id = %s FOR UPDATE",
+                (tenant_id,)
+            )
+            row = cursor.fetchone()
+            if (row[0] if row else 0) != expected_version:
+                raise StaleBalanceError(f"Balance for tenant {tenant_id} was changed by someone else")
+
+        charged, paid, balance = balance_deltas(entry_type, amount)
+        cursor.execute(UPSERT_BALANCE_QUERY, (
+            tenant_id, charged.to_decimal(), paid.to_decimal(), balance.to_decimal(), transaction_id
+        ))
+        self.aging.refresh(cursor, [tenant_id])
+        return Posting(transaction_id, False)
+
+    def _find_by_key(self, cursor, idempotency_key):
+        if idempotency_key is None:
+            return None
+        cursor.execute(
+            "SELECT transaction_id FROM payment_transactions WHERE idempotency_key = %s",
+            (idempotency_key,)
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def post_payment(self, tenant_id, amount, payment_method, description=None, cursor=None,
+                     idempotency_key=None):
+        return self.post(tenant_id, PAYMENT, amount, payment_method, description,
+                         cursor=cursor, idempotency_key=idempotency_key)
+
+    def post_charge(self, tenant_id, amount, description=None, cursor=None, idempotency_key=None):
+        return self.post(tenant_id, CHARGE, amount, description=description,
+                         cursor=cursor, idempotency_key=idempotency_key)
+
+    def reverse(self, transaction_id, description=None, cursor=None, expected_version=None,
+                idempotency_key=None):
+        """Cancel a previous entry by posting its negation; returns a Posting"""
+        if cursor is None:
+            return self.db.run_in_transaction(lambda cursor: self.reverse(
+                transaction_id, description, cursor, expected_version, idempotency_key
+            ))
+
+        cursor.execute("""
+            SELECT tenant_id, entry_type, amount, payment_method
+            FROM payment_transactions
+            WHERE transaction_id = %s
+            FOR UPDATE
+        """, (transaction_id,))
+        original = cursor.fetchone()
+        if not original:
+            raise ValueError(f"Transaction {transaction_id} not found")
+        cursor.execute(
+            "SELECT transaction_id, idempotency_key FROM payment_transactions WHERE reverses_transaction_id = %s",
+            (transaction_id,)
+        )
+        reversal = cursor.fetchone()
+        if reversal:
+            if idempotency_key is not None and reversal[1] == idempotency_key:
+                return Posting(reversal[0], True)
+            raise ValueError(f"Transaction {transaction_id} has already been reversed")
+
+        tenant_id, entry_type, amount, payment_method = original
+        return self.post(tenant_id, entry_type, -Money.of(amount), payment_method,
+                         description or f"Reversal of transaction {transaction_id}",
+                         transaction_id, cursor, expected_version, idempotency_key)
+
+    def apply_to_balances(self, cursor, where, params=()):
+        """Fold ledger entries matching `where` (on payment_transactions pt) into balances.
+
+        Used after set-based inserts into the ledger; must run in the same
+        transaction as the insert and match only the newly inserted rows.
+        Callers refresh the affected tenants' aging rows themselves.
+        """
+        cursor.execute(APPLY_BALANCES_QUERY.format(where=where), params)
+        return cursor.rowcount
+
+    def get_balance(self, tenant_id):
+        """Return (total_charged, total_paid, balance) as Money, plus the balance version"""
+        row = self.db.fetch_one(
+            "SELECT total_charged, total_paid, balance, version FROM balances WHERE tenant_id = %s",
+            (tenant_id,)
+        )
+        if not row:
+            return ZERO, ZERO, ZERO, 0
+        return Money.of(row[0]), Money.of(row[1]), Money.of(row[2]), row[3]
+
+    def latest_payment(self, tenant_id):
+        """Return the most recent payment that has not been reversed, or None"""
+        row = self.db.fetch_one("""
+            SELECT p.transaction_id, p.amount, p.payment_method, p.description, p.posted_at
+            FROM payment_transactions p
+            LEFT JOIN payment_transactions r ON r.reverses_transaction_id = p.transaction_id
+            WHERE p.tenant_id = %s
+              AND p.entry_type = 'Payment'
+              AND p.reverses_transaction_id IS NULL
+              AND r.transaction_id IS NULL
+            ORDER BY p.transaction_id DESC
+            LIMIT 1
+        """, (tenant_id,))
+        return (row[0], Money.of(row[1]), *row[2:]) if row else None
+
+    def history(self, tenant_id, limit=50):
+        """Return the tenant's most recent ledger entries, newest first"""
+        rows = self.db.fetch_all("""
+            SELECT transaction_id, entry_type, amount, payment_method, description,
+                   reverses_transaction_id, posted_at
+            FROM payment_transactions
+            WHERE tenant_id = %s
+            ORDER BY transaction_id DESC
+            LIMIT %s
+        """, (tenant_id, limit))
+        return [(row[0], row[1], Money.of(row[2]), *row[3:]) for row in rows]
+
+    def migrate_legacy_payments(self):
+        """Copy amounts paid in the old mutable payments table into the ledger.
+
+        Only tenants with no ledger entries yet are migrated, so this is safe to
+        run more than once. Balances should be rebuilt afterwards.
+        """
+        with self.db.transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO payment_transactions (tenant_id, entry_type, amount, payment_method, description)
+                SELECT p.tenant_id, 'Payment', p.amount_paid, p.payment_method,
+                       COALESCE(p.description, 'Migrated from payments')
+                FROM payments p
+                WHERE p.amount_paid > 0
+                  AND p.tenant_id IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM payment_transactions pt WHERE pt.tenant_id = p.tenant_id
+                  )
+                ORDER BY p.payment_id
+            """)
+            return cursor.rowcount
+
+    def rebuild_balances(self):
+        """Re-derive every tenant's balance from the full ledger"""
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM balances")
+            cursor.execute("SELECT COUNT(DISTINCT tenant_id) FROM payment_transactions")
+            tenants = cursor.fetchone()[0]
+            self.apply_to_balances(cursor, "1 = 1")
+        self.aging.rebuild()
+        return tenants
@@ -0,0 +1,99 @@
+from src.models.database import Database
+
+def derived_status(occupancy, under_maintenance="status = 'Maintenance'"):
+    """SQL for a room's status given an occupancy expression; Maintenance is kept as set"""
+    return f"""CASE WHEN {under_maintenance} THEN 'Maintenance'
+                    WHEN {occupancy} >= capacity THEN 'Occupied'
+                    ELSE 'Available' END"""
+
+class RoomFullError(Exception):
+    """Raised when a room has no free place for a new or moving tenant"""
+
+# rooms.occupancy counts the tenants whose room_id points at the room. It is
+# changed in the same transaction as the tenant row, and a single-table UPDATE
+# assigns left to right, so `status` sees the new occupancy. Every change is
+# also written to room_occupancy_events, the history the daily occupancy
+# rollup is built from.
+
+def record_event(cursor, room_id, event_type, places, tenant_id=None):
+    """Log an occupancy change with the room's occupancy after it"""
+    cursor.execute("""
+        INSERT INTO room_occupancy_events (room_id, tenant_id, event_type, places, occupancy_after, event_date)
+        SELECT room_id, %s, %s, %s, occupancy, CURDATE() FROM rooms WHERE room_id = %s
+    """, (tenant_id, event_type, places, room_id))
+
+def occupy(cursor, room_id, count=1, tenant_id=None):
+    """Take `count` places in a room, or raise RoomFullError if it lacks them"""
+    cursor.execute(f"""
+        UPDATE rooms
+        SET occupancy = occupancy + %s,
+            status = {derived_status("occupancy")}
+        WHERE room_id = %s AND occupancy + %s <= capacity
+    """, (count, room_id, count))
+    if cursor.rowcount != 1:
+        raise RoomFullError(f"Room {room_id} does not have {count} free place(s)")
+    record_event(cursor, room_id, "Check-in", count, tenant_id)
+
+def vacate(cursor, room_id, count=1, tenant_id=None):
+    """Free `count` places in a room"""
+    cursor.execute(f"""
+        UPDATE rooms
+        SET occupancy = GREATEST(occupancy - %s, 0),
+            status = {derived_status("occupancy")}
+        WHERE room_id = %s
+    """, (count, room_id))
+    record_event(cursor, room_id, "Check-out", -count, tenant_id)
+
+def assign_room(cursor, tenant_id, room_id):
+    """Point a tenant at `room_id` (or no room) and move the place it takes; returns the old room"""
+    cursor.execute("SELECT room_id FROM tenants WHERE tenant_id = %s FOR UPDATE", (tenant_id,))
+    row = cursor.fetchone()
+    current = row[0] if row else None
+    room_id = int(room_id) if room_id else None
+    if current == room_id:
+        return current
+    # Lock both rooms in id order so two opposite moves can't deadlock
+    changes = sorted(
+        [(r, vacate) for r in (current,) if r] + [(r, occupy) for r in (room_id,) if r],
+        key=lambda change: change[0]
+    )
+    for changed_room, change in changes:
+        change(cursor, changed_room, tenant_id=tenant_id)
+    cursor.execute("UPDATE tenants SET room_id = %s WHERE tenant_id = %s", (room_id, tenant_id))
+    return current
+
+def release_tenant(cursor, tenant_id):
+    """Free the place a tenant takes before the tenant row is removed; returns the room"""
+    return assign_room(cursor, tenant_id, None)
+
+def rebuild_occupancy(cursor=None):
+    """Recount every room's occupancy from the tenants table and re-derive its status; returns rooms changed"""
+    counts = """
+        SELECT room_id, COUNT(*) AS tenants
+        FROM tenants
+        WHERE room_id IS NOT NULL
+        GROUP BY room_id
+    """
+
+    def work(cursor):
+        # Corrections go into the history first, so the rollup follows them
+        cursor.execute(f"""
+            INSERT INTO room_occupancy_events (room_id, event_type, places, occupancy_after, event_date)
+            SELECT r.room_id, 'Correction', COALESCE(c.tenants, 0) - r.occupancy, COALESCE(c.tenants, 0), CURDATE()
+            FROM rooms r
+            LEFT JOIN ({counts}) c ON c.room_id = r.room_id
+            WHERE r.occupancy != COALESCE(c.tenants, 0)
+        """)
+        # Multi-table UPDATE assignments have no guaranteed order, so status
+        # is derived from the count itself rather than the new column value
+        cursor.execute(f"""
+            UPDATE rooms r
+            LEFT JOIN ({counts}) c ON c.room_id = r.room_id
+            SET r.occupancy = COALESCE(c.tenants, 0),
+                r.status = {derived_status("COALESCE(c.tenants, 0)")}
+        """)
+        return cursor.rowcount
+
+    if cursor is not None:
+        return work(cursor)
+    return Database().run_in_transaction(work)
@@ -0,0 +1,241 @@
+import time
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+from src.models.database import Database
+from src.utils.money import Money
+
+INSERT_DAY_QUERY = """
+    INSERT INTO room_occupancy_daily (day, room_id, capacity, occupancy, revenue)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE capacity = VALUES(capacity), occupancy = VALUES(occupancy), revenue = VALUES(revenue)
+"""
+
+MonthlyOccupancy = namedtuple("MonthlyOccupancy", ["month", "occupancy_rate", "occupied_days", "place_days", "revenue"])
+RoomStats = namedtuple("RoomStats", [
+    "room_id", "room_number", "occupancy_rate", "vacant_days", "vacancies", "average_vacancy_days", "revenue"
+])
+
+def room_on(events, day):
+    """The room a tenant was in on `day`, from their (event_date, event_type, room_id) events in order"""
+    room_id = None
+    for event_date, event_type, event_room_id in events:
+        if event_date > day:
+            # Nothing checked them in yet: a later check-out still says where they were
+            if room_id is None and event_type == "Check-out":
+                room_id = event_room_id
+            break
+        if event_type == "Check-in":
+            room_id = event_room_id
+    return room_id
+
+class OccupancyRollup:
+    """Keeps room_occupancy_daily up to date from room_occupancy_events.
+
+    Each run only covers the days after the last one rolled up: it starts
+    from that day's occupancy per room and replays the events since. A
+    day's row holds the room's occupancy at the end of the day, the places
+    it could let (0 while under maintenance) and the payments its tenants
+    made that day. Days are rolled up once complete, so the default end is
+    yesterday.
+
+    Capacity and status have no history, so each day takes them from the
+    room as it is when the day is rolled up. Nightly runs are right to the
+    day, but the first run's backfill gives every past day today's
+    capacity and status: a room under maintenance now shows no lettable
+    places for its whole backfilled history.
+    """
+
+    # Tenant ids per event lookup, to keep IN lists bounded
+    TENANT_CHUNK_SIZE = 1000
+
+    def __init__(self, chunk_size=5000):
+        self.db = Database()
+        self.chunk_size = chunk_size
+
+    def _revenue(self, cursor, start, through):
+        """Payments per (day, room_id), each counted towards the room its tenant was in that day.
+
+        The room comes from the tenant's occupancy events, so payments made
+        after check-out, which clears tenants.room_id, still count towards
+        the room they left. Tenants with no events fall back to their
+        current room, then to the one their last check-out recorded.
+        """
+        cursor.execute("""
+            SELECT DATE(posted_at), tenant_id, SUM(amount)
+            FROM payment_transactions
+            WHERE entry_type = 'Payment'
+              AND posted_at >= %s AND posted_at < %s
+            GROUP BY DATE(posted_at), tenant_id
+        """, (start, through + timedelta(days=1)))
+        payments = cursor.fetchall()
+
+        events = defaultdict(list)
+        fallback = {}
+        tenant_ids = sorted({tenant_id for _, tenant_id, _ in payments})
+        for first in range(0, len(tenant_ids), self.TENANT_CHUNK_SIZE):
+            chunk = tenant_ids[first:first + self.TENANT_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"""
+                SELECT tenant_id, event_date, event_type, room_id
+                FROM room_occupancy_events
+                WHERE tenant_id IN ({placeholders})
+                  AND event_type IN ('Check-in', 'Check-out')
+                ORDER BY event_id
+            """, chunk)
+            for tenant_id, *event in cursor.fetchall():
+                events[tenant_id].append(tuple(event))
+            cursor.execute(f"""
+                SELECT t.tenant_id, COALESCE(t.room_id, (
+                    SELECT c.room_id FROM tenant_checkouts c
+                    WHERE c.tenant_id = t.tenant_id
+                    ORDER BY c.checkout_id DESC
+                    LIMIT 1
+                ))
+                FROM tenants t
+                WHERE t.tenant_id IN ({placeholders})
+            """, chunk)
+            fallback.update(cursor.fetchall())
+
+        revenue = {}
+        for day, tenant_id, amount in payments:
+            room_id = room_on(events.get(tenant_id, ()), day) or fallback.get(tenant_id)
+            if room_id is not None:
+                revenue[(day, room_id)] = revenue.get((day, room_id), 0) + amount
+        return revenue
+
+    def _starting_point(self, cursor, through):
+        """First day to roll up and each room's occupancy at the end of the day before it"""
+        cursor.execute("SELECT MAX(day) FROM room_occupancy_daily")
+        last = cursor.fetchone()[0]
+        if last is not None:
+            cursor.execute("SELECT room_id, occupancy FROM room_occupancy_daily WHERE day = %s", (last,))
+            return last + timedelta(days=1), dict(cursor.fetchall())
+
+        # First run: history starts at the oldest event. Rooms without events
+        # since then have had their current occupancy all along; the others
+        # had what their first event started from.
+        cursor.execute("SELECT MIN(event_date) FROM room_occupancy_events")
+        first = cursor.fetchone()[0]
+        start = min(first, through) if first else through
+        cursor.execute("SELECT room_id, occupancy FROM rooms")
+        occupancy = dict(cursor.fetchall())
+        cursor.execute("""
+            SELECT e.room_id, e.occupancy_after - e.places
+            FROM room_occupancy_events e
+            JOIN (
+                SELECT room_id, MIN(event_id) AS first_event_id
+                FROM room_occupancy_events
+                WHERE event_date >= %s
+                GROUP BY room_id
+            ) f ON f.first_event_id = e.event_id
+        """, (start,))
+        occupancy.update(cursor.fetchall())
+        return start, occupancy
+
+    def run(self, through=None):
+        """Roll up every day after the last rolled-up day through `through`; returns days added"""
+        started = time.perf_counter()
+        through = through or date.today() - timedelta(days=1)
+
+        def work(cursor):
+            start, occupancy = self._starting_point(cursor, through)
+            if start > through:
+                return 0
+
+            cursor.execute("SELECT room_id, capacity, status FROM rooms ORDER BY room_id")
+            rooms = [(room_id, 0 if status == "Maintenance" else capacity)
+                     for room_id, capacity, status in cursor.fetchall()]
+
+            # Replayed in order, so the last event of a day wins
+            changes = defaultdict(dict)
+            cursor.execute("""
+                SELECT event_date, room_id, occupancy_after
+                FROM room_occupancy_events
+                WHERE event_date BETWEEN %s AND %s
+                ORDER BY event_id
+            """, (start, through))
+            for day, room_id, occupancy_after in cursor.fetchall():
+                changes[day][room_id] = occupancy_after
+
+            revenue = self._revenue(cursor, start, through)
+
+            rows = []
+            days = 0
+            day = start
+            while day <= through:
+                occupancy.update(changes.get(day, {}))
+                for room_id, capacity in rooms:
+                    rows.append((
+                        day, room_id, capacity, occupancy.get(room_id, 0),
+                        Money.of(revenue.get((day, room_id))).to_decimal()
+                    ))
+                if len(rows) >= self.chunk_size:
+                    cursor.executemany(INSERT_DAY_QUERY, rows)
+                    rows = []
+                days += 1
+                day += timedelta(days=1)
+            if rows:
+                cursor.executemany(INSERT_DAY_QUERY, rows)
+            return days
+
+        days = self.db.run_in_transaction(work)
+        print(f"Rolled up {days} days of room occupancy in {time.perf_counter() - started:.2f}s")
+        return days
+
+class OccupancyAnalytics:
+    """Occupancy, vacancy and revenue figures read from the daily rollup only"""
+
+    def __init__(self):
+        self.db = Database()
+
+    def date_range(self):
+        """(first, last) day in the rollup, or (None, None) before the first rollup"""
+        return self.db.fetch_one("SELECT MIN(day), MAX(day) FROM room_occupancy_daily")
+
+    def monthly(self, start=None, end=None):
+        """Occupancy rate and revenue per month over all rooms"""
+        rows = self.db.fetch_all("""
+            SELECT DATE_FORMAT(day, '%%Y-%%m') AS month, SUM(occupancy), SUM(capacity), SUM(revenue)
+            FROM room_occupancy_daily
+            WHERE day BETWEEN %s AND %s
+            GROUP BY month
+            ORDER BY month
+        """, (start or date.min, end or date.max))
+        return [
+            MonthlyOccupancy(
+                month, float(occupied) / float(places) if places else 0.0,
+                int(occupied), int(places), Money.of(revenue)
+            )
+            for month, occupied, places, revenue in rows
+        ]
+
+    def room_stats(self, start=None, end=None):
+        """Occupancy rate, vacancy spells and revenue per room.
+
+        A vacancy is a run of consecutive days a lettable room had nobody
+        in it; its average length is vacant days over vacancies.
+        """
+        rows = self.db.fetch_all("""
+            SELECT r.room_id, r.room_number, SUM(d.occupancy), SUM(d.capacity),
+                   SUM(d.vacant), SUM(d.vacant AND NOT COALESCE(d.vacant_before, 0)), SUM(d.revenue)
+            FROM (
+                SELECT room_id, occupancy, capacity, revenue,
+                       capacity > 0 AND occupancy = 0 AS vacant,
+                       LAG(capacity > 0 AND occupancy = 0) OVER (PARTITION BY room_id ORDER BY day) AS vacant_before
+                FROM room_occupancy_daily
+                WHERE day BETWEEN %s AND %s
+            ) d
+            JOIN rooms r ON r.room_id = d.room_id
+            GROUP BY r.room_id, r.room_number
+            ORDER BY r.room_number
+        """, (start or date.min, end or date.max))
+        return [
+            RoomStats(
+                room_id, room_number, float(occupied) / float(places) if places else 0.0, int(vacant_days), int(vacancies),
+                float(vacant_days) / float(vacancies) if vacancies else 0.0, Money.of(revenue)
+            )
+            for room_id, room_number, occupied, places, vacant_days, vacancies, revenue in rows
+        ]
+
+def roll_up_occupancy():
+    return OccupancyRollup().run()
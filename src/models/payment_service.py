@@ -0,0 +1,214 @@
+import threading
+import time
+from src.models.database import Database
+from src.models.ledger import PaymentLedger
+from src.utils.money import Money, ZERO
+
+# One row per tenant: (tenant_id, first_name, last_name, room_number, total_charged, total_paid, balance)
+TENANT_BALANCE_QUERY = """
+    SELECT
+        t.tenant_id,
+        t.first_name,
+        t.last_name,
+        COALESCE(r.room_number, (
+            SELECT lr.room_number
+            FROM tenant_checkouts c
+            JOIN rooms lr ON lr.room_id = c.room_id
+            WHERE c.tenant_id = t.tenant_id
+            ORDER BY c.checkout_id DESC
+            LIMIT 1
+        )),
+        COALESCE(b.total_charged, 0),
+        COALESCE(b.total_paid, 0),
+        COALESCE(b.balance, 0)
+    FROM tenants t
+    LEFT JOIN rooms r ON t.room_id = r.room_id
+    LEFT JOIN balances b ON t.tenant_id = b.tenant_id
+    WHERE {where}
+"""
+
+ACTIVE_TENANTS = "(t.check_out_date IS NULL OR t.check_out_date > CURRENT_DATE)"
+# Tenants on the payments screen: everyone still staying, plus anyone who left owing money.
+# Check-out clears room_id, so their room shown is the one they checked out of.
+PAYABLE_TENANTS = f"({ACTIVE_TENANTS} OR b.balance > 0)"
+
+# Cached rows are dropped this often, to pick up writes made by other
+# processes (the CLIs, another app instance)
+CACHE_TTL_SECONDS = 60
+
+def _balance_row(row):
+    return row[:4] + tuple(Money.of(amount) for amount in row[4:7])
+
+class PaymentService:
+    """Payment lookups and postings shared by every payments screen.
+
+    Tenant balance rows and the summary totals are cached and kept current
+    by applying the effect of each posting made through the service, so a
+    save never re-runs the totals aggregate and forms open without a query.
+    In-process writes that bypass the service (billing runs, late fees,
+    statement imports, check-out, archiving) call `invalidate`; the cache
+    also expires after CACHE_TTL_SECONDS for writes from other processes.
+    """
+
+    def __init__(self):
+        self.db = Database()
+        self.ledger = PaymentLedger()
+        self._lock = threading.Lock()
+        self._tenants = {}
+        self._totals = None
+        self._expires_at = time.monotonic() + CACHE_TTL_SECONDS
+
+    def _expire(self):
+        """Drop the whole cache once it is older than CACHE_TTL_SECONDS; call with the lock held"""
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._tenants.clear()
+            self._totals = None
+            self._expires_at = now + CACHE_TTL_SECONDS
+
+    def invalidate(self, tenant_id=None):
+        with self._lock:
+            if tenant_id is None:
+                self._tenants.clear()
+            else:
+                self._tenants.pop(tenant_id, None)
+            self._totals = None
+
+    def active_balances(self):
+        """Return balance rows for active tenants and those who left owing, by name, refreshing the cache"""
+        rows = [
+            _balance_row(row) for row in self.db.fetch_all(
+                TENANT_BALANCE_QUERY.format(where=PAYABLE_TENANTS) + " ORDER BY t.last_name, t.first_name"
+            )
+        ]
+        with self._lock:
+            self._tenants = {row[0]: row for row in rows}
+        return rows
+
+    def get_tenant(self, tenant_id):
+        """Return one tenant's balance row, or None"""
+        with self._lock:
+            self._expire()
+            row = self._tenants.get(tenant_id)
+        if row is None:
+            row = self.db.fetch_one(TENANT_BALANCE_QUERY.format(where="t.tenant_id = %s"), (tenant_id,))
+            if row is None:
+                return None
+            row = _balance_row(row)
+            with self._lock:
+                self._tenants[tenant_id] = row
+        return row
+
+    def summary_totals(self):
+        """Return [total charged, total paid, total balance] as Money for the tenants on the payments screen"""
+        with self._lock:
+            self._expire()
+            if self._totals is not None:
+                return list(self._totals)
+        totals = self.db.fetch_one(f"""
+            SELECT
+                COALESCE(SUM(b.total_charged), 0),
+                COALESCE(SUM(b.total_paid), 0),
+                COALESCE(SUM(b.balance), 0)
+            FROM tenants t
+            JOIN balances b ON t.tenant_id = b.tenant_id
+            WHERE {PAYABLE_TENANTS}
+        """)
+        totals = [Money.of(value) for value in totals] if totals else [ZERO] * 3
+        with self._lock:
+            self._totals = totals
+        return list(totals)
+
+    def _apply_paid(self, tenant_id, paid):
+        """Fold a change in amount paid into the cached row and totals"""
+        with self._lock:
+            row = self._tenants.get(tenant_id)
+            if row is not None:
+                self._tenants[tenant_id] = row[:5] + (row[5] + paid, row[6] - paid)
+            if self._totals is not None:
+                self._totals[1] += paid
+                self._totals[2] -= paid
+
+    def latest_payment(self, tenant_id):
+        return self.ledger.latest_payment(tenant_id)
+
+    def balance_version(self, tenant_id):
+        return self.ledger.get_balance(tenant_id)[3]
+
+    def post_payment(self, tenant_id, amount, payment_method, description=None, idempotency_key=None):
+        """Record a payment; returns the ledger Posting"""
+        amount = Money.of(amount)
+        posting = self.ledger.post_payment(
+            tenant_id, amount, payment_method, description, idempotency_key=idempotency_key
+        )
+        if not posting.duplicate:
+            self._apply_paid(tenant_id, amount)
+        return posting
+
+    def post_payments(self, payments):
+        """Record many payments in one transaction.
+
+        `payments` holds (tenant_id, amount, payment_method, description,
+        idempotency_key) tuples. Returns the Postings in the same order;
+        nothing is posted if any of them fails.
+        """
+        payments = [(tenant_id, Money.of(amount), *rest) for tenant_id, amount, *rest in payments]
+
+        def post_all(cursor):
+            return [
+                self.ledger.post_payment(
+                    tenant_id, amount, payment_method, description,
+                    cursor=cursor, idempotency_key=idempotency_key
+                )
+                for tenant_id, amount, payment_method, description, idempotency_key in payments
+            ]
+
+        postings = self.db.run_in_transaction(post_all)
+        for (tenant_id, amount, *_), posting in zip(payments, postings):
+            if not posting.duplicate:
+                self._apply_paid(tenant_id, amount)
+        return postings
+
+    def correct_payment(self, tenant_id, payment, amount, payment_method, description,
+                        expected_version, idempotency_key):
+        """Replace `payment` (a latest_payment row) with a corrected amount.
+
+        The reversal and the new entry are posted together, and only if the
+        tenant's balance is still at `expected_version`; otherwise
+        StaleBalanceError is raised. Returns True if this was a resubmission
+        of a correction already made.
+        """
+        amount = Money.of(amount)
+
+        def correct(cursor):
+            reversal = self.ledger.reverse(
+                payment[0], "Corrected payment", cursor=cursor,
+                expected_version=expected_version, idempotency_key=f"{idempotency_key}:reversal"
+            )
+            self.ledger.post_payment(
+                tenant_id, amount, payment_method, description,
+                cursor=cursor, idempotency_key=f"{idempotency_key}:payment"
+            )
+            return reversal.duplicate
+
+        duplicate = self.db.run_in_transaction(correct)
+        if not duplicate:
+            self._apply_paid(tenant_id, amount - payment[1])
+        return duplicate
+
+    def delete_payment(self, tenant_id, payment):
+        """Cancel `payment` (a latest_payment row) by posting its reversal"""
+        posting = self.ledger.reverse(payment[0], "Deleted payment")
+        self._apply_paid(tenant_id, -payment[1])
+        return posting
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+def get_payment_service():
+    """Return the service instance shared by all payment screens"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = PaymentService()
+        return _shared_service
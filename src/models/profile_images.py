@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from src.models.database import Database
+from src.utils.images import DEFAULT_PROFILE_IMAGE, process_profile_image, thumbnail_for
+
+def process_in_background(source, on_done):
+    """Run the image pipeline on a worker thread and call on_done(path, error) when finished"""
+    def worker():
+        try:
+            path = process_profile_image(source)
+        except Exception as e:
+            print(f"Error processing profile image {source}: {e}")
+            on_done(None, e)
+            return
+        on_done(path, None)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+def release_profile_image(path, tenant_id):
+    """Delete a tenant's image files unless another tenant shares the same content"""
+    if not path or path == DEFAULT_PROFILE_IMAGE:
+        return False
+    shared = Database().fetch_one("""
+        SELECT (SELECT COUNT(*) FROM tenants WHERE profile_image = %s AND tenant_id != %s)
+             + (SELECT COUNT(*) FROM tenants_archive WHERE profile_image = %s)
+    """, (path, tenant_id, path))[0]
+    if shared:
+        return False
+    for file_path in {path, thumbnail_for(path)} - {DEFAULT_PROFILE_IMAGE}:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    return True
+
+def _convert(source):
+    try:
+        return source, process_profile_image(source), None
+    except Exception as e:
+        return source, None, str(e)
+
+def migrate_profile_images(workers=None):
+    """Run every stored original through the pipeline and point tenants at the result.
+
+    Images are processed in a process pool; each distinct original is done
+    once. Returns (converted, failed).
+    """
+    db = Database()
+    sources = [
+        row[0] for row in db.fetch_all("""
+            SELECT DISTINCT profile_image FROM tenants
+            WHERE profile_image IS NOT NULL AND profile_image NOT LIKE %s
+        """, ("%\\_detail.%",))
+        if os.path.exists(row[0])
+    ]
+    converted = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for source, path, error in executor.map(_convert, sources, chunksize=8):
+            if error:
+                print(f"Error converting {source}: {error}")
+                failed += 1
+            else:
+                converted.append((path, source))
+    if converted:
+        db.execute_many("UPDATE tenants SET profile_image = %s WHERE profile_image = %s", converted)
+    return len(converted), failed
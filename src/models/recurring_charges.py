@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from src.models.aging import OUTSTANDING_CHARGES_QUERY, AgingReport
+from src.models.billing_run import BillingRun, current_period
+from src.models.database import Database
+from src.models.ledger import PaymentLedger
+from src.models.payment_service import get_payment_service
+
+# Days after the due date before a late fee is charged, and the fee as a share of the invoice
+LATE_FEE_GRACE_DAYS = 5
+LATE_FEE_RATE = "0.05"
+# Days before the due date that the first reminder is raised
+REMINDER_LEAD_DAYS = 3
+
+# An invoice is unpaid while its rent charge still has an unpaid part in
+# the aging allocation. Late fees and adjustments are allocated there too, so
+# an unpaid fee takes up the balance itself instead of making the paid
+# invoice before it look unpaid
+UNPAID_INVOICES_QUERY = f"""
+    SELECT i.invoice_id, i.tenant_id, i.period, i.amount, i.due_date
+    FROM ({OUTSTANDING_CHARGES_QUERY.format(
+        where="pt.tenant_id IN (SELECT tenant_id FROM balances WHERE balance > 0)"
+    )}) outstanding
+    JOIN invoices i ON i.invoice_id = outstanding.invoice_id
+    WHERE outstanding.unpaid > 0
+"""
+
+def accrue_rent(as_of=None):
+    """Bill the current month; safe to run repeatedly since invoices are unique per period"""
+    return BillingRun(current_period(as_of)).run()["invoices_created"]
+
+def accrue_late_fees(as_of=None):
+    """Charge one late fee per overdue invoice that is still unpaid, in one statement.
+
+    The fee's idempotency key is derived from the invoice, so an invoice can
+    only ever be charged once however often this runs. Returns fees posted.
+    """
+    as_of = as_of or date.today()
+    db = Database()
+    ledger = PaymentLedger()
+    aging = AgingReport()
+
+    with db.transaction() as cursor:
+        cursor.execute(f"""
+            INSERT INTO payment_transactions (tenant_id, entry_type, amount, description, idempotency_key)
+            SELECT u.tenant_id, 'Charge', ROUND(u.amount * {LATE_FEE_RATE}, 2),
+                   CONCAT('Late fee for ', u.period), CONCAT('late-fee:', u.invoice_id)
+            FROM ({UNPAID_INVOICES_QUERY}) u
+            WHERE u.due_date < %s
+            ON DUPLICATE KEY UPDATE transaction_id = transaction_id
+        """, (as_of - timedelta(days=LATE_FEE_GRACE_DAYS),))
+        posted = cursor.rowcount
+        if posted <= 0:
+            return 0
+
+        first_transaction_id = cursor.lastrowid
+        new_fees = "pt.transaction_id >= %s AND pt.idempotency_key LIKE 'late-fee:%%'"
+        ledger.apply_to_balances(cursor, new_fees, (first_transaction_id,))
+        cursor.execute(
+            f"SELECT DISTINCT pt.tenant_id FROM payment_transactions pt WHERE {new_fees}",
+            (first_transaction_id,)
+        )
+        aging.refresh(cursor, [row[0] for row in cursor.fetchall()], as_of)
+    get_payment_service().invalidate()
+    return posted
+
+def raise_reminders(as_of=None):
+    """Queue due-soon and overdue reminders for unpaid invoices, one per invoice and stage"""
+    as_of = as_of or date.today()
+    return Database().update(f"""
+        INSERT INTO payment_reminders (tenant_id, invoice_id, stage)
+        SELECT u.tenant_id, u.invoice_id,
+               CASE WHEN u.due_date < %s THEN 'Overdue' ELSE 'Due Soon' END
+        FROM ({UNPAID_INVOICES_QUERY}) u
+        WHERE u.due_date <= %s
+        ON DUPLICATE KEY UPDATE reminder_id = reminder_id
+    """, (as_of, as_of + timedelta(days=REMINDER_LEAD_DAYS)))
+
+def rebuild_aging(as_of=None):
+    return AgingReport().rebuild(as_of)
@@ -0,0 +1,60 @@
+import time
+from src.models.database import Database
+from src.utils.room_specs import read_rooms_csv, room_key, rooms_from_pattern, validate_rooms
+
+INSERT_ROOM_QUERY = """
+    INSERT INTO rooms (room_number, capacity, price, status)
+    VALUES (%s, %s, %s, %s)
+"""
+
+class RoomProvisioner:
+    """Creates many rooms at once from a floor/range pattern or a CSV.
+
+    Room numbers are checked against one in-memory set of the existing
+    numbers instead of a SELECT per room, and the accepted rooms are
+    written with batched inserts in a single transaction. If any room is
+    invalid nothing is written unless `skip_invalid` is set.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.db = Database()
+        self.chunk_size = chunk_size
+
+    def existing_numbers(self):
+        return {room_key(row[0]) for row in self.db.fetch_all("SELECT room_number FROM rooms")}
+
+    def from_pattern(self, pattern, capacity, price, status="Available", skip_invalid=False, dry_run=False):
+        return self.run(rooms_from_pattern(pattern, capacity, price, status), skip_invalid, dry_run)
+
+    def from_csv(self, path, skip_invalid=False, dry_run=False):
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            return self.run(list(read_rooms_csv(file)), skip_invalid, dry_run)
+
+    def run(self, specs, skip_invalid=False, dry_run=False):
+        """Validate and insert RoomSpec rows; returns a report of what was created or rejected"""
+        start = time.perf_counter()
+        rows, errors = validate_rooms(specs, self.existing_numbers())
+
+        def insert_all(cursor):
+            for offset in range(0, len(rows), self.chunk_size):
+                cursor.executemany(INSERT_ROOM_QUERY, rows[offset:offset + self.chunk_size])
+            return len(rows)
+
+        created = 0
+        if rows and not dry_run and (skip_invalid or not errors):
+            # A room added by someone else since the numbers were read fails
+            # the UNIQUE key and rolls the whole batch back
+            created = self.db.run_in_transaction(insert_all)
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "rooms": len(specs),
+            "valid": len(rows),
+            "created": created,
+            "rejected": len(errors),
+            "errors": [error._asdict() for error in errors],
+            "elapsed_s": elapsed,
+        }
+        print(f"Room provisioning: {created} created, {len(errors)} rejected "
+              f"out of {len(specs)} rooms in {elapsed:.2f}s")
+        return report
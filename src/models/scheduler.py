@@ -0,0 +1,171 @@
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+from src.models.database import Database
+from src.models import recurring_charges
+from src.models.archive import archive_tenants
+from src.models.image_gc import collect_orphaned_images
+from src.models.occupancy_history import roll_up_occupancy
+
+# `interval` in seconds, or `at_hour` to run once a day at that hour.
+# A run that starts more than `misfire_grace` seconds after its slot counts as a misfire.
+ScheduledJob = namedtuple("ScheduledJob", ["name", "func", "interval", "at_hour", "misfire_grace"])
+
+def every(name, func, seconds, misfire_grace=300):
+    return ScheduledJob(name, func, seconds, None, misfire_grace)
+
+def daily(name, func, hour, misfire_grace=3600):
+    return ScheduledJob(name, func, None, hour, misfire_grace)
+
+DEFAULT_JOBS = (
+    every("rent_accrual", recurring_charges.accrue_rent, 6 * 3600),
+    daily("late_fees", recurring_charges.accrue_late_fees, 1),
+    daily("payment_reminders", recurring_charges.raise_reminders, 7),
+    daily("aging_rebuild", recurring_charges.rebuild_aging, 2),
+    daily("image_cleanup", collect_orphaned_images, 3),
+    daily("occupancy_rollup", roll_up_occupancy, 0),
+    daily("tenant_archival", archive_tenants, 4),
+)
+
+def next_slot(job, after):
+    """First time after `after` that the job is due"""
+    if job.at_hour is None:
+        return after + timedelta(seconds=job.interval)
+    slot = after.replace(hour=job.at_hour, minute=0, second=0, microsecond=0)
+    return slot if slot > after else slot + timedelta(days=1)
+
+class Scheduler:
+    """In-process scheduler for recurring jobs, with state kept in scheduled_jobs.
+
+    Every app process may run a Scheduler. A job is claimed with a single
+    conditional UPDATE that takes a time-limited lease, so each due run
+    executes in exactly one process, and a crashed runner's lease simply
+    expires. Missed slots (app closed overnight) are coalesced into one
+    catch-up run and counted as misfires. Each run's duration and outcome
+    go to scheduled_job_runs, with running totals on the job row.
+    """
+
+    def __init__(self, jobs=DEFAULT_JOBS, poll_interval=30, lease_seconds=900):
+        self.db = Database()
+        self.jobs = {job.name: job for job in jobs}
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self):
+        """Create state rows for new jobs; existing schedules are kept"""
+        self.db.execute_many(
+            "INSERT IGNORE INTO scheduled_jobs (name, next_run_at) VALUES (%s, NOW())",
+            [(name,) for name in self.jobs]
+        )
+
+    def start(self):
+        if self._thread is None:
+            self.register()
+            self._thread = threading.Thread(target=self.run_forever, daemon=True)
+            self._thread.start()
+            print(f"Scheduler started ({self.owner}) with jobs: {', '.join(self.jobs)}")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        """Poll for due jobs until stop() is called"""
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Error in scheduler: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def run_pending(self):
+        """Run every due job this process manages to claim; returns the names run"""
+        due = self.db.fetch_all("""
+            SELECT name, next_run_at FROM scheduled_jobs
+            WHERE next_run_at <= NOW() AND (locked_until IS NULL OR locked_until < NOW())
+        """)
+        ran = []
+        for name, scheduled_at in due:
+            job = self.jobs.get(name)
+            if job and self._claim(name):
+                self._run(job, scheduled_at)
+                ran.append(name)
+        return ran
+
+    def _claim(self, name):
+        return self.db.update("""
+            UPDATE scheduled_jobs
+            SET locked_by = %s, locked_until = NOW() + INTERVAL %s SECOND
+            WHERE name = %s
+              AND next_run_at <= NOW()
+              AND (locked_until IS NULL OR locked_until < NOW())
+        """, (self.owner, self.lease_seconds, name)) == 1
+
+    def _run(self, job, scheduled_at):
+        started_at = self.db.fetch_one("SELECT NOW()")[0]
+        misfired = (started_at - scheduled_at).total_seconds() > job.misfire_grace
+        if misfired:
+            print(f"Job {job.name} misfired (due {scheduled_at}); running once to catch up")
+
+        start = time.perf_counter()
+        status, result, error = "Succeeded", None, None
+        try:
+            result = job.func()
+        except Exception as e:
+            status, error = "Failed", str(e)
+            print(f"Error running job {job.name}: {e}")
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        result = None if result is None else str(result)[:255]
+
+        # Coalesce any slots missed while nobody was running
+        next_run_at = next_slot(job, max(scheduled_at, started_at))
+        self.db.update("""
+            UPDATE scheduled_jobs
+            SET next_run_at = %s, last_run_at = %s, last_status = %s, last_result = %s,
+                last_duration_ms = %s, total_duration_ms = total_duration_ms + %s,
+                max_duration_ms = GREATEST(max_duration_ms, %s),
+                run_count = run_count + 1,
+                failure_count = failure_count + %s,
+                misfire_count = misfire_count + %s,
+                locked_by = NULL, locked_until = NULL
+            WHERE name = %s AND locked_by = %s
+        """, (
+            next_run_at, started_at, status, result, duration_ms, duration_ms, duration_ms,
+            int(status == "Failed"), int(misfired), job.name, self.owner
+        ))
+        self.db.insert("""
+            INSERT INTO scheduled_job_runs (name, runner, scheduled_at, started_at, duration_ms, status, misfired, result, error)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (job.name, self.owner, scheduled_at, started_at, duration_ms, status, misfired, result, error))
+        print(f"Job {job.name} {status.lower()} in {duration_ms} ms; next run at {next_run_at}")
+
+    def run_now(self, name):
+        """Make a job due immediately; it runs on the next poll of whichever process claims it"""
+        return self.db.update("UPDATE scheduled_jobs SET next_run_at = NOW() WHERE name = %s", (name,))
+
+    def metrics(self):
+        """Per-job run counts and durations, slowest average first"""
+        return self.db.fetch_all("""
+            SELECT name, run_count, failure_count, misfire_count, last_status, last_run_at,
+                   last_duration_ms,
+                   CASE WHEN run_count > 0 THEN total_duration_ms / run_count END AS avg_duration_ms,
+                   max_duration_ms, next_run_at, locked_by
+            FROM scheduled_jobs
+            ORDER BY avg_duration_ms DESC
+        """)
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the scheduler for this process"""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = Scheduler()
+        return _shared_scheduler
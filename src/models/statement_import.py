@@ -0,0 +1,200 @@
+import os
+import time
+from src.models.aging import AgingReport
+from src.models.database import Database
+from src.models.ledger import PaymentLedger
+from src.models.payment_service import get_payment_service
+from src.utils.money import Money
+from src.utils.statement_matching import StatementMatcher, read_statement
+
+INSERT_PAYMENT_QUERY = """
+    INSERT INTO payment_transactions (
+        tenant_id, entry_type, amount, payment_method, description, idempotency_key
+    ) VALUES (%s, 'Payment', %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE transaction_id = transaction_id
+"""
+
+INSERT_REVIEW_QUERY = """
+    INSERT INTO statement_review_queue (
+        import_id, line_number, line_key, txn_date, reference, payer_name,
+        amount, payment_method, reason, candidates
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE review_id = review_id
+"""
+
+def import_description(import_id, reference):
+    return f"Statement import {import_id}: {reference}"
+
+class StatementImporter:
+    """Imports GCash and bank CSV statements as ledger payments.
+
+    The file is streamed in chunks matched against tenant indexes built
+    once per import; each chunk's payments are posted and its unmatched
+    lines queued for review before the next is read, so memory stays at
+    one chunk. The whole file commits as a single transaction. Each line
+    carries an idempotency key, so importing the same or an overlapping
+    statement again never posts a payment twice.
+    """
+
+    def __init__(self, chunk_size=5000):
+        self.db = Database()
+        self.ledger = PaymentLedger()
+        self.aging = AgingReport()
+        self.chunk_size = chunk_size
+
+    def _load_matcher(self):
+        return StatementMatcher(self.db.fetch_all("""
+            SELECT t.tenant_id, t.first_name, t.last_name, r.room_number,
+                   t.check_in_date, t.check_out_date, r.price, COALESCE(b.balance, 0)
+            FROM tenants t
+            LEFT JOIN rooms r ON t.room_id = r.room_id
+            LEFT JOIN balances b ON b.tenant_id = t.tenant_id
+        """))
+
+    def _chunks(self, lines):
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _post_chunk(self, cursor, import_id, payment_method, matcher, chunk):
+        """Match one chunk of lines, post its payments and queue the rest; returns the counts"""
+        payments = []
+        reviews = []
+        for line in chunk:
+            result = matcher.match(line)
+            if result.tenant_id is not None:
+                payments.append((
+                    result.tenant_id, line.amount_cents.to_decimal(), payment_method,
+                    import_description(import_id, line.reference), line.key
+                ))
+            else:
+                reviews.append((
+                    import_id, line.line_number, line.key, line.date, line.reference[:255],
+                    line.name[:100], line.amount_cents.to_decimal(), payment_method,
+                    result.reason, ",".join(str(c) for c in result.candidates)
+                ))
+
+        posted = 0
+        if payments:
+            cursor.executemany(INSERT_PAYMENT_QUERY, payments)
+            posted = max(cursor.rowcount, 0)
+        if posted:
+            # Fold in by key: lines already in the ledger are duplicates
+            # with ids below the chunk's first new one
+            keys = [payment[4] for payment in payments]
+            self.ledger.apply_to_balances(
+                cursor,
+                f"pt.transaction_id >= %s AND pt.idempotency_key IN ({', '.join(['%s'] * len(keys))})",
+                (cursor.lastrowid, *keys)
+            )
+            self.aging.refresh(cursor, {payment[0] for payment in payments})
+
+        queued = 0
+        if reviews:
+            cursor.executemany(INSERT_REVIEW_QUERY, reviews)
+            queued = max(cursor.rowcount, 0)
+        return len(payments), posted, queued
+
+    def run(self, path, payment_method):
+        """Import one statement file and return a report of what happened to its lines"""
+        start = time.perf_counter()
+        matcher = self._load_matcher()
+        import_id = self.db.insert(
+            "INSERT INTO statement_imports (file_name, payment_method) VALUES (%s, %s)",
+            (os.path.basename(path), payment_method)
+        )
+
+        def import_all(cursor):
+            # Re-reads the file if the transaction is retried, so nothing is carried over
+            lines = matched = posted = queued = 0
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                for chunk in self._chunks(read_statement(file, payment_method)):
+                    chunk_matched, chunk_posted, chunk_queued = self._post_chunk(
+                        cursor, import_id, payment_method, matcher, chunk
+                    )
+                    lines += len(chunk)
+                    matched += chunk_matched
+                    posted += chunk_posted
+                    queued += chunk_queued
+
+            cursor.execute("""
+                UPDATE statement_imports
+                SET lines_read = %s, posted = %s, duplicates = %s, queued = %s,
+                    completed_at = CURRENT_TIMESTAMP
+                WHERE import_id = %s
+            """, (lines, posted, matched - posted, queued, import_id))
+            return lines, matched, posted, queued
+
+        lines, matched, posted, queued = self.db.run_in_transaction(import_all)
+        if posted:
+            get_payment_service().invalidate()
+        elapsed = time.perf_counter() - start
+        report = {
+            "import_id": import_id,
+            "lines": lines,
+            "matched": matched,
+            "posted": posted,
+            "duplicates": matched - posted,
+            "queued_for_review": queued,
+            "elapsed_s": elapsed,
+            "lines_per_s": lines / elapsed if elapsed else 0,
+        }
+        print(f"Statement import {import_id}: {posted} posted, {queued} queued for review "
+              f"out of {lines} lines in {elapsed:.2f}s")
+        return report
+
+    def pending_reviews(self, limit=100):
+        return self.db.fetch_all("""
+            SELECT review_id, txn_date, reference, payer_name, amount, payment_method, reason, candidates
+            FROM statement_review_queue
+            WHERE status = 'Pending'
+            ORDER BY review_id
+            LIMIT %s
+        """, (limit,))
+
+    def review_tenants(self):
+        """Tenants a queued line can be posted to, for the review screen"""
+        return self.db.fetch_all("""
+            SELECT t.tenant_id, t.first_name, t.last_name, r.room_number
+            FROM tenants t
+            LEFT JOIN rooms r ON t.room_id = r.room_id
+            ORDER BY t.last_name, t.first_name
+        """)
+
+    def resolve_review(self, review_id, tenant_id):
+        """Post a queued line to the given tenant; returns the ledger Posting"""
+        def resolve(cursor):
+            cursor.execute("""
+                SELECT line_key, reference, amount, payment_method, import_id
+                FROM statement_review_queue
+                WHERE review_id = %s AND status = 'Pending'
+                FOR UPDATE
+            """, (review_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise ValueError(f"Review item {review_id} is not pending")
+            key, reference, amount, payment_method, import_id = row
+            posting = self.ledger.post_payment(
+                tenant_id, Money.of(amount), payment_method, import_description(import_id, reference),
+                cursor=cursor, idempotency_key=key
+            )
+            cursor.execute("""
+                UPDATE statement_review_queue
+                SET status = 'Posted', tenant_id = %s, transaction_id = %s
+                WHERE review_id = %s
+            """, (tenant_id, posting.transaction_id, review_id))
+            return posting
+        posting = self.db.run_in_transaction(resolve)
+        get_payment_service().invalidate(tenant_id)
+        return posting
+
+    def dismiss_review(self, review_id):
+        return self.db.update(
+            "UPDATE statement_review_queue SET status = 'Dismissed' WHERE review_id = %s AND status = 'Pending'",
+            (review_id,)
+        )
@@ -0,0 +1,106 @@
+import csv
+import itertools
+import os
+import time
+from collections import Counter
+from src.models.database import Database
+from src.models.occupancy import occupy
+from src.utils.tenant_rows import TenantError, TenantValidator, email_key, read_tenants_csv
+
+INSERT_TENANT_QUERY = """
+    INSERT INTO tenants (first_name, last_name, email, phone, room_id, check_in_date, check_out_date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+ERROR_REPORT_COLUMNS = ["Line", "Column", "Value", "Problem"]
+
+def error_report_path(path):
+    """Where the per-row error report for an import file goes by default"""
+    base, _ = os.path.splitext(path)
+    return f"{base}_errors.csv"
+
+class TenantImporter:
+    """Imports tenants from a spreadsheet exported as CSV.
+
+    The file is streamed and validated a chunk at a time against the rooms
+    and emails loaded once per import, with room occupancy counted in
+    memory. Accepted tenants are bulk-inserted and their rooms' occupancy
+    raised in a single transaction. Rejected rows go to an error report
+    file; if there are any, nothing is imported unless `skip_invalid` is set.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.db = Database()
+        self.chunk_size = chunk_size
+
+    def _load_validator(self):
+        rooms = self.db.fetch_all("SELECT room_id, room_number, capacity, occupancy, status FROM rooms")
+        emails = {
+            email_key(row[0])
+            for batch in self.db.stream("SELECT email FROM tenants WHERE email IS NOT NULL")
+            for row in batch
+        }
+        return TenantValidator(rooms, emails)
+
+    def _chunks(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def write_error_report(self, errors, path):
+        with open(path, "w", newline="", encoding="utf-8-sig") as file:
+            writer = csv.writer(file)
+            writer.writerow(ERROR_REPORT_COLUMNS)
+            writer.writerows(errors)
+
+    def run(self, path, report_path=None, skip_invalid=False, dry_run=False):
+        """Import one CSV file and return a report of what happened to its rows"""
+        start = time.perf_counter()
+        validator = self._load_validator()
+
+        tenants = []
+        errors = []
+        lines = 0
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            for chunk in self._chunks(read_tenants_csv(file)):
+                lines += len(chunk)
+                for row in chunk:
+                    result = validator.validate(row)
+                    if isinstance(result, TenantError):
+                        errors.append(result)
+                    else:
+                        tenants.append(result)
+
+        def insert_all(cursor):
+            for chunk in self._chunks(tenants):
+                cursor.executemany(INSERT_TENANT_QUERY, chunk)
+            # One capacity-checked update per room, in id order like assign_room
+            placed = Counter(tenant[4] for tenant in tenants if tenant[4] is not None)
+            for room_id, count in sorted(placed.items()):
+                occupy(cursor, room_id, count)
+            return len(tenants)
+
+        imported = 0
+        if tenants and not dry_run and (skip_invalid or not errors):
+            imported = self.db.run_in_transaction(insert_all)
+
+        report_path = report_path or error_report_path(path)
+        if errors:
+            self.write_error_report(errors, report_path)
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "rows": lines,
+            "valid": len(tenants),
+            "imported": imported,
+            "rejected": len(errors),
+            "error_report": report_path if errors else None,
+            "elapsed_s": elapsed,
+            "rows_per_s": lines / elapsed if elapsed else 0,
+        }
+        print(f"Tenant import: {imported} imported, {len(errors)} rejected "
+              f"out of {lines} rows in {elapsed:.2f}s")
+        return report
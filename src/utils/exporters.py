@@ -0,0 +1,221 @@
+# Streaming table writers for data exports. Rows are written as they arrive
+# and nothing is kept once written, so memory use does not grow with the
+# number of rows. Both writers build the file next to its final path and
+# move it into place on close, so a cancelled or failed export never
+# leaves a truncated file behind.
+import csv
+import os
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+from src.utils.money import Money
+
+FORMATS = ("csv", "xlsx")
+# Rows per worksheet in Excel, including the header row
+XLSX_MAX_ROWS = 1_048_576
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Control characters that are not allowed in XML
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _text(value):
+    """Plain-text form of a cell value"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+def _is_number(value):
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+def _number(value):
+    """Numeric cell value; Money is written in pesos"""
+    return value.to_decimal() if isinstance(value, Money) else value
+
+def _safe_text(value):
+    """Text for a string cell, defused so it is never evaluated as a formula"""
+    text = _text(value)
+    return f"'{text}" if text.startswith(FORMULA_PREFIXES) else text
+
+class _Writer:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+        self._part = f"{path}.part"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        """Discard the partially written file"""
+        self._close_file(complete=False)
+        try:
+            os.remove(self._part)
+        except OSError:
+            pass
+
+    def close(self):
+        self._close_file()
+        os.replace(self._part, self.path)
+
+class CsvWriter(_Writer):
+    """UTF-8 CSV with a byte-order mark so Excel detects the encoding"""
+
+    def open(self):
+        self._file = open(self._part, "w", newline="", encoding="utf-8-sig")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(self.columns)
+
+    def write_rows(self, rows):
+        self._csv.writerows(
+            [_number(value) if _is_number(value) else _safe_text(value) for value in row]
+            for row in rows
+        )
+        self.rows += len(rows)
+
+    def _close_file(self, complete=True):
+        if not self._file.closed:
+            self._file.close()
+
+class XlsxWriter(_Writer):
+    """Minimal Office Open XML workbook written straight into the zip archive.
+
+    Each sheet is compressed as it is written, and strings are stored inline
+    rather than in a shared-strings table that would have to be held in
+    memory until the end. Results longer than a worksheet allows continue on
+    further sheets, each with the header row.
+    """
+
+    def open(self):
+        self._zip = zipfile.ZipFile(self._part, "w", zipfile.ZIP_DEFLATED)
+        self._sheet = None
+        self._sheets = 0
+        self._sheet_rows = 0
+        self._header = self._row_xml(self.columns)
+
+    def _start_sheet(self):
+        self._end_sheet()
+        self._sheets += 1
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{self._sheets}.xml", "w", force_zip64=True)
+        self._sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            b'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/>'
+            b'</sheetView></sheetViews><sheetData>'
+        )
+        self._sheet.write(self._header)
+        self._sheet_rows = 1
+
+    def _end_sheet(self):
+        if self._sheet:
+            self._sheet.write(b"</sheetData></worksheet>")
+            self._sheet.close()
+            self._sheet = None
+
+    @staticmethod
+    def _row_xml(values):
+        cells = []
+        for value in values:
+            if value is None:
+                cells.append("<c/>")
+            elif _is_number(value):
+                cells.append(f"<c><v>{_number(value)}</v></c>")
+            else:
+                text = escape(_XML_ILLEGAL.sub("", _text(value)))
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        return f"<row>{''.join(cells)}</row>".encode("utf-8")
+
+    def write_rows(self, rows):
+        chunk = []
+        for row in rows:
+            if self._sheet is None or self._sheet_rows >= XLSX_MAX_ROWS:
+                if chunk:
+                    self._sheet.write(b"".join(chunk))
+                    chunk = []
+                self._start_sheet()
+            chunk.append(self._row_xml(row))
+            self._sheet_rows += 1
+        if chunk:
+            self._sheet.write(b"".join(chunk))
+        self.rows += len(rows)
+
+    def _close_file(self, complete=True):
+        if self._zip.fp is None:
+            return
+        if complete:
+            if self._sheets == 0:
+                self._start_sheet()
+            self._end_sheet()
+            self._write_package()
+        elif self._sheet:
+            self._sheet.close()
+        self._zip.close()
+
+    def _write_package(self):
+        sheets = range(1, self._sheets + 1)
+        self._zip.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for n in sheets
+            )
+            + '</Types>'
+        ))
+        self._zip.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ))
+        self._zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="Sheet{n}" sheetId="{n}" r:id="rId{n}"/>' for n in sheets)
+            + '</sheets></workbook>'
+        ))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{n}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{n}.xml"/>'
+                for n in sheets
+            )
+            + '</Relationships>'
+        ))
+
+WRITERS = {"csv": CsvWriter, "xlsx": XlsxWriter}
+
+def export_format(path):
+    """File format for an export path, from its extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported export format '{extension}'; use one of {', '.join(FORMATS)}")
+    return extension
+
+def open_writer(path, columns):
+    """Writer for `path` chosen by its extension; use it as a context manager"""
+    return WRITERS[export_format(path)](path, columns)
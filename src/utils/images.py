@@ -0,0 +1,104 @@
+# Profile image pipeline. Picked photos are decoded once, resized to the
+# sizes the app actually displays, re-encoded, and stored under a hash of
+# the original file so the same photo uploaded twice is stored once. Only
+# depends on Pillow and plain paths, so it can run in a worker thread or
+# process.
+import hashlib
+import os
+import re
+from PIL import Image, ImageOps, features
+
+ASSETS_DIR = "src/assets"
+IMAGE_DIR = "src/assets/images/tenants"
+DEFAULT_PROFILE_IMAGE = "src/assets/images/default_profile.png"
+
+# Square crop for the 40px table avatar and the 100px form preview, at 2x
+# for high-DPI screens
+THUMBNAIL_SIZE = 80
+DETAIL_SIZE = 200
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+# WebP where this Pillow build supports it, otherwise JPEG
+EXTENSION = "webp" if features.check("webp") else "jpg"
+
+# Stored variants are named after their content, so a URL never changes meaning
+HASHED_NAME = re.compile(r"[0-9a-f]{64}_(detail|thumb)\.(webp|jpg)$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Legacy and default images can be replaced under the same name
+SHORT_CACHE = "public, max-age=3600"
+
+def content_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def variant_paths(digest, image_dir=IMAGE_DIR):
+    """(detail, thumbnail) paths for a content hash, fanned out by its first two characters"""
+    base = os.path.join(image_dir, digest[:2], digest)
+    return f"{base}_detail.{EXTENSION}", f"{base}_thumb.{EXTENSION}"
+
+def stored_files(path):
+    """Every file on disk that belongs to a stored profile image path"""
+    if "_detail." in path:
+        return (path, path.replace("_detail.", "_thumb."))
+    return (path,)
+
+def thumbnail_for(path):
+    """Thumbnail to show for a stored profile image.
+
+    Paths written before the pipeline existed point at full-size originals
+    and are shown as-is; missing files fall back to the default image.
+    """
+    if not path:
+        return DEFAULT_PROFILE_IMAGE
+    if "_detail." in path:
+        thumbnail = path.replace("_detail.", "_thumb.")
+        if os.path.exists(thumbnail):
+            return thumbnail
+    return path if os.path.exists(path) else DEFAULT_PROFILE_IMAGE
+
+def asset_url(path):
+    """URL of an image under ASSETS_DIR as served to the web client"""
+    return "/" + os.path.relpath(path, ASSETS_DIR).replace(os.sep, "/")
+
+def cache_control(url_path):
+    """Cache-Control header for an image served from ASSETS_DIR"""
+    return IMMUTABLE_CACHE if HASHED_NAME.search(url_path) else SHORT_CACHE
+
+def _save(image, path):
+    """Encode next to `path` and move into place, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part = f"{path}.part"
+    if EXTENSION == "webp":
+        image.save(part, "WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        image.convert("RGB").save(part, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(part, path)
+
+def process_profile_image(source, image_dir=IMAGE_DIR):
+    """Store a picked photo as detail and thumbnail variants; returns the detail path.
+
+    A photo whose content was stored before is not decoded again.
+    """
+    detail_path, thumbnail_path = variant_paths(content_hash(source), image_dir)
+    if os.path.exists(detail_path) and os.path.exists(thumbnail_path):
+        # Refresh the timestamps so the orphan cleanup treats the files as new
+        os.utime(detail_path)
+        os.utime(thumbnail_path)
+        return detail_path
+
+    with Image.open(source) as image:
+        # Let the JPEG decoder scale down by up to 8x while decoding, which is
+        # far cheaper than decoding a full phone photo and resizing it
+        image.draft("RGB", (DETAIL_SIZE * 2, DETAIL_SIZE * 2))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    detail = ImageOps.fit(image, (DETAIL_SIZE, DETAIL_SIZE), Image.Resampling.LANCZOS)
+    _save(detail, detail_path)
+    # Downscale from the detail crop rather than the original
+    _save(detail.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS), thumbnail_path)
+    return detail_path
@@ -0,0 +1,153 @@
+import numbers
+import operator
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import numpy as np
+
+_CENT = Decimal("0.01")
+
+class Money:
+    """An exact peso amount stored as integer centavos.
+
+    Arithmetic between Money values stays integer, so totals never drift the
+    way float pesos do. Decimal is only produced for the database through
+    `to_decimal`. Formatting works on pesos, so f"{amount:,.2f}" prints
+    1,234.50 rather than the centavo count.
+
+    Money only mixes with Money and integer centavos. Decimal and float
+    operands raise TypeError instead of being taken as centavos, which is
+    also why Money is not an int subclass: Decimal and float would otherwise
+    accept it as a plain integer on their side of the operator.
+    """
+
+    __slots__ = ("_cents",)
+
+    def __init__(self, cents=0):
+        object.__setattr__(self, "_cents", int(cents) if isinstance(cents, Money) else operator.index(cents))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    @classmethod
+    def of(cls, amount):
+        """Convert a peso amount (Decimal, str, int or float) read from the DB or a form"""
+        if amount is None or amount == "":
+            return cls(0)
+        if isinstance(amount, Money):
+            return amount
+        if isinstance(amount, str):
+            amount = amount.strip().replace(",", "").replace("₱", "")
+        try:
+            pesos = Decimal(str(amount))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {amount!r}")
+        return cls(int((pesos * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+
+    def to_decimal(self):
+        """Decimal pesos with two places, for query parameters"""
+        return (Decimal(self._cents) / 100).quantize(_CENT)
+
+    def _cents_of(self, other):
+        """Centavos of an operand, NotImplemented for non-numbers; Decimal and float raise TypeError"""
+        if isinstance(other, Money):
+            return other._cents
+        if isinstance(other, numbers.Integral):
+            return int(other)
+        if isinstance(other, (Decimal, numbers.Number)):
+            raise TypeError(
+                f"Money can't be combined with {type(other).__name__}; convert with Money.of() or to_decimal()"
+            )
+        return NotImplemented
+
+    def __int__(self):
+        return self._cents
+
+    __index__ = __int__
+
+    def __hash__(self):
+        return hash(self._cents)
+
+    def __bool__(self):
+        return self._cents != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self._cents == other._cents
+        if isinstance(other, numbers.Integral):
+            return self._cents == int(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else self._cents < cents
+
+    def __le__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else self._cents <= cents
+
+    def __gt__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else self._cents > cents
+
+    def __ge__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else self._cents >= cents
+
+    def __add__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else Money(self._cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else Money(self._cents - cents)
+
+    def __rsub__(self, other):
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else Money(cents - self._cents)
+
+    def __mul__(self, other):
+        if isinstance(other, Money):
+            raise TypeError("Money can't be multiplied by Money")
+        cents = self._cents_of(other)
+        return cents if cents is NotImplemented else Money(self._cents * cents)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        raise TypeError("Money can't be divided; work in Decimal with to_decimal() and convert back with Money.of()")
+
+    __rtruediv__ = __floordiv__ = __rfloordiv__ = __truediv__
+
+    def __neg__(self):
+        return Money(-self._cents)
+
+    def __abs__(self):
+        return Money(abs(self._cents))
+
+    def __reduce__(self):
+        return Money, (self._cents,)
+
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec)
+
+    def __str__(self):
+        return f"{self:,.2f}"
+
+    def __repr__(self):
+        return f"Money({self:.2f})"
+
+ZERO = Money(0)
+
+def to_cents(amount):
+    """Convert a peso amount (Decimal, str, int or float) to integer centavos"""
+    return Money.of(amount)
+
+def from_cents(cents):
+    """Convert integer centavos back to a Decimal peso amount"""
+    return Money(cents).to_decimal()
+
+def sum_cents(amounts):
+    """Exact total of many centavo amounts using a single int64 array sum"""
+    values = amounts if isinstance(amounts, np.ndarray) else np.fromiter(amounts, dtype=np.int64)
+    return Money(int(values.sum(dtype=np.int64)))
@@ -0,0 +1,206 @@
+# Rendering runs inside pool processes, so this module only depends on
+# reportlab and plain data: each document is a dict of strings, dates and
+# Money amounts prepared by the caller.
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import lru_cache
+from itertools import islice
+from reportlab.lib.pagesizes import A4, A5
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+BUSINESS_NAME = "Boarding House Management System"
+FONT = "Helvetica"
+BOLD = "Helvetica-Bold"
+MARGIN = 40
+LINE = 16
+
+@lru_cache(maxsize=None)
+def _template(kind):
+    """Page layout for a document kind, computed once per worker process"""
+    width, height = A5 if kind == "receipt" else A4
+    title = "OFFICIAL RECEIPT" if kind == "receipt" else "STATEMENT OF ACCOUNT"
+    layout = {
+        "size": (width, height),
+        "title": title,
+        "title_x": (width - stringWidth(title, BOLD, 14)) / 2,
+        "business_x": (width - stringWidth(BUSINESS_NAME, BOLD, 12)) / 2,
+        "right": width - MARGIN,
+        "top": height - MARGIN,
+        "bottom": MARGIN + 2 * LINE,
+    }
+    if kind == "statement":
+        # Date, description, charges, payments, running balance
+        layout["columns"] = (MARGIN, MARGIN + 70, width - MARGIN - 160, width - MARGIN - 80, width - MARGIN)
+    return layout
+
+def _money(amount):
+    return f"{amount:,.2f}"
+
+def _right(pdf, x, y, text, font=FONT, size=10):
+    pdf.setFont(font, size)
+    pdf.drawRightString(x, y, text)
+
+def _letterhead(pdf, layout):
+    """Draw the shared page header; returns the y position below it"""
+    y = layout["top"]
+    pdf.setFont(BOLD, 12)
+    pdf.drawString(layout["business_x"], y, BUSINESS_NAME)
+    y -= LINE * 1.5
+    pdf.setFont(BOLD, 14)
+    pdf.drawString(layout["title_x"], y, layout["title"])
+    y -= LINE / 2
+    pdf.line(MARGIN, y, layout["right"], y)
+    return y - LINE * 1.5
+
+def _open(path, layout):
+    """Start a document that is written next to `path`, so readers never see a partial file"""
+    return canvas.Canvas(f"{path}.part", pagesize=layout["size"])
+
+def _save(pdf, path):
+    pdf.save()
+    os.replace(f"{path}.part", path)
+
+def render_receipt(path, receipt):
+    """Write a one-page receipt; returns the number of pages"""
+    layout = _template("receipt")
+    pdf = _open(path, layout)
+    y = _letterhead(pdf, layout)
+
+    rows = (
+        ("Receipt No.", receipt["number"]),
+        ("Date", str(receipt["date"])),
+        ("Received from", receipt["tenant"]),
+        ("Room", str(receipt["room"] or "")),
+        ("Payment method", receipt["method"] or ""),
+        ("Description", receipt["description"] or ""),
+    )
+    for label, value in rows:
+        pdf.setFont(BOLD, 10)
+        pdf.drawString(MARGIN, y, label)
+        pdf.setFont(FONT, 10)
+        pdf.drawString(MARGIN + 110, y, value[:60])
+        y -= LINE
+
+    y -= LINE
+    pdf.setFont(BOLD, 12)
+    pdf.drawString(MARGIN, y, "Amount received")
+    _right(pdf, layout["right"], y, f"PHP {_money(receipt['amount'])}", BOLD, 12)
+    y -= LINE * 1.5
+    pdf.setFont(FONT, 10)
+    pdf.drawString(MARGIN, y, "Remaining balance")
+    _right(pdf, layout["right"], y, f"PHP {_money(receipt['balance'])}")
+
+    pdf.showPage()
+    _save(pdf, path)
+    return 1
+
+def _statement_header(pdf, layout, statement, page):
+    y = _letterhead(pdf, layout)
+    pdf.setFont(FONT, 10)
+    pdf.drawString(MARGIN, y, f"Tenant: {statement['tenant']}")
+    _right(pdf, layout["right"], y, f"Period: {statement['period']}")
+    y -= LINE
+    pdf.drawString(MARGIN, y, f"Room: {statement['room'] or ''}")
+    _right(pdf, layout["right"], y, f"Page {page}")
+    y -= LINE * 1.5
+
+    date_x, description_x, charges_x, payments_x, balance_x = layout["columns"]
+    pdf.setFont(BOLD, 10)
+    pdf.drawString(date_x, y, "Date")
+    pdf.drawString(description_x, y, "Description")
+    _right(pdf, charges_x, y, "Charges", BOLD)
+    _right(pdf, payments_x, y, "Payments", BOLD)
+    _right(pdf, balance_x, y, "Balance", BOLD)
+    y -= LINE / 2
+    pdf.line(MARGIN, y, layout["right"], y)
+    return y - LINE
+
+def render_statement(path, statement):
+    """Write a statement with a running balance, paginating long periods; returns pages"""
+    layout = _template("statement")
+    date_x, description_x, charges_x, payments_x, balance_x = layout["columns"]
+    pdf = _open(path, layout)
+    page = 1
+    y = _statement_header(pdf, layout, statement, page)
+
+    balance = statement["opening"]
+    pdf.setFont(FONT, 10)
+    pdf.drawString(description_x, y, "Opening balance")
+    _right(pdf, balance_x, y, _money(balance))
+    y -= LINE
+
+    for posted_on, description, is_payment, amount in statement["entries"]:
+        if y < layout["bottom"]:
+            pdf.showPage()
+            page += 1
+            y = _statement_header(pdf, layout, statement, page)
+        balance = balance - amount if is_payment else balance + amount
+        pdf.setFont(FONT, 10)
+        pdf.drawString(date_x, y, str(posted_on))
+        pdf.drawString(description_x, y, (description or "")[:45])
+        _right(pdf, payments_x if is_payment else charges_x, y, _money(amount))
+        _right(pdf, balance_x, y, _money(balance))
+        y -= LINE
+
+    y -= LINE / 2
+    pdf.line(MARGIN, y, layout["right"], y)
+    y -= LINE
+    pdf.setFont(BOLD, 11)
+    pdf.drawString(description_x, y, "Amount due")
+    _right(pdf, balance_x, y, f"PHP {_money(statement['closing'])}", BOLD, 11)
+
+    pdf.showPage()
+    _save(pdf, path)
+    return page
+
+RENDERERS = {"receipt": render_receipt, "statement": render_statement}
+
+def render_batch(kind, documents):
+    """Render (path, data) pairs of one kind; returns the total page count.
+
+    Batches amortize the cost of handing work to a pool process.
+    """
+    render = RENDERERS[kind]
+    pages = 0
+    for path, data in documents:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        pages += render(path, data)
+    return pages
+
+def warm_templates():
+    """Pool initializer: build the cached layouts before the first job arrives"""
+    for kind in RENDERERS:
+        _template(kind)
+
+def render_in_pool(executor, kind, documents, batch_size=20, max_in_flight=8, on_batch=None):
+    """Render an iterable of (path, data) pairs on `executor` in batches.
+
+    Documents are consumed lazily and at most `max_in_flight` batches are
+    queued at once, so a month-end run never holds every statement in
+    memory. `on_batch(documents, pages)` is called as each batch finishes.
+    Returns (documents, pages) rendered.
+    """
+    documents = iter(documents)
+    pending = {}
+    rendered = pages = 0
+
+    def submit_next():
+        batch = list(islice(documents, batch_size))
+        if batch:
+            pending[executor.submit(render_batch, kind, batch)] = len(batch)
+        return bool(batch)
+
+    while len(pending) < max_in_flight and submit_next():
+        pass
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            count = pending.pop(future)
+            batch_pages = future.result()
+            rendered += count
+            pages += batch_pages
+            if on_batch:
+                on_batch(count, batch_pages)
+            submit_next()
+    return rendered, pages
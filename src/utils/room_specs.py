@@ -0,0 +1,151 @@
+import csv
+import itertools
+import re
+from collections import namedtuple
+from decimal import Decimal
+from src.utils.money import Money
+
+# rooms.room_number is VARCHAR(10)
+MAX_ROOM_NUMBER_LENGTH = 10
+# Largest price rooms.price, a DECIMAL(10,2), can hold
+MAX_PRICE = Decimal("99999999.99")
+# Upper bound on one pattern, to catch typos like [1-1000]
+MAX_PATTERN_ROOMS = 5000
+# Rooms are created empty, so Occupied is never set directly
+NEW_ROOM_STATUSES = ("Available", "Maintenance")
+
+# `source` says where a room came from (pattern or CSV line) for error reports
+RoomSpec = namedtuple("RoomSpec", ["source", "room_number", "capacity", "price", "status"])
+RoomError = namedtuple("RoomError", ["source", "room_number", "reason"])
+
+HEADER_ALIASES = {
+    "room": "room_number",
+    "room no": "room_number",
+    "room number": "room_number",
+    "number": "room_number",
+    "capacity": "capacity",
+    "beds": "capacity",
+    "price": "price",
+    "rate": "price",
+    "monthly rate": "price",
+    "rent": "price",
+    "status": "status",
+}
+
+_RANGE = re.compile(r"\[([0-9]+)-([0-9]+)\]")
+_HEADER_TOKEN = re.compile(r"[a-z0-9]+")
+
+def room_key(room_number):
+    """Comparison key for room numbers; the column's collation ignores case and trailing spaces"""
+    return (room_number or "").strip().upper()
+
+def expand_pattern(pattern):
+    """Room numbers described by a pattern of literal text and [start-end] ranges.
+
+    "2[01-40]" is 201 to 240 and "[1-3][01-20]" is twenty rooms on each of
+    floors 1 to 3. A range keeps the zero padding of its start.
+    """
+    parts = _RANGE.split(pattern)
+    literals = parts[0::3]
+    ranges = []
+    for start, end in zip(parts[1::3], parts[2::3]):
+        if int(end) < int(start):
+            raise ValueError(f"Range [{start}-{end}] runs backwards")
+        width = len(start) if start.startswith("0") else 0
+        ranges.append([str(n).zfill(width) for n in range(int(start), int(end) + 1)])
+    if not ranges:
+        raise ValueError("Pattern needs at least one [start-end] range, e.g. 2[01-40]")
+    for numbers in itertools.product(*ranges):
+        yield "".join(literal + number for literal, number in zip(literals, numbers)) + literals[-1]
+
+def rooms_from_pattern(pattern, capacity, price, status="Available"):
+    """RoomSpec for every room number in a pattern, all with the same capacity, price and status"""
+    specs = [
+        RoomSpec(pattern, number, capacity, price, status)
+        for number in itertools.islice(expand_pattern(pattern), MAX_PATTERN_ROOMS + 1)
+    ]
+    if len(specs) > MAX_PATTERN_ROOMS:
+        raise ValueError(f"Pattern describes more than {MAX_PATTERN_ROOMS} rooms")
+    return specs
+
+def read_rooms_csv(file):
+    """Stream RoomSpec rows from a CSV with room number, capacity, price and optional status columns.
+
+    Values are passed through unparsed; validate_rooms checks them.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {}
+    for index, title in enumerate(header):
+        field = HEADER_ALIASES.get(" ".join(_HEADER_TOKEN.findall(title.lower())))
+        if field and field not in columns:
+            columns[field] = index
+    missing = {"room_number", "capacity", "price"} - set(columns)
+    if missing:
+        raise ValueError(f"CSV is missing the {', '.join(sorted(missing))} column(s)")
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    for line_number, row in enumerate(reader, start=2):
+        if not any(value.strip() for value in row):
+            continue
+        yield RoomSpec(
+            f"line {line_number}", cell(row, "room_number"), cell(row, "capacity"),
+            cell(row, "price"), cell(row, "status") or "Available"
+        )
+
+def validate_rooms(specs, existing_numbers):
+    """Check room specs against each other and the room numbers already taken.
+
+    `existing_numbers` is a set of room_key values; it is updated as rooms
+    are accepted, so duplicates within the batch are caught too. Returns
+    (rows ready to insert as (room_number, capacity, price, status), errors).
+    """
+    rows = []
+    errors = []
+    for spec in specs:
+        room_number = (spec.room_number or "").strip()
+        if not room_number:
+            errors.append(RoomError(spec.source, room_number, "Room number is required"))
+            continue
+        if len(room_number) > MAX_ROOM_NUMBER_LENGTH:
+            errors.append(RoomError(spec.source, room_number,
+                                    f"Room number is longer than {MAX_ROOM_NUMBER_LENGTH} characters"))
+            continue
+        if room_key(room_number) in existing_numbers:
+            errors.append(RoomError(spec.source, room_number, "Room number already exists"))
+            continue
+        try:
+            capacity = int(spec.capacity)
+        except (TypeError, ValueError):
+            errors.append(RoomError(spec.source, room_number, "Capacity must be a whole number"))
+            continue
+        if capacity < 1:
+            errors.append(RoomError(spec.source, room_number, "Capacity must be at least 1"))
+            continue
+        if spec.price is None or str(spec.price).strip() == "":
+            errors.append(RoomError(spec.source, room_number, "Price is required"))
+            continue
+        try:
+            price = Money.of(spec.price)
+        except (ValueError, ArithmeticError):
+            errors.append(RoomError(spec.source, room_number, "Price must be a valid amount"))
+            continue
+        if price < 0:
+            errors.append(RoomError(spec.source, room_number, "Price cannot be negative"))
+            continue
+        if price.to_decimal() > MAX_PRICE:
+            errors.append(RoomError(spec.source, room_number, f"Price cannot be more than {MAX_PRICE:,}"))
+            continue
+        status = (spec.status or "Available").strip().title()
+        if status not in NEW_ROOM_STATUSES:
+            errors.append(RoomError(spec.source, room_number,
+                                    f"Status must be one of {', '.join(NEW_ROOM_STATUSES)}"))
+            continue
+        existing_numbers.add(room_key(room_number))
+        rows.append((room_number, capacity, price.to_decimal(), status))
+    return rows, errors
@@ -0,0 +1,184 @@
+import csv
+import hashlib
+import re
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from src.utils.money import to_cents
+
+# Header spellings seen in GCash and bank exports, mapped to our field names
+HEADER_ALIASES = {
+    "date": "date",
+    "transaction date": "date",
+    "date time": "date",
+    "posting date": "date",
+    "reference": "reference",
+    "reference no": "reference",
+    "reference number": "reference",
+    "ref no": "reference",
+    "description": "reference",
+    "remarks": "reference",
+    "amount": "amount",
+    "credit": "amount",
+    "deposit": "amount",
+    "name": "name",
+    "sender": "name",
+    "sender name": "name",
+    "payer": "name",
+    "account name": "name",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y %I:%M %p", "%d %b %Y")
+
+# Points per matching signal; a line is posted only when exactly one tenant reaches MATCH_THRESHOLD
+REFERENCE_SCORE = 3
+NAME_SCORE = 3
+AMOUNT_SCORE = 2
+DATE_SCORE = 1
+MATCH_THRESHOLD = 5
+
+StatementLine = namedtuple("StatementLine", ["line_number", "date", "reference", "name", "amount_cents", "key"])
+MatchResult = namedtuple("MatchResult", ["line", "tenant_id", "reason", "candidates"])
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TENANT_CODE = re.compile(r"^t(\d+)$")
+
+def normalize_name(name):
+    return " ".join(_TOKEN.findall((name or "").lower()))
+
+def tenant_code(tenant_id):
+    """Code tenants are asked to put in the payment reference, e.g. T42"""
+    return f"T{tenant_id}"
+
+def _parse_date(value, cache):
+    value = (value or "").strip()
+    if value not in cache:
+        parsed = None
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt).date()
+                break
+            except ValueError:
+                continue
+        cache[value] = parsed
+    return cache[value]
+
+def line_key(payment_method, date, reference, amount_cents, occurrence):
+    """Idempotency key for a statement line, stable across re-imports of overlapping files"""
+    raw = f"{payment_method}|{date}|{(reference or '').strip().lower()}|{int(amount_cents)}|{occurrence}"
+    return "stmt:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def read_statement(file, payment_method):
+    """Stream StatementLine tuples from a CSV statement opened as text.
+
+    Lines without a positive amount (withdrawals, fees, blank rows) are skipped.
+    Identical lines without a reference get distinct keys by occurrence.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {}
+    for index, title in enumerate(header):
+        field = HEADER_ALIASES.get(normalize_name(title))
+        if field and field not in columns:
+            columns[field] = index
+    if "amount" not in columns:
+        raise ValueError("Statement has no amount column")
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    date_cache = {}
+    occurrences = defaultdict(int)
+    for line_number, row in enumerate(reader, start=2):
+        amount = cell(row, "amount").replace(",", "").replace("₱", "")
+        try:
+            amount_cents = to_cents(amount)
+        except Exception:
+            continue
+        if amount_cents <= 0:
+            continue
+        date = _parse_date(cell(row, "date"), date_cache)
+        reference = cell(row, "reference")
+        identity = (date, reference.lower(), amount_cents)
+        occurrence = occurrences[identity] if not reference else 0
+        occurrences[identity] += 1
+        yield StatementLine(
+            line_number, date, reference, cell(row, "name"), amount_cents,
+            line_key(payment_method, date, reference, amount_cents, occurrence)
+        )
+
+class StatementMatcher:
+    """Matches statement lines to tenants through hash indexes built once per import.
+
+    `tenants` is an iterable of (tenant_id, first_name, last_name, room_number,
+    check_in_date, check_out_date, price, balance). Each signal (reference code
+    or room, payer name, amount, date in stay) is a dictionary lookup, so
+    matching is linear in the number of lines.
+    """
+
+    def __init__(self, tenants):
+        self.by_code = {}
+        self.by_room = defaultdict(set)
+        self.by_name = defaultdict(set)
+        self.by_amount = defaultdict(set)
+        self.stays = {}
+
+        for tenant_id, first, last, room_number, check_in, check_out, price, balance in tenants:
+            self.by_code[tenant_code(tenant_id).lower()] = tenant_id
+            if room_number:
+                self.by_room[str(room_number).lower()].add(tenant_id)
+            first, last = normalize_name(first), normalize_name(last)
+            for name in {f"{first} {last}", f"{last} {first}"}:
+                self.by_name[name.strip()].add(tenant_id)
+            for amount in {to_cents(price), to_cents(balance)}:
+                if amount > 0:
+                    self.by_amount[amount].add(tenant_id)
+            self.stays[tenant_id] = (check_in, check_out)
+
+    def _reference_hits(self, reference):
+        hits = set()
+        for token in _TOKEN.findall(reference.lower()):
+            if _TENANT_CODE.match(token) and token in self.by_code:
+                hits.add(self.by_code[token])
+            elif token in self.by_room:
+                hits |= self.by_room[token]
+        return hits
+
+    def _in_stay(self, tenant_id, date):
+        check_in, check_out = self.stays[tenant_id]
+        return bool(date and check_in and check_in <= date and (check_out is None or date <= check_out))
+
+    def match(self, line):
+        """Return a MatchResult; tenant_id is None when the line needs review"""
+        reference_hits = self._reference_hits(line.reference) if line.reference else set()
+        name_hits = self.by_name.get(normalize_name(line.name), set()) if line.name else set()
+        amount_hits = self.by_amount.get(line.amount_cents, set())
+
+        candidates = reference_hits | name_hits
+        if not candidates:
+            # Only an amount to go on; never enough on its own
+            reason = "Amount matches several tenants" if len(amount_hits) > 1 else "No matching tenant"
+            return MatchResult(line, None, reason, sorted(amount_hits)[:10])
+
+        scores = {}
+        for tenant_id in candidates:
+            score = 0
+            if tenant_id in reference_hits:
+                score += REFERENCE_SCORE
+            if tenant_id in name_hits:
+                score += NAME_SCORE
+            if tenant_id in amount_hits:
+                score += AMOUNT_SCORE
+            if self._in_stay(tenant_id, line.date):
+                score += DATE_SCORE
+            scores[tenant_id] = score
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        best = ranked[0]
+        if scores[best] < MATCH_THRESHOLD:
+            return MatchResult(line, None, "Weak match", ranked[:10])
+        if len(ranked) > 1 and scores[ranked[1]] == scores[best]:
+            return MatchResult(line, None, "Ambiguous match", ranked[:10])
+        return MatchResult(line, best, None, ranked[:10])
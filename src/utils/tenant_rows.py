@@ -0,0 +1,148 @@
+import csv
+import re
+from collections import namedtuple
+from datetime import datetime
+from src.utils.room_specs import room_key
+from src.utils.statement_matching import DATE_FORMATS
+
+# Column sizes from the tenants table
+MAX_NAME_LENGTH = 50
+MAX_EMAIL_LENGTH = 100
+MAX_PHONE_LENGTH = 20
+
+TenantRow = namedtuple("TenantRow", [
+    "line_number", "first_name", "last_name", "email", "phone", "room_number", "check_in", "check_out"
+])
+TenantError = namedtuple("TenantError", ["line_number", "field", "value", "reason"])
+
+HEADER_ALIASES = {
+    "first name": "first_name",
+    "firstname": "first_name",
+    "given name": "first_name",
+    "last name": "last_name",
+    "lastname": "last_name",
+    "surname": "last_name",
+    "family name": "last_name",
+    "email": "email",
+    "email address": "email",
+    "phone": "phone",
+    "phone number": "phone",
+    "contact": "phone",
+    "contact number": "phone",
+    "mobile": "phone",
+    "room": "room_number",
+    "room no": "room_number",
+    "room number": "room_number",
+    "check in": "check_in",
+    "check in date": "check_in",
+    "move in": "check_in",
+    "check out": "check_out",
+    "check out date": "check_out",
+    "move out": "check_out",
+}
+
+_HEADER_TOKEN = re.compile(r"[a-z0-9]+")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def email_key(email):
+    """Comparison key for emails; the column's collation ignores case"""
+    return (email or "").strip().lower()
+
+def read_tenants_csv(file):
+    """Stream TenantRow tuples from a CSV opened as text; values are checked by TenantValidator"""
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {}
+    for index, title in enumerate(header):
+        field = HEADER_ALIASES.get(" ".join(_HEADER_TOKEN.findall(title.lower())))
+        if field and field not in columns:
+            columns[field] = index
+    missing = {"first_name", "last_name"} - set(columns)
+    if missing:
+        raise ValueError(f"CSV is missing the {', '.join(sorted(missing))} column(s)")
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    for line_number, row in enumerate(reader, start=2):
+        if not any(value.strip() for value in row):
+            continue
+        yield TenantRow(line_number, *(cell(row, field) for field in TenantRow._fields[1:]))
+
+class TenantValidator:
+    """Checks imported tenant rows against in-memory copies of the rooms and emails.
+
+    `rooms` is an iterable of (room_id, room_number, capacity, occupancy,
+    status). Room numbers resolve through a dictionary, and each accepted
+    tenant takes a place in the in-memory occupancy, so a file can't
+    overfill a room. Emails already taken, or repeated in the file, are
+    rejected.
+    """
+
+    def __init__(self, rooms, existing_emails):
+        self.rooms = {}
+        self.free_places = {}
+        for room_id, room_number, capacity, occupancy, status in rooms:
+            self.rooms[room_key(room_number)] = (room_id, status)
+            self.free_places[room_id] = capacity - occupancy
+        self.emails = set(existing_emails)
+        self.date_cache = {}
+
+    def _date(self, value):
+        if value not in self.date_cache:
+            parsed = None
+            for fmt in DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(value, fmt).date()
+                    break
+                except ValueError:
+                    continue
+            self.date_cache[value] = parsed
+        return self.date_cache[value]
+
+    def validate(self, row):
+        """Insert values (first, last, email, phone, room_id, check_in, check_out) for a row, or a TenantError"""
+        for field in ("first_name", "last_name"):
+            value = getattr(row, field)
+            if not value:
+                return TenantError(row.line_number, field, value, "Required")
+            if len(value) > MAX_NAME_LENGTH:
+                return TenantError(row.line_number, field, value, f"Longer than {MAX_NAME_LENGTH} characters")
+
+        email = row.email or None
+        if email:
+            if len(email) > MAX_EMAIL_LENGTH or not _EMAIL.match(email):
+                return TenantError(row.line_number, "email", email, "Not a valid email address")
+            if email_key(email) in self.emails:
+                return TenantError(row.line_number, "email", email, "Email already belongs to a tenant")
+        if len(row.phone) > MAX_PHONE_LENGTH:
+            return TenantError(row.line_number, "phone", row.phone, f"Longer than {MAX_PHONE_LENGTH} characters")
+
+        dates = {}
+        for field in ("check_in", "check_out"):
+            value = getattr(row, field)
+            dates[field] = self._date(value) if value else None
+            if value and dates[field] is None:
+                return TenantError(row.line_number, field, value, "Not a recognised date")
+        if dates["check_in"] and dates["check_out"] and dates["check_out"] < dates["check_in"]:
+            return TenantError(row.line_number, "check_out", row.check_out, "Check-out is before check-in")
+
+        room_id = None
+        if row.room_number:
+            room = self.rooms.get(room_key(row.room_number))
+            if room is None:
+                return TenantError(row.line_number, "room_number", row.room_number, "No such room")
+            room_id, status = room
+            if status == "Maintenance":
+                return TenantError(row.line_number, "room_number", row.room_number, "Room is under maintenance")
+            if self.free_places[room_id] < 1:
+                return TenantError(row.line_number, "room_number", row.room_number, "Room is at full capacity")
+            self.free_places[room_id] -= 1
+
+        if email:
+            self.emails.add(email_key(email))
+        return (row.first_name, row.last_name, email, row.phone or None, room_id,
+                dates["check_in"], dates["check_out"])
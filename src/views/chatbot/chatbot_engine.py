@@ -0,0 +1,114 @@
+import threading
+import time
+from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
+import torch
+
+MODEL_NAME = "microsoft/DialoGPT-medium"
+
+FALLBACK_RESPONSE = "I'm sorry, I'm having trouble connecting to my brain right now. Please try again later."
+ERROR_RESPONSE = "I'm having trouble thinking right now. Please try again."
+EMPTY_RESPONSE = "I'm not sure how to respond to that."
+
+class ChatbotEngine:
+    """Loads the chatbot model and generates replies, independent of the UI"""
+
+    def __init__(self, model_name=MODEL_NAME):
+        self.model_name = model_name
+        self.model = None
+        self.tokenizer = None
+        self.load_time = None
+
+    def load(self):
+        """Load the model and tokenizer, recording how long it took"""
+        start = time.perf_counter()
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
+            # Set pad token if not set
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+                self.model.config.pad_token_id = self.model.config.eos_token_id
+            self.model.eval()
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            # Fallback to a simple response if model fails to load
+            self.model = None
+            self.tokenizer = None
+        self.load_time = time.perf_counter() - start
+
+    @property
+    def is_loaded(self):
+        return self.model is not None and self.tokenizer is not None
+
+    def _generate(self, user_input, streamer=None):
+        # Encode the input with attention mask
+        inputs = self.tokenizer(user_input + self.tokenizer.eos_token, return_tensors='pt', padding=True)
+        input_ids = inputs['input_ids']
+        with torch.no_grad():
+            chat_response_ids = self.model.generate(
+                input_ids,
+                attention_mask=inputs['attention_mask'],
+                max_length=1000,
+                pad_token_id=self.tokenizer.pad_token_id,
+                no_repeat_ngram_size=3,
+                do_sample=True,
+                top_k=100,
+                top_p=0.7,
+                temperature=0.8,
+                streamer=streamer
+            )
+        return chat_response_ids[:, input_ids.shape[-1]:][0]
+
+    def get_bot_response(self, user_input):
+        if not self.is_loaded:
+            return FALLBACK_RESPONSE
+
+        try:
+            response = self.tokenizer.decode(self._generate(user_input), skip_special_tokens=True)
+            return response if response else EMPTY_RESPONSE
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return ERROR_RESPONSE
+
+    def stream_bot_response(self, user_input):
+        """Yield the reply as decoded text chunks while it is being generated"""
+        if not self.is_loaded:
+            yield FALLBACK_RESPONSE
+            return
+
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def run():
+            try:
+                self._generate(user_input, streamer)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        for chunk in streamer:
+            if chunk:
+                yield chunk
+        worker.join()
+        if errors:
+            print(f"Error generating response: {errors[0]}")
+            yield ERROR_RESPONSE
+
+    def count_tokens(self, text):
+        if not self.is_loaded:
+            return len(text.split())
+        return len(self.tokenizer.encode(text))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_chatbot_engine():
+    """Return the shared engine, loading the model on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ChatbotEngine()
+            _engine.load()
+        return _engine
@@ -1,76 +1,112 @@
 import flet as ft
 from flet_core import colors
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
+from src.models.chat_messages import ChatMessageStore
+from src.views.chatbot.chatbot_engine import get_chatbot_engine
+
+# Maximum number of messages kept in the rendered transcript
+MAX_RENDERED_MESSAGES = 100
+# Number of messages loaded at a time when scrolling through history
+HISTORY_PAGE_SIZE = 20
+
+def get_chat_store(page: ft.Page) -> ChatMessageStore:
+    """The page's chat store, kept for the whole session so revisits continue the same transcript"""
+    username = page.client_storage.get("current_user")
+    store = page.session.get("chat_store")
+    if store is None or store.username != username:
+        if store is not None:
+            store.flush()
+        store = ChatMessageStore(username)
+        page.session.set("chat_store", store)
+    return store
+
+def flush_chat_store(page: ft.Page):
+    """Persist buffered chat messages; called when leaving the chatbot and on disconnect"""
+    store = page.session.get("chat_store")
+    if store is not None:
+        store.flush()
 
 def get_chatbot_view(page: ft.Page) -> ft.Container:
+    # Full transcript is persisted; only a window of it is rendered
+    message_store = get_chat_store(page)
+
+    def on_history_scroll(e: ft.OnScrollEvent):
+        if e.pixels <= e.min_scroll_extent:
+            load_older_messages()
+        elif e.pixels >= e.max_scroll_extent and not is_at_tail():
+            load_newer_messages()
+
     # Initialize chat history
     chat_history = ft.ListView(
         expand=True,
         spacing=10,
         padding=20,
-        auto_scroll=True
+        auto_scroll=True,
+        on_scroll=on_history_scroll,
+        on_scroll_interval=100
     )
 
-    # Initialize the model and tokenizer
-    try:
-        tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-medium")
-        model = AutoModelForCausalLM.from_pretrained("microsoft/DialoGPT-medium")
-        # Set pad token if not set
-        if tokenizer.pad_token is None:
-            tokenizer.pad_token = tokenizer.eos_token
-            model.config.pad_token_id = model.config.eos_token_id
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        # Fallback to a simple response if model fails to load
-        model = None
-        tokenizer = None
+    # Shared engine; the model is only loaded once per process
+    engine = get_chatbot_engine()
 
     def get_bot_response(user_input):
-        if model is None or tokenizer is None:
-            return "I'm sorry, I'm having trouble connecting to my brain right now. Please try again later."
-
-        try:
-            # Encode the input with attention mask
-            inputs = tokenizer(user_input + tokenizer.eos_token, return_tensors='pt', padding=True)
-            input_ids = inputs['input_ids']
-            attention_mask = inputs['attention_mask']
-            
-            # Generate response
-            chat_response_ids = model.generate(
-                input_ids,
-                attention_mask=attention_mask,
-                max_length=1000,
-                pad_token_id=tokenizer.pad_token_id,
-                no_repeat_ngram_size=3,
-                do_sample=True,
-                top_k=100,
-                top_p=0.7,
-                temperature=0.8
-            )
-            
-            # Decode and return the response
-            response = tokenizer.decode(chat_response_ids[:, input_ids.shape[-1]:][0], skip_special_tokens=True)
-            return response if response else "I'm not sure how to respond to that."
-        except Exception as e:
-            print(f"Error generating response: {e}")
-            return "I'm having trouble thinking right now. Please try again."
+        return engine.get_bot_response(user_input)
+
+    def build_message(message, is_user, seq):
+        return ft.Container(
+            content=ft.Text(
+                message,
+                color="white" if is_user else colors.WHITE,
+                size=16
+            ),
+            bgcolor=colors.BLUE if is_user else colors.BLUE_GREY_900,
+            padding=10,
+            border_radius=10,
+            alignment=ft.alignment.center_right if is_user else ft.alignment.center_left,
+            margin=ft.margin.only(left=50 if is_user else 0, right=0 if is_user else 50),
+            data=seq
+        )
+
+    def is_at_tail():
+        return not chat_history.controls or chat_history.controls[-1].data == message_store.last_seq
+
+    def show_latest_messages():
+        chat_history.controls = [
+            build_message(message, bool(is_user), seq)
+            for seq, is_user, message in message_store.fetch_latest(MAX_RENDERED_MESSAGES)
+        ]
+
+    def load_older_messages():
+        if not chat_history.controls:
+            return
+        older = message_store.fetch_before(chat_history.controls[0].data, HISTORY_PAGE_SIZE)
+        if not older:
+            return
+        chat_history.controls[:0] = [build_message(message, bool(is_user), seq) for seq, is_user, message in older]
+        # Drop the newest messages to stay within the rendered window
+        del chat_history.controls[MAX_RENDERED_MESSAGES:]
+        chat_history.auto_scroll = False
+        page.update()
+
+    def load_newer_messages():
+        newer = message_store.fetch_after(chat_history.controls[-1].data, HISTORY_PAGE_SIZE)
+        if not newer:
+            return
+        chat_history.controls.extend(build_message(message, bool(is_user), seq) for seq, is_user, message in newer)
+        # Drop the oldest messages to stay within the rendered window
+        del chat_history.controls[:-MAX_RENDERED_MESSAGES]
+        chat_history.auto_scroll = is_at_tail()
+        page.update()
 
     def add_message(message, is_user=True):
-        chat_history.controls.append(
-            ft.Container(
-                content=ft.Text(
-                    message,
-                    color="white" if is_user else colors.WHITE,
-                    size=16
-                ),
-                bgcolor=colors.BLUE if is_user else colors.BLUE_GREY_900,
-                padding=10,
-                border_radius=10,
-                alignment=ft.alignment.center_right if is_user else ft.alignment.center_left,
-                margin=ft.margin.only(left=50 if is_user else 0, right=0 if is_user else 50)
-            )
-        )
+        was_at_tail = is_at_tail()
+        seq = message_store.add(message, is_user)
+        if was_at_tail:
+            chat_history.controls.append(build_message(message, is_user, seq))
+            del chat_history.controls[:-MAX_RENDERED_MESSAGES]
+        else:
+            # User had scrolled back through history; jump to the latest messages
+            show_latest_messages()
+        chat_history.auto_scroll = True
         page.update()
 
     def on_send_click(e):
@@ -119,8 +155,11 @@ def get_chatbot_view(page: ft.Page) -> ft.Container:
         alignment=ft.MainAxisAlignment.SPACE_BETWEEN
     )
 
-    # Welcome message
-    add_message("Hello! I'm your Customer Service and Hospitality Assistant. How can I help you today?", False)
+    # Welcome message on the first visit; later visits pick up where the transcript left off
+    if message_store.last_seq == 0:
+        add_message("Hello! I'm your Customer Service and Hospitality Assistant. How can I help you today?", False)
+    else:
+        show_latest_messages()
 
     # Main container
     chat_container = ft.Container(
@@ -0,0 +1,70 @@
+import flet as ft
+from datetime import date
+from src.models.exports import EXPORTS, get_export_queue
+
+class ExportMenu:
+    """Export button, save dialog and progress display for one of EXPORTS"""
+
+    def __init__(self, page: ft.Page, name: str, color=None):
+        self.page = page
+        self.name = name
+        self.exports = get_export_queue()
+        self.extension = None
+
+        # Progress of the running export
+        self.progress = ft.ProgressBar(width=150, value=0, visible=False)
+        self.status = ft.Text("", size=12, color=color, visible=False)
+
+        # File picker for choosing where to save
+        self.picker = ft.FilePicker(on_result=self.handle_save)
+        self.page.overlay.append(self.picker)
+
+        self.button = ft.PopupMenuButton(
+            icon=ft.Icons.DOWNLOAD,
+            tooltip=f"Export {EXPORTS[name].title.lower()}",
+            items=[
+                ft.PopupMenuItem(text="Export CSV", on_click=lambda e: self.choose("csv")),
+                ft.PopupMenuItem(text="Export Excel (.xlsx)", on_click=lambda e: self.choose("xlsx")),
+            ]
+        )
+
+    def build(self):
+        return ft.Row([ft.Column([self.status, self.progress], spacing=2), self.button], spacing=10)
+
+    def show_message(self, message: str):
+        self.page.snack_bar = ft.SnackBar(content=ft.Text(message))
+        self.page.snack_bar.open = True
+        self.page.update()
+
+    def choose(self, extension):
+        self.extension = extension
+        self.picker.save_file(
+            dialog_title=f"Export {EXPORTS[self.name].title.lower()}",
+            file_name=f"{self.name}_{date.today()}.{extension}",
+            allowed_extensions=[extension]
+        )
+
+    def handle_save(self, e: ft.FilePickerResultEvent):
+        if not e.path:
+            return
+        path = e.path if e.path.lower().endswith(f".{self.extension}") else f"{e.path}.{self.extension}"
+        try:
+            self.exports.submit(self.name, path, self.show_progress)
+        except Exception as ex:
+            print(f"Error starting export: {str(ex)}")
+            self.show_message(f"Error starting export: {ex}")
+
+    def show_progress(self, job):
+        """Called from the export queue as rows are written"""
+        self.progress.visible = job.status in ("Queued", "Running")
+        self.progress.value = job.progress if job.total else None
+        self.status.visible = True
+        self.status.value = f"{job.label}: {job.done:,}/{job.total:,} rows"
+        if job.status == "Completed":
+            self.status.value = f"{job.label}: {job.done:,} rows"
+            self.show_message(f"Exported {job.done:,} rows to {job.path}")
+        elif job.status == "Failed":
+            self.status.value = f"{job.label} failed"
+            self.show_message(f"Error exporting {job.label.lower()}: {job.error}")
+        else:
+            self.page.update()
@@ -6,15 +6,41 @@ from flet_core.colors import (
 from flet_core.icons import (
     SEARCH, REFRESH, PAYMENT, EDIT, DELETE
 )
-from datetime import datetime, date
-from src.models.database import Database
+import threading
+import uuid
+from src.models.ledger import StaleBalanceError
+from src.models.payment_service import get_payment_service
+from src.models.aging import AgingReport, BUCKETS
+from src.models.billing_run import BillingRun, current_period
+from src.models.document_jobs import get_document_queue
+from src.models.statement_import import StatementImporter
+from src.views.export_menu import ExportMenu
+from src.utils.money import Money
 
 class PaymentsView:
     def __init__(self, page: ft.Page):
         self.page = page
-        self.db = Database()
+        self.service = get_payment_service()
+        self.documents = get_document_queue()
+        
+        # Progress of background receipt/statement generation
+        self.document_progress = ft.ProgressBar(width=150, value=0, visible=False)
+        self.document_status = ft.Text("", size=12, color=GREY_700, visible=False)
         self.payments_table = None
         self.summary_cards = None
+        self.statement_method = None
+        
+        # File picker for bank/GCash statement imports
+        self.statement_picker = ft.FilePicker(on_result=self.handle_statement_picked)
+        self.page.overlay.append(self.statement_picker)
+        
+        # File picker for saving the aging report
+        self.aging = AgingReport()
+        self.aging_export_picker = ft.FilePicker(on_result=self.handle_aging_export)
+        self.page.overlay.append(self.aging_export_picker)
+        
+        # Export of the full payment history
+        self.export_menu = ExportMenu(self.page, "payments", GREY_700)
         
         # Set page background color
         self.page.bgcolor = BLUE_GREY_50
@@ -67,42 +93,13 @@ class PaymentsView:
         self.page.snack_bar.open = True
         self.page.update()
         
-    def calculate_rent(self, check_in_date, check_out_date, room_price):
-        if not check_out_date:
-            check_out_date = date.today()
-        
-        # Calculate months between dates
-        months = (check_out_date.year - check_in_date.year) * 12 + check_out_date.month - check_in_date.month
-        if check_out_date.day > check_in_date.day:
-            months += 1
-            
-        return months * room_price
-        
-    def refresh_payments(self):
+    def refresh_payments(self, refresh_summary=True):
         try:
             print("Fetching tenants for payments view...")
-            # Get all active tenants with their room and payment information
-            query = """
-                SELECT 
-                    t.tenant_id, 
-                    t.first_name, 
-                    t.last_name, 
-                    t.check_in_date, 
-                    t.check_out_date,
-                    r.price as room_price, 
-                    r.room_number,
-                    COALESCE(p.amount_rent, 0) as amount_rent,
-                    COALESCE(p.amount_paid, 0) as amount_paid,
-                    COALESCE(p.balance, 0) as balance,
-                    COALESCE(p.status, 'Pending') as status,
-                    p.payment_id
-                FROM tenants t
-                JOIN rooms r ON t.room_id = r.room_id
-                LEFT JOIN payments p ON t.tenant_id = p.tenant_id
-                WHERE (t.check_out_date IS NULL OR t.check_out_date > CURRENT_DATE)
-                ORDER BY t.last_name, t.first_name
-            """
-            tenants = self.db.fetch_all(query)
+            # Reloading the list picks up writes made outside the service (billing, imports)
+            if refresh_summary:
+                self.service.invalidate()
+            tenants = self.service.active_balances()
             
             print(f"Found {len(tenants) if tenants else 0} tenants")
             
@@ -113,38 +110,14 @@ class PaymentsView:
             # Clear existing rows
             self.payments_table.rows.clear()
             
-            # Initialize totals
-            total_rent = 0
-            total_paid = 0
-            total_balance = 0
-            
             # Add tenant rows
             for tenant in tenants:
                 print(f"Processing tenant: {tenant[1]} {tenant[2]}")
-                # Calculate current rent if no payment record exists
-                if not tenant[11]:  # payment_id is NULL
-                    current_rent = self.calculate_rent(
-                        tenant[3],  # check_in_date
-                        tenant[4],  # check_out_date
-                        tenant[5]   # room_price
-                    )
-                    amount_rent = current_rent
-                    amount_paid = 0
-                    balance = current_rent
-                    status = "Pending"
-                else:
-                    amount_rent = float(tenant[7])
-                    amount_paid = float(tenant[8])
-                    balance = float(tenant[9])
-                    status = tenant[10]
-                
-                # Update totals
-                total_rent += amount_rent
-                total_paid += amount_paid
-                total_balance += balance
+                amount_rent, amount_paid, balance = tenant[4], tenant[5], tenant[6]
+                status = "Paid" if balance <= 0 else "Pending"
+                has_payments = amount_paid > 0
                 
-                print(f"Adding row for tenant: {tenant[1]} {tenant[2]}, Room: {tenant[6]}, Balance: {balance}")
-                print(f"Current totals - Rent: {total_rent}, Paid: {total_paid}, Balance: {total_balance}")
+                print(f"Adding row for tenant: {tenant[1]} {tenant[2]}, Room: {tenant[3]}, Balance: {balance}")
                 
                 # Create action buttons with enhanced styling
                 action_buttons = ft.Row([
@@ -165,8 +138,8 @@ class PaymentsView:
                         style=ft.ButtonStyle(
                             shape=ft.RoundedRectangleBorder(radius=5),
                         ),
-                        on_click=lambda e, id=tenant[11]: self.edit_payment(id) if tenant[11] else None
-                    ) if tenant[11] else ft.Container(),
+                        on_click=lambda e, id=tenant[0]: self.edit_payment(id)
+                    ) if has_payments else ft.Container(),
                     ft.IconButton(
                         icon=DELETE,
                         icon_color=RED,
@@ -174,8 +147,8 @@ class PaymentsView:
                         style=ft.ButtonStyle(
                             shape=ft.RoundedRectangleBorder(radius=5),
                         ),
-                        on_click=lambda e, id=tenant[11]: self.delete_payment(id) if tenant[11] else None
-                    ) if tenant[11] else ft.Container()
+                        on_click=lambda e, id=tenant[0]: self.delete_payment(id)
+                    ) if has_payments else ft.Container()
                 ], spacing=5)
                 
                 # Create status badge with enhanced styling
@@ -199,7 +172,7 @@ class PaymentsView:
                     ft.DataRow(
                         cells=[
                             ft.DataCell(ft.Text(f"{tenant[1]} {tenant[2]}", weight=ft.FontWeight.W_500, color=BLACK)),
-                            ft.DataCell(ft.Text(f"Room {tenant[6]}", weight=ft.FontWeight.W_500, color=BLACK)),
+                            ft.DataCell(ft.Text(f"Room {tenant[3]}", weight=ft.FontWeight.W_500, color=BLACK)),
                             ft.DataCell(ft.Text(f"₱{amount_rent:,.2f}", weight=ft.FontWeight.W_500, color=BLACK)),
                             ft.DataCell(ft.Text(f"₱{amount_paid:,.2f}", weight=ft.FontWeight.W_500, color=BLACK)),
                             ft.DataCell(ft.Text(f"₱{balance:,.2f}", weight=ft.FontWeight.W_500, color=BLACK)),
@@ -209,9 +182,10 @@ class PaymentsView:
                     )
                 )
             
-            print(f"Final totals - Rent: {total_rent}, Paid: {total_paid}, Balance: {total_balance}")
             # Update summary cards
-            self.update_summary_cards(total_rent, total_paid, total_balance)
+            totals = self.service.summary_totals()
+            print(f"Totals - Rent: {totals[0]}, Paid: {totals[1]}, Balance: {totals[2]}")
+            self.update_summary_cards(*totals)
             
             print("Updating payments table...")
             self.page.update()
@@ -234,26 +208,7 @@ class PaymentsView:
         try:
             print(f"Adding payment for tenant ID: {tenant_id}")
             # Get tenant information
-            query = """
-                SELECT 
-                    t.tenant_id, 
-                    t.first_name, 
-                    t.last_name, 
-                    t.check_in_date, 
-                    t.check_out_date,
-                    r.price as room_price,
-                    r.room_number,
-                    COALESCE(p.amount_rent, 0) as amount_rent,
-                    COALESCE(p.amount_paid, 0) as amount_paid,
-                    COALESCE(p.balance, 0) as balance,
-                    COALESCE(p.status, 'Pending') as status,
-                    p.payment_id
-                FROM tenants t
-                JOIN rooms r ON t.room_id = r.room_id
-                LEFT JOIN payments p ON t.tenant_id = p.tenant_id
-                WHERE t.tenant_id = %s
-            """
-            tenant = self.db.fetch_one(query, (tenant_id,))
+            tenant = self.service.get_tenant(tenant_id)
             
             if not tenant:
                 self.show_error("Tenant not found")
@@ -261,27 +216,12 @@ class PaymentsView:
                 
             print(f"Found tenant: {tenant[1]} {tenant[2]}")
             
-            # Calculate current rent if no payment record exists
-            if not tenant[11]:  # payment_id is NULL
-                current_rent = self.calculate_rent(
-                    tenant[3],  # check_in_date
-                    tenant[4],  # check_out_date
-                    tenant[5]   # room_price
-                )
-                amount_rent = current_rent
-                amount_paid = 0
-                balance = current_rent
-                status = "Pending"
-            else:
-                amount_rent = float(tenant[7])
-                amount_paid = float(tenant[8])
-                balance = float(tenant[9])
-                status = tenant[10]
+            balance = tenant[6]
             
             # Create payment form
             amount_field = ft.TextField(
                 label="Amount",
-                value=str(balance),
+                value=f"{balance:.2f}",
                 prefix_text="₱",
                 keyboard_type=ft.KeyboardType.NUMBER,
                 width=200,
@@ -309,9 +249,12 @@ class PaymentsView:
                 color=BLACK
             )
             
+            # One key per form, so resubmitting the same form never posts twice
+            idempotency_key = uuid.uuid4().hex
+
             def save_payment(e):
                 try:
-                    amount = float(amount_field.value)
+                    amount = Money.of(amount_field.value)
                     if amount <= 0:
                         self.show_error("Amount must be greater than 0")
                         return
@@ -320,28 +263,17 @@ class PaymentsView:
                         self.show_error("Please select a payment method")
                         return
                         
-                    # Insert payment record
-                    query = """
-                        INSERT INTO payments (
-                            tenant_id, amount_rent, amount_paid, balance,
-                            payment_date, payment_method, status, description
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    values = (
-                        tenant_id,
-                        amount_rent,
-                        amount,
-                        balance - amount,
-                        datetime.now().date(),
-                        payment_method.value,
-                        "Paid" if amount >= balance else "Pending",
-                        description.value
+                    # Append the payment to the ledger; a repeated click or retry reuses the
+                    # form's idempotency key and gets the original posting back
+                    posting = self.service.post_payment(
+                        tenant_id, amount, payment_method.value, description.value,
+                        idempotency_key=idempotency_key
                     )
-                    
-                    self.db.execute(query, values)
+                    if not posting.duplicate:
+                        self.documents.submit_receipt(posting.transaction_id, self.show_document_progress)
                     self.show_success("Payment added successfully")
                     self.page.go("/payments")
-                    self.refresh_payments()
+                    self.refresh_payments(refresh_summary=False)
                     
                 except Exception as e:
                     print(f"Error saving payment: {str(e)}")
@@ -367,7 +299,7 @@ class PaymentsView:
                             controls=[
                                 ft.Text("Add Payment", size=30, weight=ft.FontWeight.BOLD, color=BLACK),
                                 ft.Text(f"Tenant: {tenant[1]} {tenant[2]}", size=16, color=BLACK),
-                                ft.Text(f"Room: {tenant[6]}", size=16, color=BLACK),
+                                ft.Text(f"Room: {tenant[3]}", size=16, color=BLACK),
                                 ft.Text(f"Amount Due: ₱{balance:,.2f}", size=16, color=BLACK),
                                 amount_field,
                                 payment_method,
@@ -506,12 +438,67 @@ class PaymentsView:
                 on_click=lambda e: self.refresh_payments()
             )
 
+            # Create month-end statements button
+            statements_button = ft.ElevatedButton(
+                "Statements",
+                icon=ft.Icons.PICTURE_AS_PDF,
+                style=ft.ButtonStyle(
+                    color=WHITE,
+                    bgcolor=BLUE_700,
+                    shape=ft.RoundedRectangleBorder(radius=10),
+                    padding=ft.padding.symmetric(horizontal=20, vertical=15),
+                ),
+                on_click=lambda e: self.generate_statements()
+            )
+
+            # Create billing run button
+            billing_button = ft.ElevatedButton(
+                "Run Billing",
+                icon=ft.Icons.RECEIPT_LONG,
+                style=ft.ButtonStyle(
+                    color=WHITE,
+                    bgcolor=GREEN,
+                    shape=ft.RoundedRectangleBorder(radius=10),
+                    padding=ft.padding.symmetric(horizontal=20, vertical=15),
+                ),
+                on_click=self.run_billing
+            )
+
+            # Create aging report button
+            aging_button = ft.ElevatedButton(
+                "Aging",
+                icon=ft.Icons.HOURGLASS_BOTTOM,
+                style=ft.ButtonStyle(
+                    color=WHITE,
+                    bgcolor=ORANGE,
+                    shape=ft.RoundedRectangleBorder(radius=10),
+                    padding=ft.padding.symmetric(horizontal=20, vertical=15),
+                ),
+                on_click=lambda e: self.show_aging_report()
+            )
+
+            # Create statement import menu
+            import_button = ft.PopupMenuButton(
+                icon=ft.Icons.UPLOAD_FILE,
+                tooltip="Import statement",
+                items=[
+                    ft.PopupMenuItem(text="GCash statement", on_click=lambda e: self.pick_statement("GCash")),
+                    ft.PopupMenuItem(text="Bank statement", on_click=lambda e: self.pick_statement("Bank Transfer")),
+                    ft.PopupMenuItem(text="Review unmatched lines", on_click=lambda e: self.show_statement_reviews()),
+                ]
+            )
+
             # Create header with enhanced styling
             header = ft.Container(
                 content=ft.Row(
                     [
                         ft.Text("Tenant Payments", size=32, weight=ft.FontWeight.BOLD, color=BLACK),
-                        ft.Row([search_field, refresh_button], spacing=15)
+                        ft.Row([
+                            search_field,
+                            ft.Column([self.document_status, self.document_progress], spacing=2),
+                            self.export_menu.build(),
+                            import_button, aging_button, statements_button, billing_button, refresh_button
+                        ], spacing=15)
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                 ),
@@ -565,6 +552,290 @@ class PaymentsView:
             self.show_error(f"Error building payments view: {e}")
             return ft.Text("Error loading payments", color=BLACK)
 
+    def run_billing(self, e):
+        """Generate this month's invoices in the background, then reload the table"""
+        e.control.disabled = True
+        self.page.update()
+
+        def worker():
+            try:
+                report = BillingRun().run()
+                self.show_success(
+                    f"Billed {report['invoices_created']} tenants for {report['period']} "
+                    f"({report['invoices_per_s']:.0f} invoices/s)"
+                )
+                self.refresh_payments()
+            except Exception as ex:
+                print(f"Error running billing: {str(ex)}")
+                self.show_error(f"Error running billing: {ex}")
+            finally:
+                e.control.disabled = False
+                self.page.update()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_aging_report(self):
+        """Show who owes what and for how long, read from the arrears_aging summary"""
+        try:
+            # Rows are refreshed on every ledger write; a stale day means the nightly rebuild was missed
+            if self.aging.is_stale():
+                self.aging.rebuild()
+            totals = self.aging.totals()
+            rows = self.aging.fetch_rows()
+
+            bucket_colors = [GREEN_700, ORANGE, ORANGE_700, RED_700]
+            cards = ft.Row([
+                ft.Card(
+                    content=ft.Container(
+                        content=ft.Column([
+                            ft.Text(label, size=16, weight=ft.FontWeight.BOLD),
+                            ft.Text(f"₱{total:,.2f}", size=24, weight=ft.FontWeight.BOLD, color=color)
+                        ]),
+                        padding=20
+                    ),
+                    width=200
+                )
+                for (label, _, _, _), total, color in zip(BUCKETS, totals, bucket_colors)
+            ], spacing=20)
+
+            table = ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text("Tenant", weight=ft.FontWeight.BOLD, color=BLACK)),
+                    ft.DataColumn(ft.Text("Room", weight=ft.FontWeight.BOLD, color=BLACK)),
+                ] + [
+                    ft.DataColumn(ft.Text(label, weight=ft.FontWeight.BOLD, color=BLACK), numeric=True)
+                    for label, _, _, _ in BUCKETS
+                ] + [
+                    ft.DataColumn(ft.Text("Total Due", weight=ft.FontWeight.BOLD, color=BLACK), numeric=True),
+                    ft.DataColumn(ft.Text("Oldest Unpaid", weight=ft.FontWeight.BOLD, color=BLACK)),
+                ],
+                rows=[
+                    ft.DataRow(cells=[
+                        ft.DataCell(ft.Text(f"{row[1]} {row[2]}", color=BLACK)),
+                        ft.DataCell(ft.Text(str(row[3] or "N/A"), color=BLACK)),
+                    ] + [
+                        ft.DataCell(ft.Text(f"₱{amount:,.2f}" if amount else "-", color=BLACK))
+                        for amount in row[4:8]
+                    ] + [
+                        ft.DataCell(ft.Text(f"₱{row[8]:,.2f}", color=BLACK, weight=ft.FontWeight.BOLD)),
+                        ft.DataCell(ft.Text(str(row[9] or ""), color=BLACK)),
+                    ])
+                    for row in rows
+                ],
+                heading_row_color=BLUE_GREY_100,
+            )
+
+            as_of = rows[0][10] if rows else None
+            aging_view = ft.View(
+                "/payments/aging",
+                [
+                    ft.Column([
+                        ft.Row([
+                            ft.Text(f"{len(rows)} tenants in arrears" + (f" as of {as_of}" if as_of else ""),
+                                    size=16, color=BLACK),
+                            ft.ElevatedButton(
+                                "Export CSV",
+                                icon=ft.Icons.DOWNLOAD,
+                                on_click=lambda e: self.aging_export_picker.save_file(
+                                    dialog_title="Export aging report",
+                                    file_name=f"aging_{as_of or 'report'}.csv",
+                                    allowed_extensions=["csv"]
+                                )
+                            )
+                        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                        cards,
+                        ft.Container(content=ft.Column([table], scroll=ft.ScrollMode.AUTO), expand=True)
+                    ], expand=True, spacing=20)
+                ],
+                appbar=ft.AppBar(
+                    title=ft.Text("Arrears Aging", color=WHITE),
+                    bgcolor=BLUE_GREY_100,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/payments")
+                    )
+                ),
+                padding=20
+            )
+
+            self.page.views.append(aging_view)
+            self.page.go("/payments/aging")
+
+        except Exception as e:
+            print(f"Error showing aging report: {str(e)}")
+            self.show_error(f"Error showing aging report: {e}")
+
+    def handle_aging_export(self, e: ft.FilePickerResultEvent):
+        if not e.path:
+            return
+        try:
+            path = e.path if e.path.lower().endswith(".csv") else f"{e.path}.csv"
+            count = self.aging.export_csv(path)
+            self.show_success(f"Exported {count} tenants to {path}")
+        except Exception as ex:
+            print(f"Error exporting aging report: {str(ex)}")
+            self.show_error(f"Error exporting aging report: {ex}")
+
+    def generate_statements(self, period=None):
+        """Queue PDF statements for every tenant billed in the period (default: this month)"""
+        job = self.documents.submit_statements(period or current_period(), self.show_document_progress)
+        self.show_success(f"{job.label} queued")
+
+    def show_document_progress(self, job):
+        """Called from the document queue as receipts and statements are written"""
+        if job.kind == "statement":
+            self.document_progress.visible = job.status in ("Queued", "Running")
+            self.document_progress.value = job.progress if job.total else None
+            self.document_status.visible = True
+            self.document_status.value = f"{job.label}: {job.done}/{job.total}"
+            if job.status == "Completed":
+                self.document_status.value = (f"{job.label}: {job.done} saved to {job.output} "
+                                              f"({job.pages_per_s:.0f} pages/s)")
+        if job.status == "Completed" and job.kind == "receipt":
+            self.show_success(f"Receipt saved to {job.output}")
+        elif job.status == "Failed":
+            self.document_progress.visible = False
+            self.show_error(f"Error generating {job.label}: {job.error}")
+        self.page.update()
+
+    def pick_statement(self, payment_method):
+        self.statement_method = payment_method
+        self.statement_picker.pick_files(
+            dialog_title=f"Select {payment_method} statement",
+            allowed_extensions=["csv"]
+        )
+
+    def handle_statement_picked(self, e: ft.FilePickerResultEvent):
+        """Import the chosen statement in the background, then reload the table"""
+        if not e.files:
+            return
+        path = e.files[0].path
+        payment_method = self.statement_method
+
+        def worker():
+            try:
+                report = StatementImporter().run(path, payment_method)
+                self.show_success(
+                    f"Posted {report['posted']} payments, {report['queued_for_review']} lines need review"
+                    + (f", {report['duplicates']} already imported" if report['duplicates'] else "")
+                )
+                self.refresh_payments()
+            except Exception as ex:
+                print(f"Error importing statement: {str(ex)}")
+                self.show_error(f"Error importing statement: {ex}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_statement_reviews(self):
+        """List statement lines no tenant matched, to post to a tenant or dismiss"""
+        try:
+            importer = StatementImporter()
+            reviews = importer.pending_reviews()
+            tenants = importer.review_tenants()
+            names = {
+                tenant_id: f"{first_name} {last_name}" + (f" (Room {room_number})" if room_number else "")
+                for tenant_id, first_name, last_name, room_number in tenants
+            }
+
+            def tenant_dropdown(candidates):
+                # Suggested tenants first, then everyone else
+                suggested = [int(c) for c in (candidates or "").split(",") if c and int(c) in names]
+                others = [tenant_id for tenant_id in names if tenant_id not in suggested]
+                return ft.Dropdown(
+                    width=260,
+                    hint_text="Post to tenant",
+                    value=str(suggested[0]) if len(suggested) == 1 else None,
+                    options=[ft.dropdown.Option(str(t), names[t]) for t in suggested + others]
+                )
+
+            def post_review(review_id, dropdown):
+                if not dropdown.value:
+                    self.show_error("Choose a tenant to post this line to")
+                    return
+                try:
+                    importer.resolve_review(review_id, int(dropdown.value))
+                    self.show_success(f"Posted to {names[int(dropdown.value)]}")
+                    self.reload_statement_reviews()
+                except Exception as ex:
+                    print(f"Error posting statement line: {str(ex)}")
+                    self.show_error(f"Error posting statement line: {ex}")
+
+            def dismiss_review(review_id):
+                try:
+                    importer.dismiss_review(review_id)
+                    self.show_success("Statement line dismissed")
+                    self.reload_statement_reviews()
+                except Exception as ex:
+                    print(f"Error dismissing statement line: {str(ex)}")
+                    self.show_error(f"Error dismissing statement line: {ex}")
+
+            rows = []
+            for review_id, txn_date, reference, payer_name, amount, payment_method, reason, candidates in reviews:
+                dropdown = tenant_dropdown(candidates)
+                rows.append(ft.DataRow(cells=[
+                    ft.DataCell(ft.Text(str(txn_date or ""), color=BLACK)),
+                    ft.DataCell(ft.Text(reference or "", color=BLACK)),
+                    ft.DataCell(ft.Text(payer_name or "", color=BLACK)),
+                    ft.DataCell(ft.Text(f"₱{Money.of(amount):,.2f}", color=BLACK)),
+                    ft.DataCell(ft.Text(payment_method or "", color=BLACK)),
+                    ft.DataCell(ft.Text(reason or "", color=BLACK)),
+                    ft.DataCell(dropdown),
+                    ft.DataCell(ft.Row([
+                        ft.IconButton(
+                            icon=ft.Icons.CHECK,
+                            tooltip="Post payment",
+                            on_click=lambda e, r=review_id, d=dropdown: post_review(r, d)
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.CLOSE,
+                            tooltip="Dismiss",
+                            on_click=lambda e, r=review_id: dismiss_review(r)
+                        ),
+                    ])),
+                ]))
+
+            table = ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text(label, weight=ft.FontWeight.BOLD, color=BLACK))
+                    for label in ("Date", "Reference", "Payer", "Amount", "Method", "Reason", "Tenant", "Actions")
+                ],
+                rows=rows,
+                heading_row_color=BLUE_GREY_100,
+            )
+
+            review_view = ft.View(
+                "/payments/reviews",
+                [
+                    ft.Column([
+                        ft.Text(f"{len(rows)} statement lines need review", size=16, color=BLACK),
+                        ft.Container(content=ft.Column([table], scroll=ft.ScrollMode.AUTO), expand=True)
+                    ], expand=True, spacing=20)
+                ],
+                appbar=ft.AppBar(
+                    title=ft.Text("Unmatched Statement Lines", color=WHITE),
+                    bgcolor=BLUE_GREY_100,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/payments")
+                    )
+                ),
+                padding=20
+            )
+
+            self.page.views.append(review_view)
+            self.page.go("/payments/reviews")
+
+        except Exception as e:
+            print(f"Error showing statement reviews: {str(e)}")
+            self.show_error(f"Error showing statement reviews: {e}")
+
+    def reload_statement_reviews(self):
+        """Replace the open review screen with a fresh one and reload the payments behind it"""
+        if self.page.views and self.page.views[-1].route == "/payments/reviews":
+            self.page.views.pop()
+        self.show_statement_reviews()
+        self.refresh_payments()
+
     def filter_payments(self, search_text: str):
         """Filter payments table based on search text"""
         try:
@@ -584,7 +855,7 @@ class PaymentsView:
             print(f"Error filtering payments: {str(e)}")
             self.show_error(f"Error filtering payments: {e}")
 
-    def update_summary_cards(self, total_rent: float, total_paid: float, total_balance: float):
+    def update_summary_cards(self, total_rent: Money, total_paid: Money, total_balance: Money):
         """Update the summary cards with current totals"""
         try:
             print("\nUpdating summary cards...")
@@ -640,25 +911,23 @@ class PaymentsView:
             print(f"Traceback: {traceback.format_exc()}")
             self.show_error(f"Error updating summary cards: {e}")
 
-    def edit_payment(self, payment_id: int):
+    def edit_payment(self, tenant_id: int):
         try:
-            # Get payment details
-            payment = self.db.fetch_one("""
-                SELECT p.*, t.first_name, t.last_name, r.room_number
-                FROM payments p
-                JOIN tenants t ON p.tenant_id = t.tenant_id
-                JOIN rooms r ON t.room_id = r.room_id
-                WHERE p.payment_id = %s
-            """, (payment_id,))
-            
-            if not payment:
+            # Get the tenant's latest payment; corrections are posted as a reversal plus a new entry
+            tenant = self.service.get_tenant(tenant_id)
+            payment = self.service.latest_payment(tenant_id)
+            # Balance version seen by this form, checked again when saving
+            version = self.service.balance_version(tenant_id)
+            idempotency_key = uuid.uuid4().hex
+            
+            if not tenant or not payment:
                 self.show_error("Payment not found")
                 return
                 
             # Create form fields
             amount_field = ft.TextField(
                 label="Amount Paid",
-                value=str(payment[3]),  # amount_paid
+                value=f"{payment[1]:.2f}",  # amount
                 prefix_text="₱",
                 keyboard_type=ft.KeyboardType.NUMBER,
                 width=200
@@ -671,25 +940,13 @@ class PaymentsView:
                     ft.dropdown.Option("GCash"),
                     ft.dropdown.Option("Bank Transfer")
                 ],
-                value=payment[4],  # payment_method
-                width=200
-            )
-            
-            status_dropdown = ft.Dropdown(
-                label="Status",
-                options=[
-                    ft.dropdown.Option("Pending"),
-                    ft.dropdown.Option("Paid"),
-                    ft.dropdown.Option("Overdue"),
-                    ft.dropdown.Option("Cancelled")
-                ],
-                value=payment[6],  # status
+                value=payment[2],  # payment_method
                 width=200
             )
             
             description_field = ft.TextField(
                 label="Description",
-                value=payment[7] or "",  # description
+                value=payment[3] or "",  # description
                 multiline=True,
                 min_lines=2,
                 max_lines=3,
@@ -702,29 +959,25 @@ class PaymentsView:
                         self.show_error("Please enter payment amount")
                         return
                         
-                    amount = float(amount_field.value)
+                    amount = Money.of(amount_field.value)
                     if amount <= 0:
                         self.show_error("Amount must be greater than 0")
                         return
                     
-                    # Update payment
-                    self.db.execute("""
-                        UPDATE payments 
-                        SET amount_paid = %s,
-                            payment_method = %s,
-                            status = %s,
-                            description = %s
-                        WHERE payment_id = %s
-                    """, (
-                        amount,
-                        method_dropdown.value,
-                        status_dropdown.value,
-                        description_field.value,
-                        payment_id
-                    ))
+                    # Reverse the original entry and post the corrected one together,
+                    # provided nobody else posted for this tenant since the form opened
+                    try:
+                        self.service.correct_payment(
+                            tenant_id, payment, amount, method_dropdown.value, description_field.value,
+                            version, idempotency_key
+                        )
+                    except StaleBalanceError:
+                        self.show_error("This tenant's payments changed while you were editing. Please reopen the payment.")
+                        self.page.go("/payments")
+                        return
                     
                     self.show_success("Payment updated successfully")
-                    self.refresh_payments()
+                    self.refresh_payments(refresh_summary=False)
                     self.page.go("/payments")
                     
                 except Exception as e:
@@ -737,12 +990,11 @@ class PaymentsView:
             # Create edit window content
             edit_content = ft.Container(
                 content=ft.Column([
-                    ft.Text(f"Edit Payment for {payment[8]} {payment[9]}", size=20, weight=ft.FontWeight.BOLD, color=BLACK),
-                    ft.Text(f"Room {payment[10]}", size=16, color=BLACK),
+                    ft.Text(f"Edit Payment for {tenant[1]} {tenant[2]}", size=20, weight=ft.FontWeight.BOLD, color=BLACK),
+                    ft.Text(f"Room {tenant[3]}", size=16, color=BLACK),
                     ft.Divider(),
                     amount_field,
                     method_dropdown,
-                    status_dropdown,
                     description_field,
                     ft.Row([
                         ft.ElevatedButton("Save Changes", on_click=save_changes),
@@ -754,7 +1006,7 @@ class PaymentsView:
             
             # Create a new view for the edit window
             edit_view = ft.View(
-                f"/payments/edit/{payment_id}",
+                f"/payments/edit/{tenant_id}",
                 [edit_content],
                 appbar=ft.AppBar(
                     title=ft.Text("Edit Payment"),
@@ -765,38 +1017,30 @@ class PaymentsView:
             
             # Add the edit view to the page
             self.page.views.append(edit_view)
-            self.page.go(f"/payments/edit/{payment_id}")
+            self.page.go(f"/payments/edit/{tenant_id}")
             
         except Exception as e:
             print(f"Error in edit_payment: {str(e)}")
             self.show_error(f"Error editing payment: {e}")
             self.page.go("/payments")
             
-    def delete_payment(self, payment_id: int):
+    def delete_payment(self, tenant_id: int):
         try:
-            # Get payment details for confirmation
-            payment = self.db.fetch_one("""
-                SELECT p.*, t.first_name, t.last_name, r.room_number
-                FROM payments p
-                JOIN tenants t ON p.tenant_id = t.tenant_id
-                JOIN rooms r ON t.room_id = r.room_id
-                WHERE p.payment_id = %s
-            """, (payment_id,))
-            
-            if not payment:
+            # Get the tenant's latest payment for confirmation
+            tenant = self.service.get_tenant(tenant_id)
+            payment = self.service.latest_payment(tenant_id)
+            
+            if not tenant or not payment:
                 self.show_error("Payment not found")
                 return
             
             def confirm_delete(e):
                 try:
-                    # Delete payment
-                    self.db.execute("""
-                        DELETE FROM payments
-                        WHERE payment_id = %s
-                    """, (payment_id,))
+                    # The ledger is append-only, so the payment is cancelled by a reversal
+                    self.service.delete_payment(tenant_id, payment)
                     
                     self.show_success("Payment deleted successfully")
-                    self.refresh_payments()
+                    self.refresh_payments(refresh_summary=False)
                     self.page.go("/payments")
                     
                 except Exception as e:
@@ -811,10 +1055,10 @@ class PaymentsView:
                 content=ft.Column([
                     ft.Text("Delete Payment", size=20, weight=ft.FontWeight.BOLD, color=BLACK),
                     ft.Text(f"Are you sure you want to delete the payment for:", size=16, color=BLACK),
-                    ft.Text(f"Tenant: {payment[8]} {payment[9]}", size=16, color=BLACK),
-                    ft.Text(f"Room: {payment[10]}", size=16, color=BLACK),
-                    ft.Text(f"Amount Paid: ₱{float(payment[3]):,.2f}", size=16, color=BLACK),
-                    ft.Text(f"Status: {payment[6]}", size=16, color=BLACK),
+                    ft.Text(f"Tenant: {tenant[1]} {tenant[2]}", size=16, color=BLACK),
+                    ft.Text(f"Room: {tenant[3]}", size=16, color=BLACK),
+                    ft.Text(f"Amount Paid: ₱{payment[1]:,.2f}", size=16, color=BLACK),
+                    ft.Text(f"Posted: {payment[4]}", size=16, color=BLACK),
                     ft.Divider(),
                     ft.Row([
                         ft.ElevatedButton(
@@ -835,7 +1079,7 @@ class PaymentsView:
             
             # Create a new view for the delete window
             delete_view = ft.View(
-                f"/payments/delete/{payment_id}",
+                f"/payments/delete/{tenant_id}",
                 [delete_content],
                 appbar=ft.AppBar(
                     title=ft.Text("Delete Payment"),
@@ -846,7 +1090,7 @@ class PaymentsView:
             
             # Add the delete view to the page
             self.page.views.append(delete_view)
-            self.page.go(f"/payments/delete/{payment_id}")
+            self.page.go(f"/payments/delete/{tenant_id}")
             
         except Exception as e:
             print(f"Error in delete_payment: {str(e)}")
@@ -1,7 +1,15 @@
 import flet as ft
 from flet_core import colors
 from src.models.database import Database
+from src.models.availability import AvailabilitySearch
+from src.models.occupancy import derived_status
+from src.models.occupancy_history import OccupancyAnalytics, OccupancyRollup
+from src.models.room_provisioning import RoomProvisioner
+from src.utils.money import ZERO
+from src.views.export_menu import ExportMenu
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+import time
 
 class RoomsView:
     def __init__(self, page: ft.Page):
@@ -52,6 +60,27 @@ class RoomsView:
             data_row_color={"hovered": "0x30FF0000"},
             show_checkbox_column=False,
         )
+        
+        # Export of the room list
+        self.export_menu = ExportMenu(self.page, "rooms")
+        self.availability = AvailabilitySearch()
+        self.analytics = OccupancyAnalytics()
+
+        # Bulk provisioning from a CSV; the results are shown on the bulk add page
+        self.provisioner = RoomProvisioner()
+        self.rooms_csv_picker = ft.FilePicker(on_result=self.handle_rooms_csv_picked)
+        self.page.overlay.append(self.rooms_csv_picker)
+        self.bulk_skip_invalid = ft.Checkbox(label="Create the valid rooms even if some are rejected")
+        self.bulk_summary_text = ft.Text("")
+        self.bulk_errors_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Source", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Room Number", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Problem", weight=ft.FontWeight.BOLD)),
+            ],
+            rows=[],
+            heading_row_color=colors.SURFACE_VARIANT,
+        )
         print("RoomsView initialized")
         self.refresh_rooms()
 
@@ -125,7 +154,7 @@ class RoomsView:
                     ft.DataRow(
                         cells=[
                             ft.DataCell(ft.Text(room[1] or "", size=16)),
-                            ft.DataCell(ft.Text(str(room[2] or ""), size=16)),
+                            ft.DataCell(ft.Text(f"{room[5]}/{room[2]}" if room[2] else "", size=16)),
                             ft.DataCell(ft.Text(f"₱{room[3]:,.2f}" if room[3] else "", size=16)),
                             ft.DataCell(status_badge),
                             ft.DataCell(
@@ -196,12 +225,13 @@ class RoomsView:
                     self.show_error("Price must be a valid number")
                     return
 
+                # A new room is empty; Occupied follows from its tenants
                 self.db.insert(
                     """
                     INSERT INTO rooms (room_number, capacity, price, status)
                     VALUES (%s, %s, %s, %s)
                     """,
-                    (room_number, capacity, price, status)
+                    (room_number, capacity, price, "Maintenance" if status == "Maintenance" else "Available")
                 )
                 
                 # Return to rooms list
@@ -250,6 +280,400 @@ class RoomsView:
         self.page.views.append(add_room_page)
         self.page.go("/rooms/add")
 
+    def show_provisioning_report(self, report):
+        """Show what a bulk provisioning run created and rejected"""
+        self.bulk_summary_text.value = (
+            f"{report['created']} rooms created, {report['rejected']} rejected out of {report['rooms']}"
+            + (" (nothing was created; fix the rejected rooms or tick the box above)"
+               if report["rejected"] and not report["created"] and report["valid"] else "")
+        )
+        self.bulk_errors_table.rows = [
+            ft.DataRow(cells=[
+                ft.DataCell(ft.Text(error["source"])),
+                ft.DataCell(ft.Text(error["room_number"])),
+                ft.DataCell(ft.Text(error["reason"])),
+            ])
+            for error in report["errors"]
+        ]
+        if report["created"]:
+            self.refresh_rooms()
+        self.page.update()
+
+    def handle_rooms_csv_picked(self, e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        try:
+            self.show_provisioning_report(
+                self.provisioner.from_csv(e.files[0].path, skip_invalid=self.bulk_skip_invalid.value)
+            )
+        except Exception as ex:
+            print(f"Error importing rooms: {ex}")
+            self.show_error(f"Error importing rooms: {str(ex)}")
+
+    def bulk_add_rooms(self, e):
+        """Create a range of rooms from a pattern, or import them from a CSV"""
+        print("Opening bulk add rooms page")
+        pattern_field = ft.TextField(label="Room Numbers", hint_text="e.g. 2[01-40] or [1-3][01-20]", autofocus=True)
+        capacity_field = ft.TextField(label="Capacity", keyboard_type=ft.KeyboardType.NUMBER)
+        price_field = ft.TextField(label="Price", keyboard_type=ft.KeyboardType.NUMBER)
+        status_dropdown = ft.Dropdown(
+            label="Status",
+            options=[
+                ft.dropdown.Option("Available"),
+                ft.dropdown.Option("Maintenance")
+            ],
+            value="Available"
+        )
+        self.bulk_summary_text.value = ""
+        self.bulk_errors_table.rows = []
+
+        def create_rooms(e):
+            try:
+                if not pattern_field.value:
+                    self.show_error("Room numbers are required")
+                    return
+                self.show_provisioning_report(self.provisioner.from_pattern(
+                    pattern_field.value.strip(), capacity_field.value, price_field.value,
+                    status_dropdown.value, skip_invalid=self.bulk_skip_invalid.value
+                ))
+            except ValueError as ex:
+                self.show_error(str(ex))
+            except Exception as ex:
+                print(f"Error adding rooms: {ex}")
+                self.show_error(f"Error adding rooms: {str(ex)}")
+
+        bulk_page = ft.View(
+            "/rooms/bulk",
+            [
+                ft.AppBar(
+                    title=ft.Text("Bulk Add Rooms"),
+                    bgcolor=colors.SURFACE_VARIANT,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/rooms")
+                    )
+                ),
+                ft.Container(
+                    content=ft.Column(
+                        controls=[
+                            ft.Text("Bulk Add Rooms", size=30, weight=ft.FontWeight.BOLD),
+                            pattern_field,
+                            capacity_field,
+                            price_field,
+                            status_dropdown,
+                            self.bulk_skip_invalid,
+                            ft.Row(
+                                controls=[
+                                    ft.ElevatedButton(
+                                        "Create Rooms",
+                                        icon=ft.Icons.SAVE,
+                                        on_click=create_rooms
+                                    ),
+                                    ft.ElevatedButton(
+                                        "Import CSV",
+                                        icon=ft.Icons.UPLOAD_FILE,
+                                        on_click=lambda _: self.rooms_csv_picker.pick_files(
+                                            dialog_title="Select rooms CSV",
+                                            allowed_extensions=["csv"]
+                                        )
+                                    )
+                                ],
+                                spacing=20
+                            ),
+                            self.bulk_summary_text,
+                            self.bulk_errors_table
+                        ],
+                        spacing=20,
+                        scroll=ft.ScrollMode.AUTO
+                    ),
+                    padding=20,
+                    expand=True
+                )
+            ]
+        )
+
+        self.page.views.append(bulk_page)
+        self.page.go("/rooms/bulk")
+
+    # Analytics periods offered, in days back from the last rolled-up day (None for all history)
+    ANALYTICS_PERIODS = {
+        "Last 12 months": 365,
+        "Last 3 years": 3 * 365,
+        "Last 5 years": 5 * 365,
+        "All history": None,
+    }
+
+    def show_analytics(self, e):
+        """Occupancy rate, revenue and vacancy charts built from the daily occupancy rollup"""
+        print("Opening room analytics page")
+        try:
+            # Catch up on days the nightly rollup missed; a no-op when current
+            OccupancyRollup().run()
+        except Exception as ex:
+            print(f"Error rolling up occupancy: {ex}")
+
+        period_dropdown = ft.Dropdown(
+            label="Period",
+            options=[ft.dropdown.Option(name) for name in self.ANALYTICS_PERIODS],
+            value="Last 12 months",
+            width=200
+        )
+        summary_text = ft.Text("")
+        charts = ft.Column(spacing=20)
+        rooms_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Room Number", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Occupancy", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Vacancies", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Avg Vacancy (days)", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Revenue", weight=ft.FontWeight.BOLD), numeric=True),
+            ],
+            rows=[],
+            heading_row_color=colors.SURFACE_VARIANT,
+        )
+
+        def month_labels(months):
+            # Around a dozen labels whatever the period, so multi-year charts stay readable
+            step = max(1, len(months) // 12)
+            return ft.ChartAxis(
+                labels=[
+                    ft.ChartAxisLabel(value=i, label=ft.Text(month, size=10))
+                    for i, month in enumerate(months) if i % step == 0
+                ],
+                labels_size=32
+            )
+
+        def load(e=None):
+            try:
+                first, last = self.analytics.date_range()
+                if last is None:
+                    summary_text.value = "No occupancy history yet; it is rolled up nightly from check-ins and check-outs"
+                    charts.controls = []
+                    rooms_table.rows = []
+                    self.page.update()
+                    return
+                days = self.ANALYTICS_PERIODS[period_dropdown.value]
+                start = max(first, last - timedelta(days=days)) if days else first
+
+                monthly = self.analytics.monthly(start, last)
+                months = [row.month for row in monthly]
+                occupied = sum(row.occupied_days for row in monthly)
+                places = sum(row.place_days for row in monthly)
+                revenue = sum((row.revenue for row in monthly), ZERO)
+                summary_text.value = (
+                    f"{start} to {last}: {occupied / places:.1%} occupancy, ₱{revenue:,.2f} revenue"
+                    if places else f"{start} to {last}: no lettable rooms"
+                )
+
+                max_revenue = max((float(row.revenue.to_decimal()) for row in monthly), default=0) or 1
+                charts.controls = [
+                    ft.Text("Occupancy rate by month", size=18, weight=ft.FontWeight.BOLD),
+                    ft.Container(
+                        content=ft.LineChart(
+                            data_series=[
+                                ft.LineChartData(
+                                    data_points=[
+                                        ft.LineChartDataPoint(i, round(row.occupancy_rate * 100, 1))
+                                        for i, row in enumerate(monthly)
+                                    ],
+                                    stroke_width=2,
+                                    color=colors.PRIMARY,
+                                    curved=False
+                                )
+                            ],
+                            min_y=0,
+                            max_y=100,
+                            min_x=0,
+                            max_x=max(len(monthly) - 1, 1),
+                            left_axis=ft.ChartAxis(
+                                labels=[
+                                    ft.ChartAxisLabel(value=v, label=ft.Text(f"{v}%", size=10))
+                                    for v in (0, 25, 50, 75, 100)
+                                ],
+                                labels_size=40
+                            ),
+                            bottom_axis=month_labels(months),
+                            horizontal_grid_lines=ft.ChartGridLines(interval=25, color=colors.OUTLINE, width=0.5),
+                            tooltip_bgcolor=colors.SURFACE_VARIANT,
+                            expand=True
+                        ),
+                        height=280
+                    ),
+                    ft.Text("Revenue by month", size=18, weight=ft.FontWeight.BOLD),
+                    ft.Container(
+                        content=ft.BarChart(
+                            bar_groups=[
+                                ft.BarChartGroup(
+                                    x=i,
+                                    bar_rods=[
+                                        ft.BarChartRod(
+                                            from_y=0,
+                                            to_y=float(row.revenue.to_decimal()),
+                                            color=colors.PRIMARY,
+                                            tooltip=f"{row.month}: ₱{row.revenue:,.2f}",
+                                            border_radius=0
+                                        )
+                                    ]
+                                )
+                                for i, row in enumerate(monthly)
+                            ],
+                            max_y=max_revenue * 1.1,
+                            left_axis=ft.ChartAxis(labels_size=60),
+                            bottom_axis=month_labels(months),
+                            tooltip_bgcolor=colors.SURFACE_VARIANT,
+                            expand=True
+                        ),
+                        height=280
+                    ),
+                ]
+
+                rooms_table.rows = [
+                    ft.DataRow(cells=[
+                        ft.DataCell(ft.Text(stats.room_number)),
+                        ft.DataCell(ft.Text(f"{stats.occupancy_rate:.1%}")),
+                        ft.DataCell(ft.Text(str(stats.vacancies))),
+                        ft.DataCell(ft.Text(f"{stats.average_vacancy_days:.1f}" if stats.vacancies else "-")),
+                        ft.DataCell(ft.Text(f"₱{stats.revenue:,.2f}")),
+                    ])
+                    for stats in self.analytics.room_stats(start, last)
+                ]
+                self.page.update()
+            except Exception as ex:
+                print(f"Error loading room analytics: {ex}")
+                self.show_error(f"Error loading room analytics: {str(ex)}")
+
+        period_dropdown.on_change = load
+
+        analytics_page = ft.View(
+            "/rooms/analytics",
+            [
+                ft.AppBar(
+                    title=ft.Text("Room Analytics"),
+                    bgcolor=colors.SURFACE_VARIANT,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/rooms")
+                    )
+                ),
+                ft.Container(
+                    content=ft.Column(
+                        controls=[
+                            ft.Row([period_dropdown, summary_text], spacing=20),
+                            charts,
+                            ft.Text("Rooms", size=18, weight=ft.FontWeight.BOLD),
+                            rooms_table
+                        ],
+                        spacing=20,
+                        scroll=ft.ScrollMode.AUTO
+                    ),
+                    padding=20,
+                    expand=True
+                )
+            ]
+        )
+
+        self.page.views.append(analytics_page)
+        self.page.go("/rooms/analytics")
+        load()
+
+    def find_room(self, e):
+        """Search for rooms with enough free places for a price range and stay"""
+        print("Opening room availability page")
+        beds_field = ft.TextField(label="Beds", value="1", keyboard_type=ft.KeyboardType.NUMBER, width=120)
+        min_price_field = ft.TextField(label="Min Price", keyboard_type=ft.KeyboardType.NUMBER, width=160)
+        max_price_field = ft.TextField(label="Max Price", keyboard_type=ft.KeyboardType.NUMBER, width=160)
+        start_field = ft.TextField(label="From (YYYY-MM-DD)", value=date.today().isoformat(), width=200)
+        end_field = ft.TextField(label="To (YYYY-MM-DD, optional)", width=200)
+        summary_text = ft.Text("")
+        results_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Room Number", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Capacity", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Price", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Free Places", weight=ft.FontWeight.BOLD), numeric=True),
+            ],
+            rows=[],
+            heading_row_color=colors.SURFACE_VARIANT,
+        )
+
+        def search(e):
+            try:
+                try:
+                    beds = int(beds_field.value or 1)
+                    min_price = Decimal(min_price_field.value) if min_price_field.value else None
+                    max_price = Decimal(max_price_field.value) if max_price_field.value else None
+                except (ValueError, ArithmeticError):
+                    self.show_error("Beds and prices must be valid numbers")
+                    return
+                try:
+                    start = datetime.strptime(start_field.value, "%Y-%m-%d").date() if start_field.value else None
+                    end = datetime.strptime(end_field.value, "%Y-%m-%d").date() if end_field.value else None
+                except ValueError:
+                    self.show_error("Dates must be in YYYY-MM-DD format")
+                    return
+
+                started = time.perf_counter()
+                matches = self.availability.search(beds, min_price, max_price, start, end)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                results_table.rows = [
+                    ft.DataRow(cells=[
+                        ft.DataCell(ft.Text(match.room_number)),
+                        ft.DataCell(ft.Text(str(match.capacity))),
+                        ft.DataCell(ft.Text(f"₱{match.price:,.2f}")),
+                        ft.DataCell(ft.Text(str(match.free_places))),
+                    ])
+                    for match in matches
+                ]
+                summary_text.value = f"{len(matches)} matching rooms in {elapsed_ms:.1f} ms"
+                self.page.update()
+            except ValueError as ex:
+                self.show_error(str(ex))
+            except Exception as ex:
+                print(f"Error searching rooms: {ex}")
+                self.show_error(f"Error searching rooms: {str(ex)}")
+
+        availability_page = ft.View(
+            "/rooms/availability",
+            [
+                ft.AppBar(
+                    title=ft.Text("Find a Room"),
+                    bgcolor=colors.SURFACE_VARIANT,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/rooms")
+                    )
+                ),
+                ft.Container(
+                    content=ft.Column(
+                        controls=[
+                            ft.Row(
+                                controls=[
+                                    beds_field,
+                                    min_price_field,
+                                    max_price_field,
+                                    start_field,
+                                    end_field,
+                                    ft.ElevatedButton("Search", icon=ft.Icons.SEARCH, on_click=search)
+                                ],
+                                spacing=20,
+                                wrap=True
+                            ),
+                            summary_text,
+                            results_table
+                        ],
+                        spacing=20,
+                        scroll=ft.ScrollMode.AUTO
+                    ),
+                    padding=20,
+                    expand=True
+                )
+            ]
+        )
+
+        self.page.views.append(availability_page)
+        self.page.go("/rooms/availability")
+
     def edit_room(self, room):
         print(f"Opening edit room page for room: {room[1]}")
         # Create form fields
@@ -310,14 +734,24 @@ class RoomsView:
                     self.show_error("Price must be a valid number")
                     return
 
-                self.db.update(
-                    """
+                # Only Maintenance is set by hand; otherwise status follows occupancy.
+                # Capacity can't drop below the tenants already in the room; checked
+                # in the UPDATE itself so a concurrent check-in can't slip past it
+                updated = self.db.update(
+                    f"""
                     UPDATE rooms 
-                    SET room_number = %s, capacity = %s, price = %s, status = %s 
-                    WHERE room_id = %s
+                    SET room_number = %s, capacity = %s, price = %s,
+                        status = {derived_status("occupancy", "%s = 'Maintenance'")}
+                    WHERE room_id = %s AND (%s IS NULL OR occupancy <= %s)
                     """,
-                    (room_number, capacity, price, status, room[0])
+                    (room_number, capacity, price, status, room[0], capacity, capacity)
                 )
+                if not updated:
+                    # No rows also means nothing changed; only report a real shortfall
+                    occupancy = self.db.fetch_one("SELECT occupancy FROM rooms WHERE room_id = %s", (room[0],))
+                    if capacity is not None and occupancy and capacity < occupancy[0]:
+                        self.show_error(f"Room has {occupancy[0]} tenants; capacity can't be lower")
+                        return
                 
                 # Return to rooms list
                 self.page.go("/rooms")
@@ -373,7 +807,7 @@ class RoomsView:
                 print(f"Deleting room: {room[0]}")
                 # Check if room has tenants
                 tenants = self.db.fetch_one(
-                    "SELECT COUNT(*) FROM tenants WHERE room_id = %s",
+                    "SELECT occupancy FROM rooms WHERE room_id = %s",
                     (room[0],)
                 )
                 if tenants and tenants[0] > 0:
@@ -447,15 +881,50 @@ class RoomsView:
                         content=ft.Row(
                             controls=[
                                 ft.Text("Rooms Management", size=30, weight=ft.FontWeight.BOLD),
-                                ft.ElevatedButton(
-                                    "Add Room",
-                                    icon=ft.Icons.ADD,
-                                    on_click=self.add_room,
-                                    style=ft.ButtonStyle(
-                                        color=colors.BLACK,
-                                        bgcolor=colors.PRIMARY,
-                                        shape=ft.RoundedRectangleBorder(radius=10),
-                                    )
+                                ft.Row(
+                                    controls=[
+                                        ft.ElevatedButton(
+                                            "Analytics",
+                                            icon=ft.Icons.INSIGHTS,
+                                            on_click=self.show_analytics,
+                                            style=ft.ButtonStyle(
+                                                color=colors.BLACK,
+                                                bgcolor=colors.PRIMARY,
+                                                shape=ft.RoundedRectangleBorder(radius=10),
+                                            )
+                                        ),
+                                        ft.ElevatedButton(
+                                            "Find Room",
+                                            icon=ft.Icons.SEARCH,
+                                            on_click=self.find_room,
+                                            style=ft.ButtonStyle(
+                                                color=colors.BLACK,
+                                                bgcolor=colors.PRIMARY,
+                                                shape=ft.RoundedRectangleBorder(radius=10),
+                                            )
+                                        ),
+                                        ft.ElevatedButton(
+                                            "Add Room",
+                                            icon=ft.Icons.ADD,
+                                            on_click=self.add_room,
+                                            style=ft.ButtonStyle(
+                                                color=colors.BLACK,
+                                                bgcolor=colors.PRIMARY,
+                                                shape=ft.RoundedRectangleBorder(radius=10),
+                                            )
+                                        ),
+                                        ft.ElevatedButton(
+                                            "Bulk Add",
+                                            icon=ft.Icons.PLAYLIST_ADD,
+                                            on_click=self.bulk_add_rooms,
+                                            style=ft.ButtonStyle(
+                                                color=colors.BLACK,
+                                                bgcolor=colors.PRIMARY,
+                                                shape=ft.RoundedRectangleBorder(radius=10),
+                                            )
+                                        )
+                                    ],
+                                    spacing=10
                                 )
                             ],
                             alignment=ft.MainAxisAlignment.SPACE_BETWEEN
@@ -466,7 +935,8 @@ class RoomsView:
                         content=ft.Row(
                             controls=[
                                 self.search_field,
-                                self.status_filter
+                                self.status_filter,
+                                self.export_menu.build()
                             ],
                             spacing=20,
                             alignment=ft.MainAxisAlignment.START
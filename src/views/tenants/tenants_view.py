@@ -1,9 +1,32 @@
 import flet as ft
 from flet_core import colors
+from src.models.archive import ArchiveSearch
+from src.models.checkout import CheckoutError, check_out_tenants
 from src.models.database import Database
-import os
-import shutil
+from src.models.occupancy import RoomFullError, assign_room, occupy, release_tenant
+from src.models.profile_images import process_in_background, release_profile_image
+from src.models.tenant_import import TenantImporter
+from src.utils.images import DEFAULT_PROFILE_IMAGE, asset_url, thumbnail_for
+from src.views.export_menu import ExportMenu
 from datetime import datetime
+import threading
+
+# Rows shown per page; avatars are only loaded for the page on screen
+TENANTS_PAGE_SIZE = 25
+
+TENANTS_QUERY = """
+    SELECT t.*, r.room_number 
+    FROM tenants t 
+    LEFT JOIN rooms r ON t.room_id = r.room_id
+"""
+
+def tenant_status(check_out_date):
+    """(status, color) shown for a tenant with the given check-out date"""
+    if check_out_date:
+        check_out_date = datetime.strptime(str(check_out_date), "%Y-%m-%d").date()
+        if check_out_date < datetime.now().date():
+            return "Checked Out", colors.RED
+    return "Active", colors.GREEN
 
 class TenantsView:
     def __init__(self, page: ft.Page):
@@ -34,6 +57,34 @@ class TenantsView:
             color=colors.WHITE
         )
         
+        # Rows by tenant id, for selection and for refreshing single rows
+        self.tenant_rows = {}
+        self.checkout_button = ft.ElevatedButton(
+            "Check Out Selected",
+            icon=ft.Icons.LOGOUT,
+            on_click=self.check_out_selected,
+            disabled=True,
+            style=ft.ButtonStyle(
+                color=colors.BLACK,
+                bgcolor=colors.BLUE,
+            )
+        )
+        
+        # Pagination
+        self.page_index = 0
+        self.matching_rows = []
+        self.page_label = ft.Text("", color=colors.WHITE)
+        self.prev_button = ft.IconButton(
+            icon=ft.Icons.CHEVRON_LEFT,
+            tooltip="Previous page",
+            on_click=lambda e: self.show_page(self.page_index - 1)
+        )
+        self.next_button = ft.IconButton(
+            icon=ft.Icons.CHEVRON_RIGHT,
+            tooltip="Next page",
+            on_click=lambda e: self.show_page(self.page_index + 1)
+        )
+        
         self.tenants_table = ft.DataTable(
             columns=[
                 ft.DataColumn(ft.Text("Profile", weight=ft.FontWeight.BOLD, color=colors.WHITE)),
@@ -64,6 +115,13 @@ class TenantsView:
             on_result=self.handle_file_picker_result
         )
         self.page.overlay.append(self.file_picker)
+        
+        # File picker for importing tenants from a CSV
+        self.import_picker = ft.FilePicker(on_result=self.handle_import_picked)
+        self.page.overlay.append(self.import_picker)
+        
+        # Export of the tenant list
+        self.export_menu = ExportMenu(self.page, "tenants")
         print("TenantsView initialized")
         self.refresh_tenants()
 
@@ -77,135 +135,376 @@ class TenantsView:
 
     def handle_file_picker_result(self, e: ft.FilePickerResultEvent):
         if e.files:
-            try:
-                # Get the selected file
-                selected_file = e.files[0]
-                
-                # Ensure the tenants directory exists
-                os.makedirs("src/assets/images/tenants", exist_ok=True)
-                
-                # Create a new filename with timestamp
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                new_image_path = f"src/assets/images/tenants/profile_{timestamp}.png"
-                
-                # Copy the selected file to our application directory
-                shutil.copy(selected_file.path, new_image_path)
-                
-                # Update the current profile image
-                if hasattr(self, 'current_profile_image'):
-                    self.current_profile_image.src = new_image_path
-                    self.current_profile_image_path = new_image_path
-                    self.page.update()
-            except Exception as e:
-                print(f"Error handling file picker result: {e}")
-                self.show_error("Error handling selected image")
+            # Resize and re-encode off the UI thread; saving waits until this is done
+            self.image_processing = True
+            if hasattr(self, 'current_profile_image'):
+                self.current_profile_image.opacity = 0.5
+                self.page.update()
+            process_in_background(e.files[0].path, self.handle_image_processed)
+
+    def handle_image_processed(self, path, error):
+        self.image_processing = False
+        if hasattr(self, 'current_profile_image'):
+            self.current_profile_image.opacity = 1
+        if error:
+            self.show_error("Error handling selected image")
+            return
+        # Update the current profile image
+        if hasattr(self, 'current_profile_image'):
+            self.current_profile_image.src = path
+            self.current_profile_image_path = path
+            self.page.update()
 
     def show_error(self, message: str):
         self.page.snack_bar = ft.SnackBar(content=ft.Text(message))
         self.page.snack_bar.open = True
         self.page.update()
 
+    def handle_import_picked(self, e: ft.FilePickerResultEvent):
+        """Import the chosen tenant CSV in the background, then reload the table"""
+        if not e.files:
+            return
+        path = e.files[0].path
+
+        def worker():
+            try:
+                report = TenantImporter().run(path)
+                if report["rejected"]:
+                    self.show_error(
+                        f"{report['rejected']} of {report['rows']} rows have problems, nothing was imported. "
+                        f"See {report['error_report']}"
+                    )
+                else:
+                    self.show_error(f"Imported {report['imported']} tenants")
+                    self.refresh_tenants()
+            except Exception as ex:
+                print(f"Error importing tenants: {str(ex)}")
+                self.show_error(f"Error importing tenants: {ex}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def filter_tenants(self, e):
+        self.apply_filter()
+        self.show_page(0)
+
+    def apply_filter(self):
         search_term = self.search_field.value.lower()
         status_filter = self.status_filter.value
         
+        self.matching_rows = []
         for row in self.tenants_table.rows:
             tenant_name = f"{row.cells[1].content.value}".lower()
-            tenant_status = row.cells[7].content.value
+            # The status text sits inside its colored badge
+            tenant_status = row.cells[7].content.content.value
             
             name_match = search_term in tenant_name
             status_match = status_filter == "All" or tenant_status == status_filter
             
-            row.visible = name_match and status_match
+            if name_match and status_match:
+                self.matching_rows.append(row)
+
+    def show_page(self, index):
+        """Show one page of the matching rows and load the avatars on it"""
+        page_count = max(1, -(-len(self.matching_rows) // TENANTS_PAGE_SIZE))
+        self.page_index = min(max(index, 0), page_count - 1)
+        start = self.page_index * TENANTS_PAGE_SIZE
+        on_page = set(map(id, self.matching_rows[start:start + TENANTS_PAGE_SIZE]))
         
+        for row in self.tenants_table.rows:
+            row.visible = id(row) in on_page
+            if row.visible:
+                self.load_avatar(row)
+        
+        self.page_label.value = f"Page {self.page_index + 1} of {page_count}"
+        self.prev_button.disabled = self.page_index == 0
+        self.next_button.disabled = self.page_index >= page_count - 1
         self.page.update()
 
+    def avatar_placeholder(self, tenant):
+        initials = f"{(tenant[1] or ' ')[0]}{(tenant[2] or ' ')[0]}".strip().upper()
+        return ft.CircleAvatar(content=ft.Text(initials or "?", size=14), radius=20)
+
+    def load_avatar(self, row):
+        """Swap a row's placeholder for its thumbnail the first time the row is shown"""
+        if isinstance(row.cells[0].content, ft.Image):
+            return
+        thumbnail = thumbnail_for(row.data)
+        row.cells[0].content = ft.Image(
+            # The web client loads assets by URL; the desktop client reads the file
+            src=asset_url(thumbnail) if self.page.web else thumbnail,
+            width=40,
+            height=40,
+            fit=ft.ImageFit.COVER,
+            border_radius=20
+        )
+
     def refresh_tenants(self):
         print("Refreshing tenants")
         try:
             self.tenants_table.rows.clear()
-            tenants = self.db.fetch_all("""
-                SELECT t.*, r.room_number 
-                FROM tenants t 
-                LEFT JOIN rooms r ON t.room_id = r.room_id
-            """)
+            self.tenant_rows = {}
+            tenants = self.db.fetch_all(TENANTS_QUERY)
             print(f"Fetched tenants: {tenants}")
             for tenant in tenants:
-                # Create buttons with proper event binding
-                edit_button = ft.IconButton(
-                    icon=ft.Icons.EDIT,
-                    icon_color=colors.BLUE,
-                    tooltip="Edit",
-                    data=tenant,
-                    on_click=lambda e: self.edit_tenant(e.control.data)
+                row = self.tenant_row(tenant)
+                self.tenant_rows[tenant[0]] = row
+                self.tenants_table.rows.append(row)
+            self.update_checkout_button()
+            if hasattr(self, 'page') and self.page is not None:
+                print("Updating page after tenant refresh")
+                self.filter_tenants(None)
+        except Exception as e:
+            print(f"Error refreshing tenants: {e}")
+            self.show_error(f"Error refreshing tenants: {str(e)}")
+
+    def refresh_rows(self, tenant_ids):
+        """Reload only the given tenants' rows, keeping the current page"""
+        placeholders = ", ".join(["%s"] * len(tenant_ids))
+        for tenant in self.db.fetch_all(f"{TENANTS_QUERY} WHERE t.tenant_id IN ({placeholders})", tuple(tenant_ids)):
+            old_row = self.tenant_rows.get(tenant[0])
+            row = self.tenant_row(tenant)
+            self.tenant_rows[tenant[0]] = row
+            if old_row is None:
+                self.tenants_table.rows.append(row)
+            else:
+                self.tenants_table.rows[self.tenants_table.rows.index(old_row)] = row
+        self.update_checkout_button()
+        self.apply_filter()
+        self.show_page(self.page_index)
+
+    def tenant_row(self, tenant):
+        """Table row for one tenant from TENANTS_QUERY"""
+        # Create buttons with proper event binding
+        edit_button = ft.IconButton(
+            icon=ft.Icons.EDIT,
+            icon_color=colors.BLUE,
+            tooltip="Edit",
+            data=tenant,
+            on_click=lambda e: self.edit_tenant(e.control.data)
+        )
+        
+        delete_button = ft.IconButton(
+            icon=ft.Icons.DELETE,
+            icon_color=colors.RED,
+            tooltip="Delete",
+            data=tenant,
+            on_click=lambda e: self.delete_tenant(e.control.data)
+        )
+
+        status, status_color = tenant_status(tenant[6])
+        
+        # The avatar is a placeholder until the row's page is shown
+        return ft.DataRow(
+            data=tenant[8],
+            on_select_changed=self.toggle_selected,
+            cells=[
+                ft.DataCell(self.avatar_placeholder(tenant)),
+                ft.DataCell(ft.Text(f"{tenant[1] or ''} {tenant[2] or ''}")),
+                ft.DataCell(ft.Text(tenant[3] or "")),
+                ft.DataCell(ft.Text(tenant[4] or "")),
+                ft.DataCell(ft.Text(tenant[9] or "")),
+                ft.DataCell(ft.Text(str(tenant[5] or ""))),
+                ft.DataCell(ft.Text(str(tenant[6] or ""))),
+                ft.DataCell(
+                    ft.Container(
+                        content=ft.Text(status),
+                        bgcolor=status_color,
+                        padding=5,
+                        border_radius=5
+                    )
+                ),
+                ft.DataCell(
+                    ft.Row(
+                        controls=[edit_button, delete_button],
+                        spacing=0
+                    )
                 )
-                
-                delete_button = ft.IconButton(
-                    icon=ft.Icons.DELETE,
-                    icon_color=colors.RED,
-                    tooltip="Delete",
-                    data=tenant,
-                    on_click=lambda e: self.delete_tenant(e.control.data)
+            ]
+        )
+
+    def toggle_selected(self, e):
+        e.control.selected = e.data == "true"
+        self.update_checkout_button()
+        self.page.update()
+
+    def selected_tenant_ids(self):
+        return [tenant_id for tenant_id, row in self.tenant_rows.items() if row.selected]
+
+    def update_checkout_button(self):
+        count = len(self.selected_tenant_ids())
+        self.checkout_button.text = f"Check Out Selected ({count})" if count else "Check Out Selected"
+        self.checkout_button.disabled = not count
+
+    def check_out_selected(self, e):
+        """Check the selected tenants out together on one date"""
+        tenant_ids = self.selected_tenant_ids()
+        if not tenant_ids:
+            return
+        date_field = ft.TextField(
+            label="Check-out Date (YYYY-MM-DD)",
+            value=datetime.now().date().isoformat()
+        )
+
+        def confirm_checkout(e):
+            try:
+                try:
+                    check_out_date = datetime.strptime(date_field.value, "%Y-%m-%d").date()
+                except ValueError:
+                    self.show_error("Check-out date must be in YYYY-MM-DD format")
+                    return
+                checked_out = check_out_tenants(tenant_ids, check_out_date)
+                owing = sum(1 for tenant in checked_out if tenant.final_balance > 0)
+                self.page.dialog.open = False
+                self.refresh_rows(tenant_ids)
+                self.show_error(
+                    f"Checked out {len(checked_out)} tenants"
+                    + (f", {owing} still owe a balance" if owing else "")
                 )
+            except CheckoutError as ex:
+                self.show_error(str(ex))
+            except Exception as ex:
+                print(f"Error checking out tenants: {ex}")
+                self.show_error(f"Error checking out tenants: {str(ex)}")
+
+        def cancel_checkout(e):
+            self.page.dialog.open = False
+            self.page.update()
+
+        self.page.dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(f"Check out {len(tenant_ids)} tenants"),
+            content=ft.Column(
+                controls=[
+                    ft.Text("They will leave their rooms and their balances will be finalized."),
+                    date_field
+                ],
+                tight=True
+            ),
+            actions=[
+                ft.TextButton("Check Out", on_click=confirm_checkout),
+                ft.TextButton("Cancel", on_click=cancel_checkout),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.dialog.open = True
+        self.page.update()
 
-                # Handle profile image
-                profile_image = tenant[8] if tenant[8] else "src/assets/images/default_profile.png"
-                if not os.path.exists(profile_image):
-                    profile_image = "src/assets/images/default_profile.png"
-                
-                # Determine tenant status
-                check_out_date = tenant[6]
-                current_date = datetime.now().date()
-                status = "Active"
-                status_color = colors.GREEN
-                
-                if check_out_date:
-                    check_out_date = datetime.strptime(str(check_out_date), "%Y-%m-%d").date()
-                    if check_out_date < current_date:
-                        status = "Checked Out"
-                        status_color = colors.RED
-                
-                self.tenants_table.rows.append(
+    def show_archive(self, e):
+        """Search tenants moved to the archive, and show an archived tenant's payments"""
+        print("Opening tenant archive page")
+        archive = ArchiveSearch()
+        search_field = ft.TextField(label="Name, email or phone", prefix_icon=ft.Icons.SEARCH, expand=True)
+        summary_text = ft.Text("")
+        results_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Name", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Email", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Phone", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Check-in", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Check-out", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Total Paid", weight=ft.FontWeight.BOLD), numeric=True),
+            ],
+            rows=[],
+            heading_row_color=colors.SURFACE_VARIANT,
+        )
+        history_title = ft.Text("", size=18, weight=ft.FontWeight.BOLD)
+        history_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Date", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Type", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Amount", weight=ft.FontWeight.BOLD), numeric=True),
+                ft.DataColumn(ft.Text("Method", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Description", weight=ft.FontWeight.BOLD)),
+            ],
+            rows=[],
+            heading_row_color=colors.SURFACE_VARIANT,
+            visible=False,
+        )
+
+        def show_history(tenant):
+            try:
+                history_title.value = f"Payments of {tenant.first_name} {tenant.last_name}"
+                history_table.rows = [
+                    ft.DataRow(cells=[
+                        ft.DataCell(ft.Text(str(posted_at or ""))),
+                        ft.DataCell(ft.Text(entry_type)),
+                        ft.DataCell(ft.Text(f"₱{amount:,.2f}")),
+                        ft.DataCell(ft.Text(method or "")),
+                        ft.DataCell(ft.Text(description or "")),
+                    ])
+                    for _, posted_at, entry_type, amount, method, description in archive.history(tenant.tenant_id)
+                ]
+                history_table.visible = True
+                self.page.update()
+            except Exception as ex:
+                print(f"Error loading archived payments: {ex}")
+                self.show_error(f"Error loading archived payments: {str(ex)}")
+
+        def search(e):
+            try:
+                tenants = archive.search(search_field.value)
+                results_table.rows = [
                     ft.DataRow(
+                        data=tenant,
+                        on_select_changed=lambda e: show_history(e.control.data),
                         cells=[
-                            ft.DataCell(
-                                ft.Image(
-                                    src=profile_image,
-                                    width=40,
-                                    height=40,
-                                    fit=ft.ImageFit.COVER,
-                                    border_radius=20
-                                )
-                            ),
-                            ft.DataCell(ft.Text(f"{tenant[1] or ''} {tenant[2] or ''}")),
-                            ft.DataCell(ft.Text(tenant[3] or "")),
-                            ft.DataCell(ft.Text(tenant[4] or "")),
-                            ft.DataCell(ft.Text(tenant[9] or "")),
-                            ft.DataCell(ft.Text(str(tenant[5] or ""))),
-                            ft.DataCell(ft.Text(str(tenant[6] or ""))),
-                            ft.DataCell(
-                                ft.Container(
-                                    content=ft.Text(status),
-                                    bgcolor=status_color,
-                                    padding=5,
-                                    border_radius=5
-                                )
-                            ),
-                            ft.DataCell(
-                                ft.Row(
-                                    controls=[edit_button, delete_button],
-                                    spacing=0
-                                )
-                            )
+                            ft.DataCell(ft.Text(f"{tenant.first_name} {tenant.last_name}")),
+                            ft.DataCell(ft.Text(tenant.email or "")),
+                            ft.DataCell(ft.Text(tenant.phone or "")),
+                            ft.DataCell(ft.Text(str(tenant.check_in_date or ""))),
+                            ft.DataCell(ft.Text(str(tenant.check_out_date or ""))),
+                            ft.DataCell(ft.Text(f"₱{tenant.total_paid:,.2f}")),
                         ]
                     )
-                )
-            if hasattr(self, 'page') and self.page is not None:
-                print("Updating page after tenant refresh")
+                    for tenant in tenants
+                ]
+                summary_text.value = f"{len(tenants)} archived tenants found; select one to see their payments"
+                history_table.visible = False
+                history_title.value = ""
                 self.page.update()
-        except Exception as e:
-            print(f"Error refreshing tenants: {e}")
-            self.show_error(f"Error refreshing tenants: {str(e)}")
+            except Exception as ex:
+                print(f"Error searching the archive: {ex}")
+                self.show_error(f"Error searching the archive: {str(ex)}")
+
+        search_field.on_submit = search
+
+        archive_page = ft.View(
+            "/tenants/archive",
+            [
+                ft.AppBar(
+                    title=ft.Text("Tenant Archive"),
+                    bgcolor=colors.SURFACE_VARIANT,
+                    leading=ft.IconButton(
+                        icon=ft.Icons.ARROW_BACK,
+                        on_click=lambda _: self.page.go("/tenants")
+                    )
+                ),
+                ft.Container(
+                    content=ft.Column(
+                        controls=[
+                            ft.Row(
+                                controls=[
+                                    search_field,
+                                    ft.ElevatedButton("Search", icon=ft.Icons.SEARCH, on_click=search)
+                                ],
+                                spacing=20
+                            ),
+                            summary_text,
+                            results_table,
+                            history_title,
+                            history_table
+                        ],
+                        spacing=20,
+                        scroll=ft.ScrollMode.AUTO
+                    ),
+                    padding=20,
+                    expand=True
+                )
+            ]
+        )
+
+        self.page.views.append(archive_page)
+        self.page.go("/tenants/archive")
 
     def add_tenant(self, e):
         print("Opening add tenant page")
@@ -219,8 +518,9 @@ class TenantsView:
         
         # Profile image picker
         self.current_profile_image_path = None
+        self.image_processing = False
         self.current_profile_image = ft.Image(
-            src="src/assets/images/default_profile.png",
+            src=DEFAULT_PROFILE_IMAGE,
             width=100,
             height=100,
             fit=ft.ImageFit.COVER,
@@ -230,7 +530,7 @@ class TenantsView:
         def pick_image(e):
             self.file_picker.pick_files(
                 allow_multiple=False,
-                allowed_extensions=["png", "jpg", "jpeg"],
+                allowed_extensions=["png", "jpg", "jpeg", "webp"],
                 dialog_title="Select Profile Image"
             )
 
@@ -257,25 +557,29 @@ class TenantsView:
                     self.show_error("First name and last name are required")
                     return
 
-                # Check room capacity
-                if room_id:
-                    room = self.db.fetch_one("SELECT capacity FROM rooms WHERE room_id = %s", (room_id,))
-                    current_tenants = self.db.fetch_one(
-                        "SELECT COUNT(*) FROM tenants WHERE room_id = %s",
-                        (room_id,)
+                if self.image_processing:
+                    self.show_error("The profile image is still being processed")
+                    return
+
+                # Take a place in the room and add the tenant together, so the
+                # capacity check can't race another save
+                def insert_tenant(cursor):
+                    cursor.execute(
+                        """
+                        INSERT INTO tenants 
+                        (first_name, last_name, contact_number, email, room_id, check_in_date, check_out_date, profile_image) 
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        """,
+                        (first_name, last_name, contact_number, email, room_id or None, check_in_date, check_out_date, self.current_profile_image_path)
                     )
-                    if room and current_tenants and current_tenants[0] >= room[0]:
-                        self.show_error("Room is at full capacity")
-                        return
-
-                self.db.insert(
-                    """
-                    INSERT INTO tenants 
-                    (first_name, last_name, contact_number, email, room_id, check_in_date, check_out_date, profile_image) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (first_name, last_name, contact_number, email, room_id, check_in_date, check_out_date, self.current_profile_image_path)
-                )
+                    if room_id:
+                        occupy(cursor, room_id, tenant_id=cursor.lastrowid)
+
+                try:
+                    self.db.run_in_transaction(insert_tenant)
+                except RoomFullError:
+                    self.show_error("Room is at full capacity")
+                    return
                 
                 # Return to tenants list
                 self.page.go("/tenants")
@@ -349,7 +653,8 @@ class TenantsView:
         check_out_field = ft.TextField(label="Check-out Date (YYYY-MM-DD)", value=str(tenant[6] or ""))
 
         # Profile image
-        self.current_profile_image_path = tenant[8] if tenant[8] else "src/assets/images/default_profile.png"
+        self.current_profile_image_path = tenant[8] if tenant[8] else DEFAULT_PROFILE_IMAGE
+        self.image_processing = False
         self.current_profile_image = ft.Image(
             src=self.current_profile_image_path,
             width=100,
@@ -361,20 +666,22 @@ class TenantsView:
         def pick_image(e):
             self.file_picker.pick_files(
                 allow_multiple=False,
-                allowed_extensions=["png", "jpg", "jpeg"],
+                allowed_extensions=["png", "jpg", "jpeg", "webp"],
                 dialog_title="Select Profile Image"
             )
 
         # Get available rooms and current room
+        current_room = self.db.fetch_one("SELECT room_id FROM tenants WHERE tenant_id = %s", (tenant[0],))
+        current_room_id = current_room[0] if current_room else None
         rooms = self.db.fetch_all("""
             SELECT room_id, room_number 
             FROM rooms 
             WHERE status = 'Available' OR room_id = %s
-        """, (tenant[5],))
+        """, (current_room_id,))
         room_dropdown = ft.Dropdown(
             label="Room",
             options=[ft.dropdown.Option(str(r[0]), r[1]) for r in rooms] if rooms else [],
-            value=str(tenant[5]) if tenant[5] else None
+            value=str(current_room_id) if current_room_id else None
         )
 
         def save_changes(e):
@@ -393,28 +700,31 @@ class TenantsView:
                     self.show_error("First name and last name are required")
                     return
 
-                # Check room capacity if room is changed
-                if room_id and room_id != tenant[5]:  # tenant[5] is the current room_id
-                    room = self.db.fetch_one("SELECT capacity FROM rooms WHERE room_id = %s", (room_id,))
-                    current_tenants = self.db.fetch_one(
-                        "SELECT COUNT(*) FROM tenants WHERE room_id = %s",
-                        (room_id,)
+                if self.image_processing:
+                    self.show_error("The profile image is still being processed")
+                    return
+
+                # Moving rooms frees the old place and takes the new one in
+                # the same transaction as the update
+                def update_tenant(cursor):
+                    assign_room(cursor, tenant[0], room_id)
+                    cursor.execute(
+                        """
+                        UPDATE tenants 
+                        SET first_name = %s, last_name = %s, contact_number = %s, 
+                            email = %s, check_in_date = %s, check_out_date = %s,
+                            profile_image = %s
+                        WHERE tenant_id = %s
+                        """,
+                        (first_name, last_name, contact_number, email,
+                         check_in_date, check_out_date, self.current_profile_image_path, tenant[0])
                     )
-                    if room and current_tenants and current_tenants[0] >= room[0]:
-                        self.show_error("Room is at full capacity")
-                        return
-
-                self.db.update(
-                    """
-                    UPDATE tenants 
-                    SET first_name = %s, last_name = %s, contact_number = %s, 
-                        email = %s, room_id = %s, check_in_date = %s, check_out_date = %s,
-                        profile_image = %s
-                    WHERE tenant_id = %s
-                    """,
-                    (first_name, last_name, contact_number, email, room_id, 
-                     check_in_date, check_out_date, self.current_profile_image_path, tenant[0])
-                )
+
+                try:
+                    self.db.run_in_transaction(update_tenant)
+                except RoomFullError:
+                    self.show_error("Room is at full capacity")
+                    return
                 
                 # Return to tenants list
                 self.page.go("/tenants")
@@ -483,10 +793,13 @@ class TenantsView:
         def confirm_delete(e):
             try:
                 print(f"Deleting tenant: {tenant[0]}")
-                # Delete profile image if it exists
-                if tenant[8] and os.path.exists(tenant[8]):
-                    os.remove(tenant[8])
-                self.db.delete("DELETE FROM tenants WHERE tenant_id = %s", (tenant[0],))
+                def remove_tenant(cursor):
+                    release_tenant(cursor, tenant[0])
+                    cursor.execute("DELETE FROM tenants WHERE tenant_id = %s", (tenant[0],))
+
+                self.db.run_in_transaction(remove_tenant)
+                # Delete the profile image unless another tenant uses the same photo
+                release_profile_image(tenant[8], tenant[0])
                 self.page.go("/tenants")
                 self.refresh_tenants()
             except Exception as e:
@@ -553,14 +866,41 @@ class TenantsView:
                             ft.Row(
                                 controls=[
                                     ft.Text("Tenants Management", size=30, weight=ft.FontWeight.BOLD),
-                                    ft.ElevatedButton(
-                                        "Add Tenant",
-                                        icon=ft.Icons.ADD,
-                                        on_click=self.add_tenant,
-                                        style=ft.ButtonStyle(
-                                            color=colors.BLACK,
-                                            bgcolor=colors.BLUE,
-                                        )
+                                    ft.Row(
+                                        controls=[
+                                            self.checkout_button,
+                                            ft.ElevatedButton(
+                                                "Archive",
+                                                icon=ft.Icons.INVENTORY_2,
+                                                on_click=self.show_archive,
+                                                style=ft.ButtonStyle(
+                                                    color=colors.BLACK,
+                                                    bgcolor=colors.BLUE,
+                                                )
+                                            ),
+                                            ft.ElevatedButton(
+                                                "Import CSV",
+                                                icon=ft.Icons.UPLOAD_FILE,
+                                                on_click=lambda e: self.import_picker.pick_files(
+                                                    dialog_title="Select tenants CSV",
+                                                    allowed_extensions=["csv"]
+                                                ),
+                                                style=ft.ButtonStyle(
+                                                    color=colors.BLACK,
+                                                    bgcolor=colors.BLUE,
+                                                )
+                                            ),
+                                            ft.ElevatedButton(
+                                                "Add Tenant",
+                                                icon=ft.Icons.ADD,
+                                                on_click=self.add_tenant,
+                                                style=ft.ButtonStyle(
+                                                    color=colors.BLACK,
+                                                    bgcolor=colors.BLUE,
+                                                )
+                                            )
+                                        ],
+                                        spacing=10
                                     )
                                 ],
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN
@@ -568,7 +908,8 @@ class TenantsView:
                             ft.Row(
                                 controls=[
                                     self.search_field,
-                                    self.status_filter
+                                    self.status_filter,
+                                    self.export_menu.build()
                                 ],
                                 spacing=20
                             ),
@@ -581,6 +922,10 @@ class TenantsView:
                                     blur_radius=15,
                                     color=colors.BLACK45,
                                 )
+                            ),
+                            ft.Row(
+                                controls=[self.prev_button, self.page_label, self.next_button],
+                                alignment=ft.MainAxisAlignment.END
                             )
                         ],
                         spacing=20
@@ -0,0 +1,107 @@
+import random
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from src.utils.billing import batch_rent_cents, period_rent_cents, rent_cents, to_datetime64
+
+AS_OF = date(2024, 3, 31)
+
+def scalar(check_ins, check_outs, prices, as_of):
+    return [rent_cents(ci, co, p, as_of) for ci, co, p in zip(check_ins, check_outs, prices)]
+
+def assert_agrees(check_ins, check_outs, prices, as_of=AS_OF):
+    expected = scalar(check_ins, check_outs, prices, as_of)
+    assert batch_rent_cents(check_ins, check_outs, prices, as_of).tolist() == expected
+    # Dates already converted to datetime64 take the same path
+    assert batch_rent_cents(
+        to_datetime64(check_ins), to_datetime64(check_outs), np.asarray(prices, dtype=np.int64), as_of
+    ).tolist() == expected
+
+EDGE_CASES = [
+    # Month ends, including into shorter months
+    (date(2024, 1, 31), date(2024, 2, 29)),
+    (date(2024, 1, 31), date(2024, 3, 1)),
+    (date(2023, 8, 31), date(2023, 9, 30)),
+    (date(2023, 12, 31), date(2024, 1, 31)),
+    (date(2023, 11, 30), date(2023, 12, 31)),
+    # Leap days
+    (date(2024, 2, 29), date(2024, 3, 29)),
+    (date(2024, 2, 29), date(2024, 3, 1)),
+    (date(2020, 2, 29), date(2021, 2, 28)),
+    (date(2020, 2, 29), date(2021, 3, 1)),
+    (date(2023, 2, 28), date(2024, 2, 29)),
+    # Same day, and the day before and after a whole month
+    (date(2024, 1, 15), date(2024, 1, 15)),
+    (date(2024, 1, 15), date(2024, 2, 14)),
+    (date(2024, 1, 15), date(2024, 2, 15)),
+    (date(2024, 1, 15), date(2024, 2, 16)),
+    # Open check-out, billed up to as-of
+    (date(2024, 3, 31), None),
+    (date(2024, 2, 29), None),
+    (date(2023, 3, 31), None),
+    (date(2019, 1, 1), None),
+    # Check-out before as-of
+    (date(2023, 6, 10), date(2023, 9, 9)),
+    (date(2024, 3, 1), date(2024, 3, 30)),
+    # Check-out after as-of still bills to check-out
+    (date(2024, 1, 10), date(2024, 6, 10)),
+    # Missing check-in bills nothing
+    (None, None),
+    (None, date(2024, 1, 1)),
+]
+
+@pytest.mark.parametrize("check_in, check_out", EDGE_CASES)
+def test_edge_cases_agree(check_in, check_out):
+    assert_agrees([check_in], [check_out], [450099])
+
+def test_edge_cases_agree_as_one_batch():
+    check_ins, check_outs = zip(*EDGE_CASES)
+    prices = [150000 + i * 101 for i in range(len(EDGE_CASES))]
+    assert_agrees(list(check_ins), list(check_outs), prices)
+
+@pytest.mark.parametrize("as_of", [date(2024, 2, 29), date(2024, 12, 31), date(2025, 2, 28), date(2023, 1, 1)])
+def test_generated_tenants_agree(as_of):
+    rng = random.Random(as_of.toordinal())
+    check_ins, check_outs, prices = [], [], []
+    for _ in range(5000):
+        check_in = as_of - timedelta(days=rng.randint(0, 5 * 365))
+        check_out = None
+        if rng.random() < 0.4:
+            check_out = check_in + timedelta(days=rng.randint(0, 3 * 365))
+        check_ins.append(None if rng.random() < 0.02 else check_in)
+        check_outs.append(check_out)
+        prices.append(rng.randint(1500, 12000) * 100 + rng.choice((0, 50, 99)))
+    assert_agrees(check_ins, check_outs, prices, as_of)
+
+def test_empty_batch():
+    assert batch_rent_cents([], [], [], AS_OF).tolist() == []
+
+def periods(first, last):
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        start = date(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        yield start, date(year, month, 1) - timedelta(days=1)
+
+@pytest.mark.parametrize("check_in, check_out", [case for case in EDGE_CASES if case[0]])
+def test_period_invoices_add_up_to_the_stay(check_in, check_out):
+    last_day = date(2024, 12, 31)
+    charged = [
+        period_rent_cents([check_in], [check_out], [450099], start, end).tolist()[0]
+        for start, end in periods(date(check_in.year, check_in.month, 1), last_day)
+    ]
+    # Whole months only; a check-in late in the month can put two in one period
+    assert all(cents >= 0 and cents % 450099 == 0 for cents in charged)
+    assert sum(charged) == rent_cents(check_in, check_out if check_out and check_out < last_day else None,
+                                      450099, last_day)
+
+def test_period_rent_follows_the_check_in_day():
+    # Checked in on the 15th: January, February and March each start a month,
+    # so as of 10 March two months are owed and March is invoiced for the third
+    check_in = date(2024, 1, 15)
+    march = period_rent_cents([check_in], [None], [100], date(2024, 3, 1), date(2024, 3, 31))
+    assert march.tolist() == [100]
+    assert rent_cents(check_in, None, 100, date(2024, 3, 10)) == 200
+    assert rent_cents(check_in, None, 100, date(2024, 3, 31)) == 300
+    # Checked out before a new month of the stay starts: nothing for that period
+    assert period_rent_cents([check_in], [date(2024, 2, 10)], [100], date(2024, 2, 1), date(2024, 2, 29)).tolist() == [0]
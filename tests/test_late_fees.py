@@ -0,0 +1,92 @@
+import os
+import uuid
+from datetime import date, timedelta
+import pytest
+
+# Creates and deletes rows, so it only runs against a scratch schema named explicitly
+TEST_DATABASE = os.environ.get("BOARDING_HOUSE_TEST_DB")
+if not TEST_DATABASE:
+    pytest.skip("set BOARDING_HOUSE_TEST_DB to a scratch MySQL schema", allow_module_level=True)
+pytest.importorskip("mysql.connector")
+os.environ["BOARDING_HOUSE_DB"] = TEST_DATABASE
+
+from src.models.billing_run import rent_description
+from src.models.database import Database
+from src.models.ledger import PaymentLedger
+from src.models.recurring_charges import accrue_late_fees, raise_reminders
+from src.utils.money import Money
+
+PERIOD = (date.today() - timedelta(days=60)).strftime("%Y-%m")
+
+@pytest.fixture(scope="module")
+def db():
+    database = Database()
+    database.create_tables()
+    return database
+
+@pytest.fixture
+def make_tenant(db):
+    """Creates tenants billed for PERIOD; returns (tenant_id, invoice_id)"""
+    ledger = PaymentLedger()
+    created = []
+
+    def make(rent="1000.00"):
+        tenant_id = db.insert(
+            "INSERT INTO tenants (first_name, last_name) VALUES (%s, %s)",
+            ("Fee", uuid.uuid4().hex[:8])
+        )
+        invoice_id = db.insert(
+            "INSERT INTO invoices (tenant_id, period, amount, due_date) VALUES (%s, %s, %s, %s)",
+            (tenant_id, PERIOD, rent, date.today() - timedelta(days=55))
+        )
+        ledger.post_charge(tenant_id, Money.of(rent), rent_description(PERIOD))
+        created.append(tenant_id)
+        return tenant_id, invoice_id
+
+    yield make
+
+    with db.transaction() as cursor:
+        for tenant_id in created:
+            for table in ("payment_reminders", "arrears_aging", "balances"):
+                cursor.execute(f"DELETE FROM {table} WHERE tenant_id = %s", (tenant_id,))
+            cursor.execute(
+                "DELETE FROM payment_transactions WHERE tenant_id = %s AND reverses_transaction_id IS NOT NULL",
+                (tenant_id,)
+            )
+            cursor.execute("DELETE FROM payment_transactions WHERE tenant_id = %s", (tenant_id,))
+            cursor.execute("DELETE FROM invoices WHERE tenant_id = %s", (tenant_id,))
+            cursor.execute("DELETE FROM tenants WHERE tenant_id = %s", (tenant_id,))
+
+def late_fees(db, tenant_id):
+    return db.fetch_one(
+        "SELECT COUNT(*) FROM payment_transactions WHERE tenant_id = %s AND idempotency_key LIKE 'late-fee:%%'",
+        (tenant_id,)
+    )[0]
+
+def reminders(db, tenant_id):
+    return db.fetch_one("SELECT COUNT(*) FROM payment_reminders WHERE tenant_id = %s", (tenant_id,))[0]
+
+def test_unpaid_invoice_gets_one_fee(db, make_tenant):
+    tenant_id, _ = make_tenant()
+    accrue_late_fees()
+    accrue_late_fees()
+    assert late_fees(db, tenant_id) == 1
+
+def test_paid_invoice_with_unpaid_fee_gets_no_second_fee(db, make_tenant):
+    tenant_id, invoice_id = make_tenant()
+    ledger = PaymentLedger()
+    ledger.post_charge(tenant_id, Money.of("50.00"), f"Late fee for {PERIOD}", idempotency_key=f"late-fee:{invoice_id}")
+    ledger.post_payment(tenant_id, Money.of("1000.00"), "Cash")
+
+    accrue_late_fees()
+    raise_reminders()
+    assert late_fees(db, tenant_id) == 1
+    assert reminders(db, tenant_id) == 0
+
+def test_fully_paid_tenant_gets_nothing(db, make_tenant):
+    tenant_id, _ = make_tenant()
+    PaymentLedger().post_payment(tenant_id, Money.of("1000.00"), "Cash")
+    accrue_late_fees()
+    raise_reminders()
+    assert late_fees(db, tenant_id) == 0
+    assert reminders(db, tenant_id) == 0
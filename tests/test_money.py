@@ -0,0 +1,51 @@
+import operator
+import pickle
+from decimal import Decimal
+import numpy as np
+import pytest
+from src.utils.money import Money, ZERO, sum_cents
+
+@pytest.mark.parametrize("op", [
+    operator.add, operator.sub, operator.mul, operator.truediv,
+    operator.lt, operator.le, operator.gt, operator.ge,
+])
+@pytest.mark.parametrize("other", [Decimal("1.00"), Decimal("100"), 1.5, 0.0])
+def test_decimal_and_float_operands_raise(op, other):
+    with pytest.raises(TypeError):
+        op(Money(100), other)
+    with pytest.raises(TypeError):
+        op(other, Money(100))
+
+def test_reported_mixups_raise():
+    with pytest.raises(TypeError):
+        Decimal("1.00") + Money(100)
+    with pytest.raises(TypeError):
+        Money.of("12.34") < Decimal("100")
+    with pytest.raises(TypeError):
+        Money(100) * 1.5
+
+def test_money_and_integer_centavos():
+    assert Money(150) + Money(50) == Money(200)
+    assert Money(150) - 50 == Money(100)
+    assert 500 - Money(150) == Money(350)
+    assert Money(150) * 3 == 3 * Money(150) == Money(450)
+    assert Money(1) < Money(2) and Money(2) >= 2
+    assert isinstance(Money(1) + 1, Money)
+    with pytest.raises(TypeError):
+        Money(2) * Money(3)
+
+def test_conversions():
+    assert Money.of("1,234.565") == Money(123457)
+    assert Money.of(Decimal("12.34")).to_decimal() == Decimal("12.34")
+    assert Money.of(None) == ZERO
+    assert f"{Money(123456):,.2f}" == "1,234.56"
+    assert int(Money(-5)) == -5
+
+def test_sums_and_arrays():
+    amounts = [Money(1), Money(2), Money(3)]
+    assert sum(amounts) == sum(amounts, ZERO) == Money(6)
+    assert sum_cents(amounts) == Money(6)
+    assert np.asarray(amounts, dtype=np.int64).tolist() == [1, 2, 3]
+
+def test_pickles_for_the_document_pool():
+    assert pickle.loads(pickle.dumps(Money(12345))) == Money(12345)
@@ -0,0 +1,22 @@
+import os
+import pytest
+
+# Creates and deletes rows, so it only runs against a scratch schema named explicitly
+TEST_DATABASE = os.environ.get("BOARDING_HOUSE_TEST_DB")
+if not TEST_DATABASE:
+    pytest.skip("set BOARDING_HOUSE_TEST_DB to a scratch MySQL schema", allow_module_level=True)
+pytest.importorskip("mysql.connector")
+os.environ["BOARDING_HOUSE_DB"] = TEST_DATABASE
+
+from benchmarks.payment_contention_benchmark import run_contention
+from src.models.database import Database
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    Database().create_tables()
+
+@pytest.mark.parametrize("tenants", [1, 3])
+def test_concurrent_postings_keep_balances_exact(tenants):
+    report = run_contention(threads=8, postings=50, tenants=tenants)
+    assert report["postings"] == 400
+    assert report["mismatches"] == []